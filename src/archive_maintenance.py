@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from pandas.tseries.holiday import (AbstractHolidayCalendar, GoodFriday, Holiday, TH, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay, USPresidentsDay, USThanksgivingDay,
+                                    nearest_workday)
+from pandas.tseries.offsets import DateOffset
+
+from src.storage.bar_store import BarStore, COLUMNS, read_yfinance_csv, store_path
+
+# Longest history yfinance serves per intraday interval
+MAX_PERIOD = {'1m': '8d', '5m': '60d', '1h': '730d'}
+INTERVAL_DELTA = {'1m': pd.Timedelta(minutes=1), '5m': pd.Timedelta(minutes=5), '1h': pd.Timedelta(hours=1)}
+CSV_COLUMNS = ['Close', 'High', 'Low', 'Open', 'Volume']
+
+# source(symbol, interval) -> the newest window of bars (DatetimeIndex, OHLCV columns)
+Source = Callable[[str, str], pd.DataFrame]
+
+
+def yfinance_source(symbol: str, interval: str) -> pd.DataFrame:
+    df = yf.download(symbol, period=MAX_PERIOD[interval], interval=interval, ignore_tz=True, progress=False)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.droplevel(1)
+    return df
+
+
+class CMEHolidayCalendar(AbstractHolidayCalendar):
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=nearest_workday),
+        USMartinLutherKingJr, USPresidentsDay, GoodFriday, USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay, USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+class CMEEarlyCloseCalendar(AbstractHolidayCalendar):
+    rules = [
+        Holiday('Independence Day Eve', month=7, day=3),
+        Holiday('Day after Thanksgiving', month=11, day=1, offset=[DateOffset(weekday=TH(4)), DateOffset(days=1)]),
+        Holiday('Christmas Eve', month=12, day=24),
+    ]
+
+
+class TradingCalendar:
+    """
+    When a CME Globex future such as GC=F has bars, in the exchange-local times the archives
+    hold: Sunday `open_time` to Friday `close_time`, with a daily break in between. Yahoo has
+    no bars on exchange holidays (from `close_time` the evening before) and only the
+    `early_session` on early-close days. Deliberately wide: a missing bar next to a closure
+    is not worth a backfill attempt, a whole closure reported as a gap is.
+    """
+
+    def __init__(self, open_time: str = "18:00", close_time: str = "17:00",
+                 early_session: Tuple[str, str] = ("09:30", "12:30")):
+        self.open_minute = _minute_of_day(open_time)
+        self.close_minute = _minute_of_day(close_time)
+        self.early_session = tuple(_minute_of_day(t) for t in early_session)
+
+    def is_open(self, index: pd.DatetimeIndex) -> np.ndarray:
+        minutes = np.asarray(index.hour * 60 + index.minute)
+        dow = np.asarray(index.dayofweek)
+        dates = index.normalize()
+        holidays = CMEHolidayCalendar().holidays(dates.min() - pd.Timedelta(days=1), dates.max() + pd.Timedelta(days=1))
+        early_closes = CMEEarlyCloseCalendar().holidays(dates.min(), dates.max())
+        early_closes = early_closes[(early_closes.dayofweek < 5) & ~early_closes.isin(holidays)]
+
+        after_close = minutes >= self.close_minute
+        closed = after_close & (minutes < self.open_minute)
+        closed |= ((dow == 4) & after_close) | (dow == 5) | ((dow == 6) & (minutes < self.open_minute))
+        closed |= np.asarray(dates.isin(holidays))
+        closed |= np.asarray((dates + pd.Timedelta(days=1)).isin(holidays)) & after_close
+        closed |= np.asarray(dates.isin(early_closes)) & ((minutes < self.early_session[0]) |
+                                                          (minutes >= self.early_session[1]))
+        return ~closed
+
+    def missing_bars(self, start: pd.Timestamp, end: pd.Timestamp, delta: pd.Timedelta) -> pd.DatetimeIndex:
+        """
+        Bar times strictly between two bars at which the market was open.
+        """
+        grid = pd.date_range(start + delta, end, freq=delta)
+        # inclusive='left' still returns `end` when it is the only point
+        grid = grid[grid < end]
+        if len(grid) == 0:
+            return grid
+        return grid[self.is_open(grid)]
+
+
+def _minute_of_day(time_of_day: str) -> int:
+    hours, minutes = time_of_day.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class ReplaySource:
+    """
+    Replays a recorded archive as a sequence of overlapping windows, one per call,
+    standing in for yfinance when exercising the maintenance job offline.
+    """
+
+    def __init__(self, df: pd.DataFrame, window: int, step: int):
+        self.df = df.sort_index()
+        self.window = window
+        self.step = step
+        self.calls = 0
+
+    def __call__(self, symbol: str, interval: str) -> pd.DataFrame:
+        end = min(len(self.df), self.window + self.calls * self.step)
+        self.calls += 1
+        return self.df.iloc[max(0, end - self.window):end]
+
+
+def last_csv_timestamp(csv_path: Path) -> Optional[pd.Timestamp]:
+    """
+    Timestamp of the last row of an archive CSV, reading only the end of the file.
+    """
+    with open(csv_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        lines = f.read().decode().strip().splitlines()
+    if not lines:
+        return None
+    try:
+        return pd.Timestamp(lines[-1].split(',')[0])
+    except ValueError:
+        # only the header rows are present
+        return None
+
+
+def append_to_csv(csv_path: Path, bars: pd.DataFrame):
+    # Same row layout as the yf.download archive: Datetime,Close,High,Low,Open,Volume
+    with open(csv_path, 'a') as f:
+        bars[CSV_COLUMNS].to_csv(f, header=False, date_format='%Y-%m-%d %H:%M:%S')
+
+
+def record_gap(gaps_path: Path, symbol: str, interval: str, start: pd.Timestamp, end: pd.Timestamp):
+    with open(gaps_path, 'a') as f:
+        f.write(json.dumps({'symbol': symbol, 'interval': interval, 'from': str(start), 'to': str(end),
+                            'recorded_at': time.time()}) + "\n")
+
+
+def maintain_archive(symbol: str, interval: str, source: Source = yfinance_source,
+                     csv_path: Optional[Path] = None, root: str = "data",
+                     calendar: Optional[TradingCalendar] = None) -> Dict:
+    """
+    Fetch the newest window and append only bars later than the archive's last bar.
+    Overlapping timestamps keep the archived values. When the window does not reach back
+    to the last archived bar and the market was open in between (see TradingCalendar),
+    the uncovered span is recorded in <store>/gaps.jsonl.
+    """
+    calendar = calendar or TradingCalendar()
+    csv_path = csv_path or Path(os.path.join(os.getcwd(), root, f"{symbol}_{interval}_archive.csv"))
+    path = store_path(symbol, interval, os.path.join(root, "bars"))
+    if (path / "meta.json").exists():
+        store = BarStore(path)
+    elif csv_path.exists():
+        store = BarStore.create(path, read_yfinance_csv(csv_path))
+    else:
+        store = BarStore.create(path, pd.DataFrame(columns=list(COLUMNS), index=pd.DatetimeIndex([])))
+
+    window = source(symbol, interval).sort_index()
+    window = window[~window.index.duplicated(keep='last')]
+    last = store.last_timestamp()
+    new_bars = window if last is None else window[window.index > last]
+
+    gap = None
+    if last is not None and len(window) and len(calendar.missing_bars(last, window.index[0], INTERVAL_DELTA[interval])):
+        gap = (last, window.index[0])
+        record_gap(path / "gaps.jsonl", symbol, interval, *gap)
+
+    appended = store.append(new_bars)
+    if appended and csv_path.exists():
+        csv_last = last_csv_timestamp(csv_path)
+        csv_bars = new_bars if csv_last is None else new_bars[new_bars.index > csv_last]
+        append_to_csv(csv_path, csv_bars)
+
+    return {'symbol': symbol, 'interval': interval, 'fetched': len(window), 'appended': appended,
+            'overlap': len(window) - len(new_bars), 'gap': gap}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Append the newest intraday bars to the archives")
+    parser.add_argument('--symbol', default='GC=F')
+    parser.add_argument('--intervals', nargs='+', default=['1m', '5m', '1h'])
+    args = parser.parse_args(argv)
+
+    for interval in args.intervals:
+        result = maintain_archive(args.symbol, interval)
+        print(f"{args.symbol} {interval}: fetched {result['fetched']}, appended {result['appended']}, "
+              f"overlap {result['overlap']}" + (f", GAP {result['gap'][0]} -> {result['gap'][1]}" if result['gap'] else ""))
+
+
+if __name__ == "__main__":
+    main()
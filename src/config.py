@@ -18,6 +18,7 @@ DESIRED_YEAR = 2021
 DESIRED_MONTH = 9
 
 # API
+NASDAQ_API_URL = "https://api.nasdaq.com/api/ipo/calendar"
 START_DATE = '1997-1-1'
 END_DATE = '1997-1-31'
 # END_DATE = datetime.today().strftime('%Y-%m-%d')
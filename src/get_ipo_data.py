@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 
 import yfinance as yf
 import pandas as pd
@@ -8,6 +8,9 @@ import json
 
 from src.config import *
 from src.scraper.scrape_nasdaq_ipo import get_symbols_list
+from src.storage.fundamentals_store import FundamentalsStore
+from src.storage.ipo_store import write_symbol_bars
+from src.storage.ohlcv_cache import OHLCVCache
 
 
 # Function to save stock info as JSON
@@ -25,6 +28,15 @@ def save_info_as_json(symbol, info):
         print(f"Error saving info data for {symbol}: {e}")
 
 
+# Function to save stock info to the fundamentals snapshot store
+def save_info_to_store(symbol, info, store:FundamentalsStore):
+    try:
+        store.append(symbol, info, ipo_year=DESIRED_YEAR, ipo_month=DESIRED_MONTH)
+        print(f"        Saved info data for {symbol} to {store.root}")
+    except Exception as e:
+        print(f"Error saving info data for {symbol}: {e}")
+
+
 # Function to save stock historical data as CSV
 def save_stock_data_to_csv(symbol, data):
     try:
@@ -45,6 +57,19 @@ def save_stock_data_to_csv(symbol, data):
         print(f"Error saving historical data for {symbol}: {e}")
 
 
+# Function to save stock historical data to the partitioned Parquet store
+def save_stock_data_to_parquet(symbol, data):
+    try:
+        if data.empty:
+            print(f"No data to save for {symbol}")
+            return
+
+        path = write_symbol_bars(symbol, data, DESIRED_YEAR, DESIRED_MONTH)
+        print(f"  Saved historical data for {symbol} to {path}")
+    except Exception as e:
+        print(f"Error saving historical data for {symbol}: {e}")
+
+
 # Function to fetch and filter stock info
 def fetch_filtered_stock_info(symbol:str):
     try:
@@ -57,8 +82,10 @@ def fetch_filtered_stock_info(symbol:str):
 
 
 # Function to fetch stock historical data
-def fetch_stock_history(symbol:str):
+def fetch_stock_history(symbol:str, cache:Optional[OHLCVCache]=None):
     try:
+        if cache is not None:
+            return cache.get(symbol, "1d")
         stock = yf.Ticker(symbol)
         return stock.history(period="max")
     except Exception as e:
@@ -67,18 +94,21 @@ def fetch_stock_history(symbol:str):
 
 
 # Main function to process all symbols
-def process_symbols(symbols:List[str]):
+def process_symbols(symbols:List[str], cache:Optional[OHLCVCache]=None, store:Optional[FundamentalsStore]=None):
     for symbol in symbols:
         filtered_info = fetch_filtered_stock_info(symbol)
         if filtered_info:
-            save_info_as_json(symbol, filtered_info)
+            if store is not None:
+                save_info_to_store(symbol, filtered_info, store)
+            else:
+                save_info_as_json(symbol, filtered_info)
 
-        stock_data = fetch_stock_history(symbol)
+        stock_data = fetch_stock_history(symbol, cache)
         if stock_data is not None:
-            save_stock_data_to_csv(symbol, stock_data)
+            save_stock_data_to_parquet(symbol, stock_data)
 
 
 # Run the script
 if __name__ == "__main__":
     symbols = get_symbols_list(NASDAQ_IPO_URL, CHROME_DRIVER_PATH)
-    process_symbols(symbols)
+    process_symbols(symbols, OHLCVCache(), FundamentalsStore())
@@ -8,6 +8,16 @@ from pathlib import Path
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import precision_score
 
+from src.pipeline.compact import compact_ohlcv
+from src.pipeline.feature_cache import FeatureCache, feature_key
+from src.pipeline.feature_spec import compute_features, macd_diff, ratio_and_trend_spec
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.parallel_backtest import ParallelWalkForward
+from src.pipeline.resample import resample_ohlcv
+from src.pipeline.walk_forward import WalkForward
+from src.storage.bar_store import BarStore
+from src.storage.ohlcv_cache import OHLCVCache
+
 def get_period(interval):
     if interval == '1d' or interval == '1w':
         return 'max'
@@ -19,15 +29,33 @@ def get_period(interval):
         return '8d'
 
 
-def fetch_data(symbol, interval):
-    period=get_period(interval)
-    df = yf.download(symbol, period=period, interval=interval, ignore_tz=True, progress=False)
+def download_data(symbol, interval, start=None):
+    if start is None:
+        return yf.download(symbol, period=get_period(interval), interval=interval, ignore_tz=True, progress=False)
+    return yf.download(symbol, start=start, interval=interval, ignore_tz=True, progress=False)
+
+def fetch_data(symbol, interval, cache=None, compact=False):
+    if cache is not None:
+        df = cache.get(symbol, interval, fetch=download_data)
+    else:
+        df = download_data(symbol, interval)
     # df.to_csv(Path(os.path.join(os.getcwd(), f"data/{symbol}_{interval}.csv")))
+    if compact:
+        df = compact_ohlcv(df)
     return df
 
+def load_archive(symbol, interval, start=None, end=None, compact=False):
+    # Memory-mapped archive (see src/storage/bar_store.py); only [start, end) is read
+    return BarStore.open(symbol, interval).frame(start, end, compact=compact)
+
+def derive_data(symbol, interval, fine_interval='1m', start=None, end=None):
+    # Coarser bars derived from the finest archived bars instead of a separate download
+    return resample_ohlcv(load_archive(symbol, fine_interval, start, end), interval)
+
 def preprocess_data(df):
     df.index = pd.to_datetime(df.index, utc=True).map(lambda x: x.tz_convert('Singapore'))
-    df.columns = df.columns.droplevel(1)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.droplevel(1)
 
     df["Tomorrow"] = df["Close"].shift(-5)
     df["Target"] = (df["Tomorrow"] > df["Close"]).astype(int)
@@ -35,26 +63,25 @@ def preprocess_data(df):
     return df
 
 def get_macd(original_df):
-    macd = original_df.Close.ewm(span=12).mean() - original_df.Close.ewm(span=26).mean()
-    signal = macd.ewm(span=9).mean()
-    original_df['macd_diff'] = macd - signal
+    original_df['macd_diff'] = compute_features(original_df, [macd_diff()])['macd_diff']
     return original_df
 
-def get_close_ratio_and_trend(df):
-    horizons = [2, 5, 60, 250, 1000]
-    new_predictors = []
-
-    for horizon in horizons:
-        rolling_averages = df.rolling(horizon).mean()
-
-        ratio_column = f"Close_Ratio_{horizon}"
-        df[ratio_column] = df["Close"] / rolling_averages["Close"]
+HORIZONS = (2, 5, 60, 250, 1000)
 
-        trend_column = f"Trend_{horizon}"
-        df[trend_column] = df.shift(1).rolling(horizon).sum()["Target"]
+def get_close_ratio_and_trend(df, horizons=HORIZONS):
+    # Only Close / Target are read; the trend horizons share one cumulative sum
+    features = compute_features(df, ratio_and_trend_spec(list(horizons)))
+    for column in features.columns:
+        df[column] = features[column]
+    return list(features.columns)
 
-        new_predictors += [ratio_column, trend_column]
-    return new_predictors
+def build_features(df, horizons=HORIZONS):
+    # The close ratios, trends and MACD histogram all come from the one declarative spec
+    df = df.copy()
+    features = compute_features(df, ratio_and_trend_spec(list(horizons)) + [macd_diff()])
+    for column in features.columns:
+        df[column] = features[column]
+    return df, list(features.columns)
 
 def final_processing(df):
     df = df.dropna(subset=df.columns[df.columns != "Tomorrow"])
@@ -71,16 +98,19 @@ def predict(train, test, predictors, model):
     combined = pd.concat([test["Target"], preds], axis=1)
     return combined
 
-def backtest(data, model, predictors, start=2400, step=240):
-    all_predictions = []
-
-    for i in range(start, data.shape[0], step):
-        train = data.iloc[0:i - 10].copy()
-        test = data.iloc[i:(i + step)].copy()
-        predictions = predict(train, test, predictors, model)
-        all_predictions.append(predictions)
-
-    return pd.concat(all_predictions)
+def backtest(data, model, predictors, start=2400, step=240, scheme='expanding', embargo=10, window=None,
+             trees_per_step=None, max_trees=None, max_workers=1):
+    # Walk-forward folds (see src/pipeline/walk_forward.py); 'expanding' refits on data.iloc[0:i - embargo]
+    if max_workers != 1 and scheme != 'warm_start':
+        # Independent folds on a process pool over shared-memory features (same predictions)
+        walk_forward = ParallelWalkForward(model, predictors, scheme=scheme, start=start, step=step,
+                                           embargo=embargo, window=window, max_workers=max_workers)
+    else:
+        walk_forward = WalkForward(model, predictors, scheme=scheme, start=start, step=step, embargo=embargo,
+                                   window=window, trees_per_step=trees_per_step, max_trees=max_trees)
+    predictions = walk_forward.run(data)
+    print(f"     {walk_forward.summary()}")
+    return predictions
 
 def plot_finplot(df, predictions):
     original_df = df.copy()
@@ -156,16 +186,17 @@ def main():
     symbol, interval = 'GC=F', '5m'
 
     print("  1. Fetching data...")
-    df = fetch_data(symbol, interval)
+    df = fetch_data(symbol, interval, OHLCVCache(refresh_after=15 * 60))
 
     print("  2. Pre-processing data...")
     df = preprocess_data(df)
 
     print("  3. Feature Engineering...")
-    df = get_macd(df)
-    predictors = get_close_ratio_and_trend(df)
-    predictors.append("macd_diff")
+    feature_cache = FeatureCache()
+    key = feature_key(df, "gold_features", HORIZONS)
+    df, predictors = feature_cache.get_or_compute(key, lambda: build_features(df))
     print(predictors)
+    print(f"     feature cache: {feature_cache.report()}")
 
     print("  4. Final Processing of data...")
     df = final_processing(df)
@@ -174,7 +205,7 @@ def main():
     model = RandomForestClassifier(n_estimators=200, min_samples_split=50, random_state=1)
 
     print("  6. Making Predictions...")
-    predictions = backtest(df, model, predictors)
+    predictions = backtest(df, model, predictors, max_workers=os.cpu_count())
 
     print(predictions["Predictions"].value_counts())
     filtered_predictions = predictions.dropna(subset=["Predictions"])
@@ -184,7 +215,17 @@ def main():
     print("Precision Score:", precision)
     print(predictions["Target"].value_counts() / predictions.shape[0])
 
-    print("  8. Ploting Chart...")
+    print("  8. Registering model...")
+    # Fit once on all bars for live scoring; reused while the data (and so its hash) is unchanged
+    registry = ModelRegistry()
+    data_hash = feature_key(df[predictors], df["Target"])
+    model_key = registry.latest("gold", data_hash)
+    if model_key is None:
+        model.fit(df[predictors], df["Target"])
+        model_key = registry.register("gold", model, predictors, data_hash, metrics={'precision': precision})
+    print(f"     {model_key}")
+
+    print("  9. Ploting Chart...")
     plot_finplot(df, predictions)
     print("############## COMMAND TO KILL PROCESS: ###############\n"
           "ps | grep gold_analysis | awk '{print $1}' | xargs kill\n"
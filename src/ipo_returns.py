@@ -0,0 +1,270 @@
+import os
+import time
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.concurrent_fetcher import fetch_concurrently
+from src.pipeline.data_loader import fetch_ipo_window
+from src.pipeline.feature_cache import feature_key
+from src.pipeline.quantile_sketch import LogHistogramSketch
+from src.storage.ipo_store import IPO_STORE_ROOT, bars_by_symbol, load_ipo_bars
+
+QUARTER_ROWS = 63
+# 24 quarters after the IPO day: rows 0, 63, ..., 1512
+WINDOW_ROWS = 1513
+QUARTERLY_RETURNS_PATH = "data/ipo-dataset/quarterly_returns.npz"
+DAY_RETURNS_ROOT = "data/ipo-dataset/day_returns"
+
+Loader = Callable[[List[str], int], Dict[str, pd.DataFrame]]
+
+
+def load_ipo_windows(symbols: List[str], rows: int = WINDOW_ROWS,
+                     root: str = IPO_STORE_ROOT) -> Dict[str, pd.DataFrame]:
+    """
+    First `rows` bars (Open / Close) of every symbol: from the Parquet store when the symbol
+    is in it, downloaded concurrently otherwise.
+    """
+    frames = {}
+    if symbols and Path(os.path.join(os.getcwd(), root, "bars")).exists():
+        bars = load_ipo_bars(['Open', 'Close'], symbols=symbols, max_rows=rows, root=root)
+        frames = bars_by_symbol(bars)
+    missing = [s for s in symbols if s not in frames]
+    if missing:
+        report = fetch_concurrently(missing, lambda s: fetch_ipo_window(s, rows=rows, rounding=True))
+        for symbol, error in report.failed.items():
+            print(f"An unexpected error occurred for {symbol}: {error}")
+        frames.update(report.values())
+    return frames
+
+
+def price_arrays(frames: Dict[str, pd.DataFrame], rows: int = WINDOW_ROWS) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    (symbols, IPO open per symbol, closes) with closes a (symbols x rows) array, NaN past each
+    symbol's history.
+    """
+    symbols = [s for s, df in frames.items() if len(df)]
+    ipo_open = np.empty(len(symbols))
+    closes = np.full((len(symbols), rows), np.nan)
+    for i, symbol in enumerate(symbols):
+        df = frames[symbol]
+        ipo_open[i] = df['Open'].iloc[0]
+        close = df['Close'].to_numpy(dtype=float)[:rows]
+        closes[i, :len(close)] = close
+    return symbols, ipo_open, closes
+
+
+def quarterly_return_matrix(ipo_open: np.ndarray, closes: np.ndarray,
+                            step: int = QUARTER_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    % change of the close every `step` rows relative to the IPO open, for all symbols at once.
+    Returns (row offsets, symbols x quarters matrix).
+    """
+    offsets = np.arange(0, closes.shape[1], step)
+    base = ipo_open[:, None]
+    return offsets, (closes[:, ::step] - base) / base * 100
+
+
+@dataclass
+class QuarterlyReturns:
+    symbols: np.ndarray
+    months: np.ndarray
+    offsets: np.ndarray
+    returns: np.ndarray
+    # Symbols the loader returned nothing for, with when they failed (epoch seconds)
+    failed: np.ndarray = field(default_factory=lambda: np.array([], dtype=str))
+    failed_at: np.ndarray = field(default_factory=lambda: np.array([], dtype=float))
+
+    @classmethod
+    def empty(cls, step: int = QUARTER_ROWS, rows: int = WINDOW_ROWS) -> "QuarterlyReturns":
+        offsets = np.arange(0, rows, step)
+        return cls(np.array([], dtype=str), np.array([], dtype=str), offsets, np.empty((0, len(offsets))))
+
+    def save(self, path: str = QUARTERLY_RETURNS_PATH) -> Path:
+        file_path = Path(os.path.join(os.getcwd(), path))
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'wb') as f:
+            np.savez(f, symbols=self.symbols, months=self.months, offsets=self.offsets, returns=self.returns,
+                     failed=self.failed, failed_at=self.failed_at)
+        return file_path
+
+    @classmethod
+    def load(cls, path: str = QUARTERLY_RETURNS_PATH) -> "QuarterlyReturns":
+        with np.load(Path(os.path.join(os.getcwd(), path))) as data:
+            if 'failed' not in data.files:
+                return cls(data['symbols'], data['months'], data['offsets'], data['returns'])
+            return cls(data['symbols'], data['months'], data['offsets'], data['returns'],
+                       data['failed'], data['failed_at'])
+
+    def select(self, month_from: Optional[str] = None, month_to: Optional[str] = None) -> "QuarterlyReturns":
+        mask = np.ones(len(self.symbols), dtype=bool)
+        if month_from is not None:
+            mask &= self.months >= month_from
+        if month_to is not None:
+            mask &= self.months <= month_to
+        return QuarterlyReturns(self.symbols[mask], self.months[mask], self.offsets, self.returns[mask])
+
+    def summary(self, quantiles: Tuple[float, ...] = (0.25, 0.5, 0.75)) -> pd.DataFrame:
+        """
+        Per quarter: number of symbols with data, mean and the requested quantiles of the % change.
+        """
+        counts = np.sum(~np.isnan(self.returns), axis=0)
+        out = {'count': counts}
+        # Quarters nobody reached are all-NaN columns; their mean / quantiles are NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            out['mean'] = np.nanmean(self.returns, axis=0)
+            for q, values in zip(quantiles, np.nanquantile(self.returns, quantiles, axis=0)):
+                out[f"q{int(round(q * 100))}"] = values
+        return pd.DataFrame(out, index=pd.Index(self.offsets, name='row'))
+
+
+def build_quarterly_returns(symbols_by_month: Dict[str, List[str]], path: str = QUARTERLY_RETURNS_PATH,
+                            loader: Loader = load_ipo_windows, refresh: bool = False,
+                            retry_failed_after: Optional[float] = None) -> QuarterlyReturns:
+    """
+    Quarterly return matrix for the given symbols. Symbols already in the saved matrix are
+    reused; only new ones are loaded, and the merged matrix is written back. Symbols that
+    fail to load are saved as failed and not tried again until `refresh`, or until
+    `retry_failed_after` seconds have passed since they failed.
+    """
+    month_of = {s: month for month, symbols in symbols_by_month.items() for s in symbols}
+    file_path = Path(os.path.join(os.getcwd(), path))
+    saved = QuarterlyReturns.load(path) if file_path.exists() and not refresh else QuarterlyReturns.empty()
+
+    now = time.time()
+    retry = np.zeros(len(saved.failed), dtype=bool)
+    if retry_failed_after is not None:
+        retry = now - saved.failed_at >= retry_failed_after
+    known = set(saved.symbols.tolist()) | set(saved.failed[~retry].tolist())
+    missing = [s for s in month_of if s not in known]
+    if missing:
+        symbols, ipo_open, closes = price_arrays(loader(missing, WINDOW_ROWS))
+        offsets, returns = quarterly_return_matrix(ipo_open, closes)
+        failed = [s for s in missing if s not in set(symbols)]
+        still_failed = ~np.isin(saved.failed, missing)
+        saved = QuarterlyReturns(np.concatenate([saved.symbols, np.array(symbols, dtype=str)]),
+                                 np.concatenate([saved.months, np.array([month_of[s] for s in symbols], dtype=str)]),
+                                 offsets, np.vstack([saved.returns, returns]),
+                                 np.concatenate([saved.failed[still_failed], np.array(failed, dtype=str)]),
+                                 np.concatenate([saved.failed_at[still_failed], np.full(len(failed), now)]))
+        saved.save(path)
+        if failed:
+            print(f"{len(failed)} symbols could not be loaded; skipped until refresh")
+
+    keep = np.isin(saved.symbols, list(month_of))
+    keep_failed = np.isin(saved.failed, list(month_of))
+    return QuarterlyReturns(saved.symbols[keep], saved.months[keep], saved.offsets, saved.returns[keep],
+                            saved.failed[keep_failed], saved.failed_at[keep_failed])
+
+
+def day_ratio_matrix(ipo_price: np.ndarray, closes: np.ndarray, days: int) -> np.ndarray:
+    """
+    close / IPO price for trading days D1..D`days` of every symbol (symbols x days).
+    """
+    return closes[:, :days] / ipo_price[:, None]
+
+
+class DayReturnStore:
+    """
+    One file per IPO month with the (symbols x days) close / IPO price matrix and a quantile
+    sketch per day. Boxplots over a month range merge the months' sketches without reading
+    the matrices or any raw bars; adding a month writes only that month's file.
+    """
+
+    def __init__(self, root: str = DAY_RETURNS_ROOT, days: int = WINDOW_ROWS, relative_accuracy: float = 0.01):
+        self.root = Path(os.path.join(os.getcwd(), root))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.days = days
+        self.relative_accuracy = relative_accuracy
+
+    def _path(self, month: str) -> Path:
+        return self.root / f"{month}.npz"
+
+    def months(self, month_from: Optional[str] = None, month_to: Optional[str] = None) -> List[str]:
+        months = sorted(p.stem for p in self.root.glob("*.npz"))
+        return [m for m in months if (month_from is None or m >= month_from) and (month_to is None or m <= month_to)]
+
+    def add_month(self, month: str, symbols: List[str], ipo_prices: Optional[Dict[str, float]] = None,
+                  loader: Loader = load_ipo_windows, refresh: bool = False) -> LogHistogramSketch:
+        """
+        Build and save a month's matrix and sketch. The offering price from `ipo_prices` is used
+        where known, the first open otherwise. A month already saved from the same symbols and
+        offering prices is not rebuilt unless `refresh`.
+        """
+        path = self._path(month)
+        ipo_prices = ipo_prices or {}
+        inputs = feature_key(sorted(set(symbols)), {s: ipo_prices.get(s) for s in sorted(set(symbols))})
+        if path.exists() and not refresh and self._inputs(month) == inputs:
+            return self._load_sketch(month)
+
+        symbols, ipo_open, closes = price_arrays(loader(symbols, self.days), self.days)
+        price = np.array([ipo_prices.get(s) or o for s, o in zip(symbols, ipo_open)], dtype=float)
+        ratios = day_ratio_matrix(price, closes, self.days)
+        sketch = LogHistogramSketch(self.days, self.relative_accuracy)
+        sketch.add(ratios)
+
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, symbols=np.array(symbols, dtype=str), ratios=ratios.astype(np.float32),
+                                inputs=np.array(inputs), **sketch.to_arrays())
+        os.replace(tmp_path, path)
+        return sketch
+
+    def _inputs(self, month: str) -> Optional[str]:
+        """
+        Hash of the symbols and offering prices a saved month was built from (None for months
+        saved before it was recorded).
+        """
+        with np.load(self._path(month)) as data:
+            return str(data['inputs']) if 'inputs' in data.files else None
+
+    def _load_sketch(self, month: str) -> LogHistogramSketch:
+        # npz members are read on access, so the ratio matrix is never loaded here
+        with np.load(self._path(month)) as data:
+            return LogHistogramSketch.from_arrays({k: data[k] for k in ('counts', 'min', 'max', 'params')})
+
+    def sketch(self, month_from: Optional[str] = None, month_to: Optional[str] = None) -> LogHistogramSketch:
+        merged = LogHistogramSketch(self.days, self.relative_accuracy)
+        for month in self.months(month_from, month_to):
+            merged.merge(self._load_sketch(month))
+        return merged
+
+    def matrix(self, month_from: Optional[str] = None,
+               month_to: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (symbols, months, symbols x days % change from IPO price) for the month range.
+        """
+        symbols, months, ratios = [], [], []
+        for month in self.months(month_from, month_to):
+            with np.load(self._path(month)) as data:
+                symbols.append(data['symbols'])
+                months.append(np.full(len(data['symbols']), month))
+                ratios.append(data['ratios'])
+        if not ratios:
+            return np.array([], dtype=str), np.array([], dtype=str), np.empty((0, self.days))
+        return np.concatenate(symbols), np.concatenate(months), (np.vstack(ratios).astype(float) - 1) * 100
+
+
+def boxplot_stats(sketch: LogHistogramSketch, num_days: Optional[int] = None, whis: float = 1.5) -> List[Dict]:
+    """
+    Per-day box statistics in % change from IPO price, in the form Axes.bxp takes. Whiskers
+    reach `whis` x IQR, clipped to the observed min / max.
+    """
+    num_days = num_days or sketch.size
+    q1, med, q3 = ((sketch.quantiles([0.25, 0.5, 0.75])[:, :num_days] - 1) * 100)
+    low, high = (sketch.min[:num_days] - 1) * 100, (sketch.max[:num_days] - 1) * 100
+    iqr = q3 - q1
+    stats = []
+    for day in range(num_days):
+        if np.isnan(med[day]):
+            continue
+        stats.append({'label': f"D{day + 1}", 'med': med[day], 'q1': q1[day], 'q3': q3[day],
+                      'whislo': max(q1[day] - whis * iqr[day], low[day]),
+                      'whishi': min(q3[day] + whis * iqr[day], high[day]),
+                      'fliers': []})
+    return stats
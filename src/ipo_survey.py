@@ -0,0 +1,169 @@
+import ast
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
+
+ELIGIBLE_ROWS = 1500
+
+
+def read_legacy_month_symbols(file_path: str = "data/ipo-dataset/all_ipo.txt", skip_lines: int = 64) -> Dict[str, List[str]]:
+    """
+    Parse the `"Mon YYYY": ['SYM', ...],` lines of all_ipo.txt the same way fetch_overall_ipo_data does.
+    """
+    symbols_by_month = {}
+    with open(Path(os.path.join(os.getcwd(), file_path)), 'r') as file:
+        for i in range(skip_lines):
+            next(file)
+        for line in file:
+            symbols_by_month[line[1:8]] = ast.literal_eval(line[11:-2])
+    return symbols_by_month
+
+
+class AdaptiveBatchScheduler:
+    """
+    Additive-increase / multiplicative-decrease batch sizing: grow the batch after every
+    clean batch, halve it and back off exponentially whenever Yahoo rate limits us.
+    """
+
+    def __init__(self, batch_size: int = 50, min_size: int = 5, max_size: int = 200,
+                 step: int = 10, backoff: float = 5.0, max_backoff: float = 300.0):
+        self.batch_size = batch_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.step = step
+        self.base_backoff = backoff
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def on_success(self):
+        self.batch_size = min(self.max_size, self.batch_size + self.step)
+        self.backoff = self.base_backoff
+
+    def on_rate_limit(self):
+        self.batch_size = max(self.min_size, self.batch_size // 2)
+        time.sleep(self.backoff)
+        self.backoff = min(self.max_backoff, self.backoff * 2)
+
+
+def _close_count(data: pd.DataFrame, symbol: str) -> int:
+    if isinstance(data.columns, pd.MultiIndex):
+        if symbol not in data.columns.get_level_values(0):
+            return 0
+        close = data[symbol]['Close']
+    else:
+        close = data['Close'] if 'Close' in data.columns else pd.Series(dtype=float)
+    return int(close.notna().sum())
+
+
+def download_row_counts(symbols: List[str], provider=yf) -> Tuple[Dict[str, int], List[str]]:
+    """
+    (number of daily bars with a Close per symbol, rate-limited symbols), using one
+    multi-ticker download. yf.download swallows per-ticker errors, so a rate limit only shows
+    as a batch that came back without a single bar. Only then is one symbol probed with
+    Ticker.history, which raises YFRateLimitError: if it does, the whole batch is returned as
+    rate limited, without counts. Otherwise empty symbols are delisted and count as 0.
+    """
+    data = provider.download(symbols, period="max", group_by='ticker', progress=False, threads=True)
+    counts = {symbol: _close_count(data, symbol) for symbol in symbols}
+    if any(counts.values()):
+        return counts, []
+    try:
+        history = provider.Ticker(symbols[0]).history(period="max")
+    except YFRateLimitError:
+        return {}, list(symbols)
+    except Exception:
+        return counts, []
+    if 'Close' in history.columns:
+        counts[symbols[0]] = int(history['Close'].notna().sum())
+    return counts, []
+
+
+def survey_row_counts(symbols: List[str], checkpoint_path: str = "data/ipo-dataset/survey_checkpoint.json",
+                      scheduler: Optional[AdaptiveBatchScheduler] = None, provider=yf,
+                      max_requeues: int = 3) -> Dict[str, int]:
+    """
+    Row counts for all symbols, downloaded in adaptive multi-ticker batches.
+    Counts are checkpointed after every batch, so an interrupted survey resumes where it stopped.
+    Rate-limited symbols are not checkpointed; they go back in the queue after a backoff, at most
+    `max_requeues` times each. Symbols still rate limited after that are left for the next run.
+    """
+    scheduler = scheduler or AdaptiveBatchScheduler()
+    path = Path(os.path.join(os.getcwd(), checkpoint_path))
+    counts = {}
+    if path.exists():
+        with open(path, 'r') as f:
+            counts = json.load(f)
+
+    pending = [s for s in dict.fromkeys(symbols) if s not in counts]
+    requeues = {}
+    given_up = []
+    while pending:
+        batch = pending[:scheduler.batch_size]
+        try:
+            batch_counts, limited = download_row_counts(batch, provider)
+        except YFRateLimitError:
+            batch_counts, limited = {}, batch
+
+        counts.update(batch_counts)
+        for symbol in limited:
+            requeues[symbol] = requeues.get(symbol, 0) + 1
+        given_up += [s for s in limited if requeues[s] > max_requeues]
+        # Rate-limited symbols move to the back of the queue
+        pending = ([s for s in pending if s not in batch]
+                   + [s for s in limited if requeues[s] <= max_requeues])
+
+        if batch_counts:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(counts, f)
+        print(f"Surveyed {len(counts)} symbols, {len(pending)} left (batch size {scheduler.batch_size})")
+
+        if limited:
+            scheduler.on_rate_limit()
+        else:
+            scheduler.on_success()
+    if given_up:
+        print(f"Still rate limited after {max_requeues} requeues, left for the next run: {given_up}")
+    return counts
+
+
+def survey_ipo_universe(symbols_by_month: Dict[str, List[str]], min_rows: int = ELIGIBLE_ROWS,
+                        **kwargs) -> Dict[str, Dict]:
+    """
+    Per month: total symbols, how many could not be fetched, how many have fewer than
+    `min_rows` bars and the eligible (>= min_rows) symbols.
+    """
+    all_symbols = [s for symbols in symbols_by_month.values() for s in symbols]
+    counts = survey_row_counts(all_symbols, **kwargs)
+    return summarize_survey(symbols_by_month, counts, min_rows)
+
+
+def summarize_survey(symbols_by_month: Dict[str, List[str]], counts: Dict[str, int],
+                     min_rows: int = ELIGIBLE_ROWS) -> Dict[str, Dict]:
+    survey = {}
+    for month, symbols in symbols_by_month.items():
+        eligible = [s for s in symbols if counts.get(s, 0) >= min_rows]
+        unable_to_fetch = sum(1 for s in symbols if counts.get(s, 0) == 0)
+        survey[month] = {
+            'total': len(symbols),
+            'eligible': len(eligible),
+            'too_short': len(symbols) - len(eligible) - unable_to_fetch,
+            'unable_to_fetch': unable_to_fetch,
+            'eligible_symbols': eligible,
+        }
+    return survey
+
+
+def format_survey_line(month: str, symbols: List[str], stats: Dict) -> str:
+    """
+    The all_ipo_data.txt line layout: month: symbols, (total, >=1500, <1500, unfetchable)[eligible]
+    """
+    return (f"{month}: {symbols}, "
+            f"({stats['total']}, {stats['eligible']}, {stats['too_short']}, {stats['unable_to_fetch']})"
+            f"{str(stats['eligible_symbols'])}")
@@ -11,27 +11,21 @@ import matplotlib.pyplot as plt
 import finplot as fplt
 
 from config import DESIRED_YEAR, DESIRED_MONTH
+from storage.ipo_store import load_ipo_bars
+from pipeline.resample import resample_ohlcv
 
 def finplot():
     print("\n############# COMMAND TO KILL PROCESS: #############\n"
             "ps | grep mplfinance | awk '{print $1}' | xargs kill\n"
             "####################################################\n")
 
-    # Load the CSV file into a DataFrame
-    csv_path = Path(os.path.join(os.getcwd(), f"data/ipo-dataset/2016/1/ANAB.csv"))
-    df = pd.read_csv(csv_path)
+    # Load the typed bars from the partitioned store (reads only this IPO's partition and columns)
+    df = load_ipo_bars(['Open', 'High', 'Low', 'Close'], years=[2016], months=[1], symbols=['ANAB'])
 
-    # Group the rows into batches of 250 (Year on Year)
-    df['YoY'] = df.index // 250
     print(df)
 
-    # Aggregate required values for each batch
-    result = df.groupby('YoY').agg({
-        'High': 'max',  # Highest "High"
-        'Low': 'min',   # Lowest "Low"
-        'Open': 'first',  # First day's "Open"
-        'Close': 'last'   # Last day's "Close"
-    }).reset_index()
+    # Aggregate every 250 trading days (Year on Year): first Open, max High, min Low, last Close
+    result = resample_ohlcv(df.set_index('Date'), '250td').reset_index()
 
     # Rename the columns for clarity
     # result.rename(columns={'High': 'Highest High', 'Low': 'Lowest Low'}, inplace=True)
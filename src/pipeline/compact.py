@@ -0,0 +1,70 @@
+import sys
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+# yfinance columns the pipeline never reads
+UNUSED_COLUMNS = ['Dividends', 'Stock Splits', 'Capital Gains']
+
+
+def compact_volume(volume: pd.Series) -> pd.Series:
+    """
+    Smallest exact integer dtype for a volume column (uint32 when it fits); float32 if it has NaNs.
+    """
+    if volume.isna().any():
+        return volume.astype('float32')
+    if len(volume) == 0 or (volume.min() >= 0 and volume.max() < 2 ** 32):
+        return volume.astype('uint32')
+    return volume.astype('int64')
+
+
+def compact_ohlcv(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                  symbol: Optional[str] = None) -> pd.DataFrame:
+    """
+    Project to `columns` (or drop the unused yfinance columns), store prices as float32,
+    volume as uint32 and, when `symbol` is given, add a categorical symbol column.
+    """
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    else:
+        df = df.drop(columns=UNUSED_COLUMNS, errors='ignore')
+    df = df.copy()
+    for column in df.columns:
+        if column in PRICE_COLUMNS:
+            df[column] = df[column].astype('float32')
+        elif column == 'Volume':
+            df[column] = compact_volume(df[column])
+    if symbol is not None:
+        df['symbol'] = pd.Categorical([symbol] * len(df))
+    return df
+
+
+def memory_footprint(data: Union[pd.DataFrame, Dict[str, pd.DataFrame]]) -> int:
+    """
+    Bytes held by a frame or a dict of frames (index included, object columns measured deeply).
+    """
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True, index=True).sum())
+    return sum(memory_footprint(df) for df in data.values())
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Peak resident set size of the process in bytes, or None where the resource module is
+    missing (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_bytes(n: int) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if n < 1024 or unit == 'GB':
+            return f"{n:.1f} {unit}"
+        n /= 1024
@@ -0,0 +1,114 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from yfinance.exceptions import YFRateLimitError
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting how many requests start per second.
+    `rate` tokens are added per second up to `capacity`; each request takes one.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of fetching a single symbol
+    """
+    symbol: str
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class FetchReport:
+    """
+    Per-symbol results of a concurrent fetch, in the order the symbols were given
+    """
+    results: Dict[str, FetchResult] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> List[str]:
+        return [s for s, r in self.results.items() if r.ok]
+
+    @property
+    def failed(self) -> Dict[str, str]:
+        return {s: r.error for s, r in self.results.items() if not r.ok}
+
+    def values(self) -> Dict[str, Any]:
+        return {s: r.value for s, r in self.results.items() if r.ok}
+
+
+def fetch_with_retry(symbol: str,
+                     fetch_one: Callable[[str], Any],
+                     limiter: Optional[TokenBucket] = None,
+                     max_retries: int = 3,
+                     backoff: float = 1.0) -> FetchResult:
+    """
+    Fetch one symbol, retrying with exponential backoff (backoff, 2*backoff, ...)
+    when yfinance reports a rate limit. Any other error fails the symbol immediately.
+    """
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            value = fetch_one(symbol)
+            return FetchResult(symbol, True, value=value, attempts=attempt,
+                               elapsed=time.monotonic() - start)
+        except YFRateLimitError as e:
+            if attempt > max_retries:
+                return FetchResult(symbol, False, error=f"rate limited: {e}", attempts=attempt,
+                                   elapsed=time.monotonic() - start)
+            time.sleep(backoff * 2 ** (attempt - 1))
+        except Exception as e:
+            return FetchResult(symbol, False, error=str(e), attempts=attempt,
+                               elapsed=time.monotonic() - start)
+
+
+def fetch_concurrently(symbols: List[str],
+                       fetch_one: Callable[[str], Any],
+                       max_workers: int = 8,
+                       requests_per_second: Optional[float] = 2.0,
+                       max_retries: int = 3,
+                       backoff: float = 1.0) -> FetchReport:
+    """
+    Run `fetch_one` for every symbol on a bounded thread pool sharing one token bucket.
+    `requests_per_second=None` disables rate limiting.
+    """
+    limiter = TokenBucket(requests_per_second) if requests_per_second else None
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(fetch_with_retry, symbol, fetch_one, limiter, max_retries, backoff)
+                   for symbol in symbols]
+        report = FetchReport()
+        for symbol, future in zip(symbols, futures):
+            report.results[symbol] = future.result()
+    return report
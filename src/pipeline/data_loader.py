@@ -1,65 +1,164 @@
 import yfinance as yf
 import pandas as pd
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import numpy as np
 
 from datetime import datetime, timedelta
 
+from src.pipeline.compact import compact_ohlcv
+from src.pipeline.concurrent_fetcher import FetchReport, fetch_concurrently
+from src.storage.ohlcv_cache import Fetcher, OHLCVCache
 
-def fetch_stock_data(symbols: List[str]) -> Dict[str, pd.DataFrame]:
-    """
-    Fetch historical data for multiple stocks using yfinance
-    Returns dictionary of DataFrames with max 1500 rows (first 6 years of data)
-    """
-    stock_data = {}
 
-    for symbol in symbols:
-        try:
-            # Fetch data
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period="max")
+TRADING_DAYS_PER_YEAR = 252
 
-            # Keep only first 1500 rows if more data is fetched
-            if len(df) > 1500:
-                df = df.head(1500)
-            # elif len(df) < 1450:
-            #     return None
 
-            # Drop columns 'Open', 'High', 'Low'
-            df.drop(['Open', 'High', 'Low'], axis=1)
+def first_trade_date(symbol: str, provider=yf, cache: Optional[OHLCVCache] = None) -> Optional[pd.Timestamp]:
+    """
+    First traded date from the history metadata (a 5-day probe), or None if Yahoo has none.
+    With a cache the probed date is kept there and later calls do not probe again.
+    """
+    if cache is not None:
+        first = cache.first_trade_date(symbol)
+        if first is not None:
+            return first
+    metadata = provider.Ticker(symbol).get_history_metadata()
+    first = metadata.get('firstTradeDate') if metadata else None
+    if first is None:
+        return None
+    first = pd.Timestamp(first, unit='s') if isinstance(first, (int, float)) else pd.Timestamp(first)
+    first = first.tz_localize(None) if first.tzinfo is not None else first
+    if cache is not None:
+        cache.set_first_trade_date(symbol, first)
+    return first
+
+
+def fetch_ipo_window(symbol: str, ipo_date=None, rows: Optional[int] = 1500, days: Optional[int] = None,
+                     provider=yf, max_extensions: int = 3, cache: Optional[OHLCVCache] = None,
+                     **history_kwargs) -> pd.DataFrame:
+    """
+    Fetch only the first `rows` trading days (or `days` calendar days) after the IPO
+    instead of the full history. Without an `ipo_date` the first traded date is probed
+    (once per symbol when a `cache` is given).
+    """
+    start = pd.Timestamp(ipo_date) if ipo_date is not None else first_trade_date(symbol, provider, cache)
+    if start is None:
+        return pd.DataFrame()
+    ticker = provider.Ticker(symbol)
+
+    if days is not None:
+        return ticker.history(start=start, end=start + pd.Timedelta(days=days), **history_kwargs)
+
+    # Calendar span for `rows` trading days plus a margin for holidays
+    span = pd.Timedelta(days=int(rows * 365.25 / TRADING_DAYS_PER_YEAR * 1.05) + 10)
+    end = start + span
+    df = ticker.history(start=start, end=end, **history_kwargs)
+    today = pd.Timestamp.today()
+    for i in range(max_extensions):
+        if len(df) >= rows or end >= today:
+            break
+        missing = rows - len(df)
+        tail_start = end
+        end = end + pd.Timedelta(days=int(missing * 365.25 / TRADING_DAYS_PER_YEAR * 1.2) + 10)
+        df = pd.concat([df, ticker.history(start=tail_start, end=end, **history_kwargs)])
+    return df.head(rows)
+
+
+def ipo_window_fetcher(provider=yf, rows: int = 1500, cache: Optional[OHLCVCache] = None) -> Fetcher:
+    """
+    OHLCVCache fetcher for IPO windows: a miss fetches the first `rows` trading days with
+    fetch_ipo_window, a tail refresh (a window still short of `rows`) everything from `start` on.
+    """
+    def fetch(symbol: str, interval: str, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+        if start is None:
+            return fetch_ipo_window(symbol, rows=rows, provider=provider, cache=cache, interval=interval)
+        return provider.Ticker(symbol).history(start=start, interval=interval)
+    return fetch
+
+
+def _history_fetcher(provider, cache: Optional[OHLCVCache] = None, compact: bool = False,
+                     columns: Optional[List[str]] = None) -> Callable[[str], pd.DataFrame]:
+    def fetch_one(symbol: str) -> pd.DataFrame:
+        # Fetch data, going through the on-disk cache when one is given
+        if cache is not None:
+            df = cache.get(symbol, "1d", fetch=ipo_window_fetcher(provider, rows=1500, cache=cache),
+                           max_rows=1500)
+        else:
+            df = fetch_ipo_window(symbol, rows=1500, provider=provider)
+
+        # Keep only first 1500 rows if more data is fetched
+        if len(df) > 1500:
+            df = df.head(1500)
+        # elif len(df) < 1450:
+        #     return None
+
+        # Drop columns 'Open', 'High', 'Low'
+        df = df.drop(['Open', 'High', 'Low'], axis=1, errors='ignore')
+
+        # float32 prices, uint32 volume and only the requested columns
+        if compact:
+            df = compact_ohlcv(df, columns, symbol)
+        elif columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df
+    return fetch_one
+
+
+def _info_fetcher(provider, selected_attributes: List[str]) -> Callable[[str], Dict]:
+    def fetch_one(symbol: str) -> Dict:
+        # Fetch stock info
+        ticker = provider.Ticker(symbol)
+        info = ticker.info
+
+        # Filter only selected attributes
+        return {attr: info.get(attr) for attr in selected_attributes if attr in info}
+    return fetch_one
+
+
+def fetch_stock_data_report(symbols: List[str], provider=yf, max_workers: int = 8,
+                            requests_per_second: Optional[float] = 2.0, max_retries: int = 3,
+                            cache: Optional[OHLCVCache] = None, compact: bool = False,
+                            columns: Optional[List[str]] = None) -> FetchReport:
+    """
+    Fetch historical data for multiple stocks concurrently
+    Returns a FetchReport with the DataFrame (max 1500 rows) or the error for every symbol
+    """
+    return fetch_concurrently(symbols, _history_fetcher(provider, cache, compact, columns), max_workers=max_workers,
+                              requests_per_second=requests_per_second, max_retries=max_retries)
 
-            # Store in dictionary
-            stock_data[symbol] = df
 
-            print(f"Successfully fetched data for {symbol}: {len(df)} rows")
-        except Exception as e:
-            print(f"Error fetching data for {symbol}: {str(e)}")
+def fetch_stock_info_report(symbols: List[str], selected_attributes: List[str], provider=yf, max_workers: int = 8,
+                            requests_per_second: Optional[float] = 2.0, max_retries: int = 3) -> FetchReport:
+    """
+    Fetch fundamental data for multiple stocks concurrently
+    Returns a FetchReport with the filtered info dict or the error for every symbol
+    """
+    return fetch_concurrently(symbols, _info_fetcher(provider, selected_attributes), max_workers=max_workers,
+                              requests_per_second=requests_per_second, max_retries=max_retries)
 
-    return stock_data
 
+def fetch_stock_data(symbols: List[str], provider=yf, max_workers: int = 8,
+                     requests_per_second: Optional[float] = 2.0, max_retries: int = 3,
+                     cache: Optional[OHLCVCache] = None, compact: bool = False,
+                     columns: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch historical data for multiple stocks using yfinance
+    Returns dictionary of DataFrames with max 1500 rows (first 6 years of data)
+    """
+    report = fetch_stock_data_report(symbols, provider, max_workers, requests_per_second, max_retries, cache,
+                                     compact, columns)
+    return report.values()
 
-def fetch_stock_info(symbols: List[str], selected_attributes: List[str]) -> Dict[str, Dict]:
+
+def fetch_stock_info(symbols: List[str], selected_attributes: List[str], provider=yf, max_workers: int = 8,
+                     requests_per_second: Optional[float] = 2.0, max_retries: int = 3) -> Dict[str, Dict]:
     """
     Fetch fundamental data for stocks using yfinance
     Returns dictionary of attributes for each stock
     """
-    stock_info = {}
-
-    for symbol in symbols:
-        try:
-            # Fetch stock info
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            # Filter only selected attributes
-            filtered_info = {attr: info.get(attr) for attr in selected_attributes if attr in info}
-            stock_info[symbol] = filtered_info
-
-            print(f"Successfully fetched info for {symbol}")
-        except Exception as e:
-            print(f"Error fetching info for {symbol}: {str(e)}")
-
-    return stock_info
+    report = fetch_stock_info_report(symbols, selected_attributes, provider, max_workers,
+                                     requests_per_second, max_retries)
+    return report.values()
 
 
 def calculate_returns(stock_data: Dict[str, pd.DataFrame], start_row: int, end_row: int) -> pd.Series:
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def _update_hash(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(b"frame")
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr(list(obj.columns)).encode())
+            h.update(repr([str(t) for t in obj.dtypes]).encode())
+    elif isinstance(obj, np.ndarray):
+        h.update(b"array")
+        h.update(str(obj.dtype).encode() + repr(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj, key=str):
+            _update_hash(h, str(key))
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"list")
+        for item in obj:
+            _update_hash(h, item)
+    else:
+        h.update(json.dumps(obj, sort_keys=True, default=repr).encode())
+
+
+def feature_key(*parts) -> str:
+    """
+    Content hash of the input bars and the feature spec / parameters. Frames are hashed
+    by value (index, columns and dtypes included), so identical inputs share a key.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+
+def _sizeof(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class FeatureCache:
+    """
+    Two-tier LRU cache for computed features. Values are kept in memory up to
+    `memory_bytes` and written to disk (pickle) so later runs hit too; the disk tier
+    is trimmed to `disk_bytes` by least recent use.
+    """
+
+    def __init__(self, root: str = "data/cache/features", memory_bytes: int = 512 * 1024 ** 2,
+                 disk_bytes: int = 4 * 1024 ** 3):
+        self.root = Path(os.path.join(os.getcwd(), root))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'memory_evictions': 0, 'disk_evictions': 0}
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return True, self._memory[key][0]
+
+        path = self._path(key)
+        if path.exists():
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+            with self._lock:
+                self.stats['disk_hits'] += 1
+            self._remember(key, value)
+            return True, value
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return False, None
+
+    def put(self, key: str, value: Any):
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._remember(key, value)
+        self._trim_disk()
+
+    def _remember(self, key: str, value: Any):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._memory:
+                self._memory_used -= self._memory.pop(key)[1]
+            if size > self.memory_bytes:
+                return
+            self._memory[key] = (value, size)
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_used -= evicted_size
+                self.stats['memory_evictions'] += 1
+
+    def _trim_disk(self):
+        files = sorted(self.root.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.disk_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            self.stats['disk_evictions'] += 1
+
+    def hit_rate(self) -> float:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def report(self) -> Dict[str, Any]:
+        return dict(self.stats, hit_rate=self.hit_rate(), memory_bytes=self._memory_used)
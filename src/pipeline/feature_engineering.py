@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import StandardScaler
 
 
@@ -29,9 +31,121 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+def build_panel(stock_data: Dict[str, pd.DataFrame], fields: List[str], length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Align the first `length` rows of every symbol into one (symbols x days x fields) array,
+    padding shorter histories with NaN. Returns the panel and each symbol's row count.
+    """
+    panel = np.full((len(stock_data), length, len(fields)), np.nan)
+    lengths = np.zeros(len(stock_data), dtype=int)
+    for i, df in enumerate(stock_data.values()):
+        values = df[fields].to_numpy(dtype=float)[:length]
+        panel[i, :len(values)] = values
+        lengths[i] = len(values)
+    return panel, lengths
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    # Rolling mean along the day axis, NaN until the window is full (pandas min_periods=window)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).mean(axis=-1)
+    return out
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).std(axis=-1, ddof=1)
+    return out
+
+
+def panel_aggregate_features(stock_data: Dict[str, pd.DataFrame], length: int = 1250) -> pd.DataFrame:
+    """
+    The per-symbol aggregates of prepare_features (avg_close, avg_volume, avg_volatility,
+    avg_rsi, price_trend) for all symbols in one vectorized pass over the panel.
+    """
+    panel, lengths = build_panel(stock_data, ['Close', 'Volume'], length)
+    close, volume = panel[:, :, 0], panel[:, :, 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Volatility of daily returns
+        daily_return = np.full(close.shape, np.nan)
+        daily_return[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+        volatility = _rolling_std(daily_return, 20)
+
+        # RSI; like Series.where the first (NaN) delta counts as 0 gain and 0 loss
+        delta = np.full(close.shape, np.nan)
+        delta[:, 1:] = np.diff(close, axis=1)
+        valid = np.arange(length)[None, :] < lengths[:, None]
+        gain = np.where(delta > 0, delta, np.where(valid, 0.0, np.nan))
+        loss = np.where(delta < 0, -delta, np.where(valid, 0.0, np.nan))
+        rs = _rolling_mean(gain, 14) / _rolling_mean(loss, 14)
+        rsi = 100 - (100 / (1 + rs))
+
+        rows = np.arange(len(lengths))
+        first_close = close[:, 0]
+        last_close = close[rows, np.maximum(lengths - 1, 0)]
+        features = pd.DataFrame({
+            'avg_close': np.nanmean(close, axis=1),
+            'avg_volume': np.nanmean(volume, axis=1),
+            'avg_volatility': np.nanmean(volatility, axis=1),
+            'avg_rsi': np.nanmean(rsi, axis=1),
+            'price_trend': (last_close - first_close) / first_close,
+        }, index=list(stock_data.keys()))
+    return features
+
+
+@dataclass
+class FeatureState:
+    """
+    What prepare_features learns from the training symbols: the column order, the per-column
+    means used to fill missing values and the fitted scaler. Applying it to new symbols gives
+    rows on the training scale.
+    """
+    feature_names: List[str]
+    fill_values: pd.Series
+    scaler: StandardScaler
+
+    @classmethod
+    def fit(cls, combined_features: pd.DataFrame) -> "FeatureState":
+        # Handle missing values
+        fill_values = combined_features.mean()
+        # Scale features
+        scaler = StandardScaler().fit(combined_features.fillna(fill_values))
+        return cls(list(combined_features.columns), fill_values, scaler)
+
+    def transform(self, combined_features: pd.DataFrame) -> pd.DataFrame:
+        combined_features = combined_features.reindex(columns=self.feature_names).fillna(self.fill_values)
+        scaled_features = self.scaler.transform(combined_features)
+        return pd.DataFrame(scaled_features, index=combined_features.index, columns=self.feature_names)
+
+
 def prepare_features(stock_data: Dict[str, pd.DataFrame],
                      stock_info: Dict[str, Dict],
-                     selected_attributes: List[str]) -> Tuple[pd.DataFrame, List[str]]:
+                     selected_attributes: List[str],
+                     vectorized: bool = False,
+                     state: Optional[FeatureState] = None,
+                     return_state: bool = False):
+    """
+    Scaled features per symbol and their names. A given `state` (from an earlier run) is
+    applied instead of fitting a new one; `return_state` also returns the state used.
+    """
+    combined_features = raw_features(stock_data, stock_info, selected_attributes, vectorized)
+    state = state or FeatureState.fit(combined_features)
+    features = state.transform(combined_features)
+    if return_state:
+        return features, state.feature_names, state
+    return features, state.feature_names
+
+
+def raw_features(stock_data: Dict[str, pd.DataFrame],
+                 stock_info: Dict[str, Dict],
+                 selected_attributes: List[str],
+                 vectorized: bool = False) -> pd.DataFrame:
+    if vectorized:
+        return _raw_features_vectorized(stock_data, stock_info, selected_attributes)
+
     feature_dfs = []
 
     for symbol, df in stock_data.items():
@@ -60,14 +174,17 @@ def prepare_features(stock_data: Dict[str, pd.DataFrame],
         feature_dfs.append(pd.DataFrame([agg_features], index=[symbol]))
 
     # Combine all features
-    combined_features = pd.concat(feature_dfs)
+    return pd.concat(feature_dfs)
 
-    # Handle missing values
-    combined_features = combined_features.fillna(combined_features.mean())
 
-    # Scale features
-    scaler = StandardScaler()
-    feature_names = list(combined_features.columns)
-    scaled_features = scaler.fit_transform(combined_features)
+def _raw_features_vectorized(stock_data: Dict[str, pd.DataFrame],
+                             stock_info: Dict[str, Dict],
+                             selected_attributes: List[str]) -> pd.DataFrame:
+    combined_features = panel_aggregate_features(stock_data)
 
-    return pd.DataFrame(scaled_features, index=combined_features.index, columns=feature_names), feature_names
\ No newline at end of file
+    # Add fundamental attributes (symbols without info get no attribute columns, as in the loop)
+    info = {s: stock_info[s] for s in stock_data if s in stock_info}
+    if info:
+        info = pd.DataFrame.from_dict(info, orient='index').reindex(columns=selected_attributes)
+        combined_features = combined_features.join(info)
+    return combined_features
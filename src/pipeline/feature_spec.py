@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    A named feature request: kind is 'close_ratio', 'trend' or 'macd_diff'
+    """
+    kind: str
+    horizon: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        if self.kind == 'close_ratio':
+            return f"Close_Ratio_{self.horizon}"
+        if self.kind == 'trend':
+            return f"Trend_{self.horizon}"
+        return self.kind
+
+
+def close_ratio(horizon: int) -> Feature:
+    return Feature('close_ratio', horizon)
+
+
+def trend(horizon: int) -> Feature:
+    return Feature('trend', horizon)
+
+
+def macd_diff() -> Feature:
+    return Feature('macd_diff')
+
+
+def ratio_and_trend_spec(horizons: List[int]) -> List[Feature]:
+    spec = []
+    for horizon in horizons:
+        spec += [close_ratio(horizon), trend(horizon)]
+    return spec
+
+
+class _Intermediates:
+    """
+    Lazily computed values shared by every feature of one compute_features call
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._target_cumsum = None
+        self._close_cumsum = None
+
+    def close_cumsum(self):
+        # One cumulative sum of Close serves every ratio horizon. Close is taken relative to its
+        # first value so the running sum stays small and differences of it keep their precision;
+        # NaNs are counted separately so a window holding one gives NaN, as rolling() does
+        if self._close_cumsum is None:
+            close = self.df["Close"].to_numpy(dtype=float)
+            missing = np.isnan(close)
+            base = close[~missing][0] if (~missing).any() else 0.0
+            self._close_cumsum = (base,
+                                  np.concatenate([[0.0], np.cumsum(np.where(missing, 0.0, close - base))]),
+                                  np.concatenate([[0], np.cumsum(missing)]))
+        return self._close_cumsum
+
+    def close_mean(self, horizon: int) -> pd.Series:
+        """
+        df.rolling(horizon).mean()["Close"] (to float rounding): NaN for the first horizon - 1 bars
+        and for windows with a missing close.
+        """
+        base, cumsum, missing = self.close_cumsum()
+        out = np.full(len(self.df), np.nan)
+        if len(self.df) >= horizon:
+            t = np.arange(horizon, len(self.df) + 1)
+            means = base + (cumsum[t] - cumsum[t - horizon]) / horizon
+            out[horizon - 1:] = np.where(missing[t] - missing[t - horizon] > 0, np.nan, means)
+        return pd.Series(out, index=self.df.index)
+
+    def target_cumsum(self) -> np.ndarray:
+        # One cumulative sum of the 0/1 target serves every trend horizon (sums of small ints are exact)
+        if self._target_cumsum is None:
+            self._target_cumsum = np.concatenate([[0.0], np.cumsum(self.df["Target"].to_numpy(dtype=float))])
+        return self._target_cumsum
+
+    def trend(self, horizon: int) -> pd.Series:
+        """
+        df.shift(1).rolling(horizon).sum()["Target"]: the sum of the `horizon` targets before each
+        bar, NaN for the first `horizon` bars (their window reaches the shifted-in NaN).
+        """
+        cumsum = self.target_cumsum()
+        out = np.full(len(self.df), np.nan)
+        if len(self.df) > horizon:
+            t = np.arange(horizon, len(self.df))
+            out[horizon:] = cumsum[t] - cumsum[t - horizon]
+        return pd.Series(out, index=self.df.index)
+
+    def macd_diff(self) -> pd.Series:
+        close = self.df["Close"]
+        macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+        return macd - macd.ewm(span=9).mean()
+
+
+def compute_features(df: pd.DataFrame, spec: List[Feature]) -> pd.DataFrame:
+    """
+    Compute only the requested feature columns, in spec order, reading just Close / Target.
+    """
+    shared = _Intermediates(df)
+    columns = {}
+    for feature in spec:
+        if feature.kind == 'close_ratio':
+            columns[feature.name] = df["Close"] / shared.close_mean(feature.horizon)
+        elif feature.kind == 'trend':
+            columns[feature.name] = shared.trend(feature.horizon)
+        elif feature.kind == 'macd_diff':
+            columns[feature.name] = shared.macd_diff()
+        else:
+            raise ValueError(f"Unknown feature kind: {feature.kind}")
+    return pd.DataFrame(columns, index=df.index)
@@ -0,0 +1,326 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.feature_engineering import raw_features
+from src.pipeline.model_registry import ModelRegistry
+from src.storage.fundamentals_store import FUNDAMENTALS_ROOT, FundamentalsStore
+from src.storage.ipo_store import IPO_STORE_ROOT, bars_by_symbol, load_ipo_bars
+from src.storage.ohlcv_cache import OHLCVCache
+
+# prepare_features summarizes the first 1250 trading days (years 0-5) of each symbol
+TRAINING_ROWS = 1250
+
+
+def load_local_bars(symbols: List[str], cache: OHLCVCache, root: str = IPO_STORE_ROOT) -> Dict[str, pd.DataFrame]:
+    """
+    Close / Volume of the first TRAINING_ROWS bars from the Parquet store, else from the
+    (offline) OHLCV cache. Symbols in neither are left out; nothing is downloaded.
+    """
+    frames = {}
+    if symbols and Path(os.path.join(os.getcwd(), root, "bars")).exists():
+        frames = bars_by_symbol(load_ipo_bars(['Close', 'Volume'], symbols=symbols, max_rows=TRAINING_ROWS,
+                                              root=root))
+    for symbol in symbols:
+        if symbol not in frames:
+            try:
+                frames[symbol] = cache.get(symbol, "1d").head(TRAINING_ROWS)
+            except KeyError:
+                pass
+    return {s: frames[s] for s in symbols if s in frames and len(frames[s])}
+
+
+class ScoringModel:
+    """
+    A registered model with its feature state, ready to score symbols from local data or
+    precomputed (unscaled) feature rows. Fundamentals come from the sealed snapshot the model
+    was trained on (checked against its recorded hash) unless another `snapshot` is given.
+    """
+
+    def __init__(self, key: Optional[str] = None, name: str = "ipo_pipeline",
+                 registry: Optional[ModelRegistry] = None, cache: Optional[OHLCVCache] = None,
+                 fundamentals: Optional[FundamentalsStore] = None, snapshot: Optional[str] = None):
+        registry = registry or ModelRegistry()
+        # Models registered without their feature state cannot score new symbols
+        self.key = key or next((k for k in registry.find(name) if 'feature_state' in registry.meta(k)['extras']),
+                               None)
+        if self.key is None:
+            raise KeyError(f"No registered {name} model with a feature state; run the pipeline first")
+        self.predictor, self.meta, extras = registry.load(self.key)
+        if 'feature_state' not in extras:
+            raise KeyError(f"Model {self.key} was registered without its feature state")
+        self.state = extras['feature_state']
+        self.attributes = extras.get('selected_attributes', [])
+        self.cache = cache or OHLCVCache(offline=True)
+        if fundamentals is None:
+            # The training snapshot is in the pipeline's store; a given snapshot, or the latest
+            # one for models registered before snapshots were recorded, in the main store
+            inputs = self.meta.get('inputs', {})
+            root = inputs.get('fundamentals_root', FUNDAMENTALS_ROOT) if snapshot is None else FUNDAMENTALS_ROOT
+            fundamentals = FundamentalsStore(root)
+        self.fundamentals = fundamentals
+        self.snapshot = snapshot or self._training_snapshot()
+        self._positive = list(self.predictor.classes_).index(1)
+
+    def score_rows(self, rows: pd.DataFrame) -> np.ndarray:
+        if len(rows) == 0:
+            return np.empty(0)
+        return self.predictor.predict_proba(self.state.transform(rows).to_numpy())[:, self._positive]
+
+    def _training_snapshot(self) -> Optional[str]:
+        inputs = self.meta.get('inputs', {})
+        snapshot = inputs.get('fundamentals_snapshot')
+        if snapshot is None:
+            # Registered before models recorded their snapshot
+            return self.fundamentals.latest()
+        if self.fundamentals.content_hash(snapshot) != inputs['fundamentals_sha256']:
+            raise ValueError(f"Fundamentals snapshot {snapshot} changed since model {self.key} was trained")
+        return snapshot
+
+    def _info(self, symbols: List[str]) -> Dict[str, Dict]:
+        if self.snapshot is None:
+            return {}
+        info = {}
+        for symbol in symbols:
+            values = self.fundamentals.get(symbol, self.snapshot)
+            if values is not None:
+                info[symbol] = values
+        return info
+
+    def score_symbols(self, symbols: List[str]) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """
+        (score per symbol, error per symbol without local bars).
+        """
+        bars = load_local_bars(symbols, self.cache)
+        errors = {s: "no local bars" for s in symbols if s not in bars}
+        if not bars:
+            return {}, errors
+        rows = raw_features(bars, self._info(list(bars)), self.attributes, vectorized=True)
+        return dict(zip(rows.index, self.score_rows(rows).tolist())), errors
+
+
+class MicroBatcher:
+    """
+    Single scoring thread fed by a queue. Requests arriving within `max_wait` seconds of the
+    first one (up to `max_batch`) are scored together: feature rows in one predict_proba call,
+    symbols in one feature computation. Per-request latency is kept for p50 / p99 reporting.
+    """
+
+    def __init__(self, model: ScoringModel, max_batch: int = 64, max_wait: float = 0.005, history: int = 10000):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.latencies = deque(maxlen=history)
+        self.batch_sizes = deque(maxlen=history)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, kind: str, payload) -> Future:
+        """
+        kind 'rows' (DataFrame of unscaled features) or 'symbols' (list of symbols).
+        """
+        if kind not in ('rows', 'symbols'):
+            raise ValueError(f"Unknown request kind {kind}")
+        future = Future()
+        self._queue.put((kind, payload, future, time.perf_counter()))
+        return future
+
+    def score(self, kind: str, payload, timeout: Optional[float] = None):
+        return self.submit(kind, payload).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch):
+        for kind, score in (('rows', self._score_rows), ('symbols', self._score_symbols)):
+            requests = [item for item in batch if item[0] == kind]
+            if not requests:
+                continue
+            try:
+                score(requests)
+            except Exception:
+                # One bad payload must not fail the others: score each request on its own
+                for item in requests:
+                    try:
+                        score([item])
+                    except Exception as e:
+                        item[2].set_exception(e)
+
+        done = time.perf_counter()
+        with self._lock:
+            self.batch_sizes.append(len(batch))
+            self.latencies.extend(done - enqueued for _, _, _, enqueued in batch)
+
+    def _score_rows(self, requests):
+        scores = self.model.score_rows(pd.concat([payload for _, payload, _, _ in requests]))
+        start = 0
+        for _, payload, future, _ in requests:
+            future.set_result(scores[start:start + len(payload)].tolist())
+            start += len(payload)
+
+    def _score_symbols(self, requests):
+        wanted = list(dict.fromkeys(s for _, payload, _, _ in requests for s in payload))
+        scores, errors = self.model.score_symbols(wanted)
+        for _, payload, future, _ in requests:
+            future.set_result({'scores': {s: scores[s] for s in payload if s in scores},
+                               'errors': {s: errors[s] for s in payload if s in errors}})
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = np.array(self.latencies) * 1000
+            batch_sizes = np.array(self.batch_sizes)
+        if len(latencies) == 0:
+            return {'model': self.model.key, 'requests': 0}
+        return {'model': self.model.key, 'requests': len(latencies),
+                'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+                'mean_batch': float(batch_sizes.mean())}
+
+
+def make_handler(batcher: MicroBatcher):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        """
+        POST /score {"symbols": [...]} or {"rows": [{feature: value, ...}, ...]}; GET /stats
+        """
+
+        def _reply(self, status: int, body: Dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, batcher.stats())
+            else:
+                self._reply(404, {'error': f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._reply(404, {'error': f"unknown path {self.path}"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if 'rows' in request:
+                    self._reply(200, {'scores': batcher.score('rows', pd.DataFrame(request['rows'], dtype=float))})
+                elif 'symbols' in request:
+                    self._reply(200, batcher.score('symbols', list(request['symbols'])))
+                else:
+                    self._reply(400, {'error': "expected 'symbols' or 'rows'"})
+            except (ValueError, KeyError, TypeError) as e:
+                self._reply(400, {'error': str(e)})
+            except Exception as e:
+                self._reply(500, {'error': f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(model: ScoringModel, host: str = "127.0.0.1", port: int = 8765, max_batch: int = 64,
+          max_wait: float = 0.005):
+    batcher = MicroBatcher(model, max_batch=max_batch, max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    print(f"Serving {model.key} on http://{host}:{server.server_address[1]} (POST /score, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        print(f"Stats: {batcher.stats()}")
+
+
+def post_json(url: str, body: Dict) -> Dict:
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score newly priced IPOs with a registered model")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="run the local HTTP scoring endpoint")
+    serve_parser.add_argument('--host', default="127.0.0.1")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--max-batch', type=int, default=64)
+    serve_parser.add_argument('--max-wait-ms', type=float, default=5.0)
+
+    score_parser = commands.add_parser('score', help="score symbols or a JSON file of feature rows")
+    score_parser.add_argument('symbols', nargs='*')
+    score_parser.add_argument('--rows', help="JSON file with a list of {feature: value} rows")
+    score_parser.add_argument('--url', help="score through a running service, e.g. http://127.0.0.1:8765")
+
+    for command in (serve_parser, score_parser):
+        command.add_argument('--model', help="registry key (default: latest ipo_pipeline model)")
+        command.add_argument('--snapshot', help="fundamentals snapshot (default: the model's training snapshot)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'score' and args.url:
+        body = {'symbols': args.symbols}
+        if args.rows:
+            with open(args.rows, 'r') as f:
+                body = {'rows': json.load(f)}
+        print(json.dumps(post_json(args.url.rstrip('/') + "/score", body), indent=4))
+        return
+
+    model = ScoringModel(args.model, snapshot=args.snapshot)
+    if args.command == 'serve':
+        serve(model, args.host, args.port, args.max_batch, args.max_wait_ms / 1000)
+        return
+
+    start = time.perf_counter()
+    if args.rows:
+        with open(args.rows, 'r') as f:
+            rows = pd.DataFrame(json.load(f), dtype=float)
+        for n, score in enumerate(model.score_rows(rows)):
+            print(f"row {n}: {score:.4f}")
+    else:
+        scores, errors = model.score_symbols(args.symbols)
+        for symbol, score in sorted(scores.items(), key=lambda item: -item[1]):
+            print(f"{symbol}: {score:.4f}")
+        for symbol, error in errors.items():
+            print(f"{symbol}: {error}")
+    print(f"Scored with {model.key} in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
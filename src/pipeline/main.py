@@ -1,24 +1,62 @@
+from datetime import date
+
 import pandas as pd
 from matplotlib import pyplot as plt
 
 from src.config import selected_attributes
-from src.pipeline.data_loader import fetch_stock_data, fetch_stock_info, calculate_returns
+from src.pipeline.compact import format_bytes, memory_footprint, peak_rss
+from src.pipeline.data_loader import fetch_stock_data_report, fetch_stock_info_report, calculate_returns
+from src.pipeline.feature_cache import FeatureCache, feature_key
 from src.pipeline.feature_engineering import prepare_features
 from src.pipeline.model_evaluator import evaluate_predictions
-from src.pipeline.model_trainer import train_model
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.model_trainer import PARAM_GRID, train_model
+from src.storage.fundamentals_store import PIPELINE_FUNDAMENTALS_ROOT, FundamentalsStore
+from src.storage.ohlcv_cache import OHLCVCache
+
+
+def print_fetch_report(report):
+    for symbol, result in report.results.items():
+        if result.ok:
+            print(f"  {symbol}: ok ({result.attempts} attempt(s), {result.elapsed:.2f}s)")
+        else:
+            print(f"  {symbol}: failed after {result.attempts} attempt(s): {result.error}")
 
 
 def main():
     symbols = ['AAPL', 'MSFT', 'META', 'ADBE', 'BABA', 'SPY', 'TSLA', 'RYI', 'TTOO']
 
     print("1. Fetching stock data...")
-    stock_data = fetch_stock_data(symbols)
+    cache = OHLCVCache()
+    data_report = fetch_stock_data_report(symbols, cache=cache, compact=True, columns=['Close', 'Volume'])
+    stock_data = data_report.values()
+    cache.flush()
+    print_fetch_report(data_report)
+    rss = peak_rss()
+    print(f"  price data in memory: {format_bytes(memory_footprint(stock_data))}"
+          + (f" (process peak RSS {format_bytes(rss)})" if rss is not None else ""))
 
     print("\n2. Fetching stock information...")
-    stock_info = fetch_stock_info(symbols, selected_attributes)
+    info_report = fetch_stock_info_report(symbols, selected_attributes)
+    print_fetch_report(info_report)
+
+    # Train on a sealed fundamentals snapshot, so the model's inputs can be reloaded exactly
+    fundamentals = FundamentalsStore(PIPELINE_FUNDAMENTALS_ROOT)
+    snapshot = f"{date.today().isoformat()}-pipeline-{feature_key(info_report.values())[:8]}"
+    if snapshot not in fundamentals.snapshots():
+        fundamentals.append_many(((s, info, None, None) for s, info in info_report.values().items()), snapshot)
+    inputs = {'fundamentals_root': PIPELINE_FUNDAMENTALS_ROOT, 'fundamentals_snapshot': snapshot,
+              'fundamentals_sha256': fundamentals.seal(snapshot)}
+    stock_info = {s: fundamentals.get(s, snapshot) for s in fundamentals.symbols(snapshot)}
+    print(f"  fundamentals snapshot {snapshot} (sha256 {inputs['fundamentals_sha256'][:12]})")
 
     print("\n3. Preparing features...")
-    X, feature_names = prepare_features(stock_data, stock_info, selected_attributes)
+    feature_cache = FeatureCache()
+    key = feature_key(stock_data, stock_info, selected_attributes, "prepare_features", "state")
+    X, feature_names, feature_state = feature_cache.get_or_compute(
+        key, lambda: prepare_features(stock_data, stock_info, selected_attributes, vectorized=True,
+                                      return_state=True))
+    print(f"  feature cache: {feature_cache.report()}")
 
     # Calculate returns for target period (year 5-6)
     target_returns = calculate_returns(stock_data, 1250, 1500)
@@ -28,16 +66,39 @@ def main():
     y = (target_returns >= threshold).astype(int)
 
     print("\n4. Training model...")
-    model, training_results, feature_importances = train_model(X, y)
+    registry = ModelRegistry()
+    data_hash = feature_key(X, y)
+    model_key = registry.latest("ipo_pipeline", data_hash)
+    if model_key is not None:
+        # Same training data as a registered model: load it instead of retraining
+        model = registry.load_model(model_key)
+        meta = registry.meta(model_key)
+        training_results = {'best_params': {k: meta['params'][k] for k in PARAM_GRID},
+                            'best_score': meta['metrics'].get('cv_roc_auc', float('nan')), 'n_fits': 0, 'n_cached': 0}
+        feature_importances = pd.Series(model.feature_importances_, index=X.columns).sort_values(ascending=False)
+        print(f"  loaded model {model_key} from the registry")
+    else:
+        model, training_results, feature_importances = train_model(X, y, search='halving')
 
     print("\n5. Evaluating predictions...")
     predictions = pd.Series(model.predict_proba(X)[:, 1], index=X.index)
     evaluation, performance_report = evaluate_predictions(y, predictions, target_returns)
+    if model_key is None or meta.get('inputs') != inputs or 'feature_state' not in meta['extras']:
+        # The feature state lets the inference service put new symbols on the training scale;
+        # a reused model registered without it or without this snapshot is registered again
+        # (same key)
+        model_key = registry.register("ipo_pipeline", model, feature_names, data_hash,
+                                      metrics=dict(evaluation, cv_roc_auc=training_results['best_score']),
+                                      extras={'feature_state': feature_state,
+                                              'selected_attributes': selected_attributes},
+                                      inputs=inputs)
+        print(f"  registered model {model_key}")
 
     # Print results
     print("\n=== Model Training Results ===")
     print(f"Best Parameters: {training_results['best_params']}")
     print(f"Cross-validation Score (ROC AUC): {training_results['best_score']:.4f}")
+    print(f"Model fits: {training_results['n_fits']} ({training_results['n_cached']} fold scores from cache)")
 
     print("\n=== Model Evaluation ===")
     print(f"ROC AUC Score: {evaluation['roc_auc']:.4f}")
@@ -0,0 +1,202 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from src.pipeline.feature_cache import feature_key
+
+MODEL_REGISTRY_ROOT = "data/models"
+PACKED_ARRAYS = ('roots', 'left', 'right', 'feature', 'threshold', 'missing_left', 'proba', 'classes')
+
+
+class PackedForest:
+    """
+    A fitted tree ensemble classifier flattened into a few flat node arrays (all trees back to
+    back). Saved as .npy files, it loads with np.load(mmap_mode='r'): processes scoring with the
+    same model share one page-cached copy and nothing is deserialized. predict_proba gives the
+    ensemble's predict_proba (to float rounding): every sample walks all trees at once, one
+    tree level per step. A NaN feature goes to the side the tree sends missing values to.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        for name in PACKED_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.classes_ = self.classes
+
+    @classmethod
+    def from_estimator(cls, model) -> "PackedForest":
+        trees = [e.tree_ for e in model.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        def children(side):
+            parts = []
+            for t, offset in zip(trees, offsets):
+                child = getattr(t, side).astype(np.int64)
+                parts.append(np.where(child == -1, -1, child + offset))
+            return np.concatenate(parts)
+
+        # Leaf class fractions, as DecisionTreeClassifier.predict_proba normalizes them
+        proba = []
+        for t in trees:
+            value = t.value[:, 0, :].astype(np.float64)
+            total = value.sum(axis=1, keepdims=True)
+            total[total == 0] = 1
+            proba.append(value / total)
+        return cls({'roots': offsets.astype(np.int64), 'left': children('children_left'),
+                    'right': children('children_right'),
+                    'feature': np.concatenate([t.feature for t in trees]).astype(np.int64),
+                    'threshold': np.concatenate([t.threshold for t in trees]),
+                    'missing_left': np.concatenate([getattr(t, 'missing_go_to_left', np.zeros(t.node_count))
+                                                    for t in trees]).astype(bool),
+                    'proba': np.concatenate(proba), 'classes': np.asarray(model.classes_)})
+
+    def save(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+        for name in PACKED_ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "PackedForest":
+        return cls({name: np.load(path / f"{name}.npy", mmap_mode='r' if mmap else None)
+                    for name in PACKED_ARRAYS})
+
+    def predict_proba(self, X, chunk_rows: int = 4096) -> np.ndarray:
+        # Trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n_trees = len(self.roots)
+        out = np.empty((len(X), self.proba.shape[1]))
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            # One (sample, tree) position per entry; only those not at a leaf yet are advanced
+            node = np.tile(np.asarray(self.roots), len(chunk))
+            sample = np.repeat(np.arange(len(chunk)), n_trees)
+            active = np.arange(len(node))
+            while len(active):
+                current = node[active]
+                left = self.left[current]
+                inner = left != -1
+                active, current, left = active[inner], current[inner], left[inner]
+                value = chunk[sample[active], self.feature[current]]
+                go_left = np.where(np.isnan(value), self.missing_left[current], value <= self.threshold[current])
+                node[active] = np.where(go_left, left, self.right[current])
+            out[start:start + chunk_rows] = self.proba[node].reshape(len(chunk), n_trees, -1).mean(axis=1)
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class ModelRegistry:
+    """
+    Fitted models on disk, one directory per key: model.joblib (uncompressed, so large arrays
+    can be memory-mapped), extras.joblib (preprocessing state such as fill values / scaler),
+    packed/ for tree ensembles (see PackedForest) and meta.json with the feature list,
+    training-data hash, params, metrics and the versioned inputs it was trained on (e.g. a
+    sealed fundamentals snapshot and its hash). index.json lists every entry for lookups.
+    """
+
+    def __init__(self, root: str = MODEL_REGISTRY_ROOT):
+        self.root = Path(os.path.join(os.getcwd(), root))
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _index(self) -> Dict[str, Dict]:
+        path = self.root / "index.json"
+        if not path.exists():
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _save_index(self, index: Dict[str, Dict]):
+        tmp_path = self.root / "index.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.root / "index.json")
+
+    def register(self, name: str, model, features: List[str], data_hash: str, params: Optional[Dict] = None,
+                 metrics: Optional[Dict] = None, extras: Optional[Dict[str, Any]] = None,
+                 inputs: Optional[Dict[str, str]] = None) -> str:
+        """
+        Save a fitted model; returns its key ("<name>-<hash of data, features and params>").
+        Registering the same model on the same data again replaces the entry.
+        """
+        params = params if params is not None else model.get_params()
+        key = f"{name}-{feature_key(data_hash, features, params)[:12]}"
+        path = self.root / key
+        path.mkdir(parents=True, exist_ok=True)
+
+        joblib.dump(model, path / "model.joblib")
+        if extras:
+            joblib.dump(extras, path / "extras.joblib")
+        if hasattr(model, 'estimators_') and hasattr(model, 'predict_proba') \
+                and all(hasattr(e, 'tree_') for e in model.estimators_):
+            PackedForest.from_estimator(model).save(path / "packed")
+
+        meta = {'key': key, 'name': name, 'features': list(features), 'data_hash': data_hash,
+                'params': {k: v for k, v in params.items() if _is_json(v)},
+                # Undefined metrics (NaN, e.g. ROC AUC over a single class) are left out
+                'metrics': {k: float(v) for k, v in (metrics or {}).items()
+                            if np.isscalar(v) and np.isfinite(v)},
+                'extras': sorted(extras) if extras else [], 'inputs': dict(inputs or {}),
+                'created_at': time.time()}
+        with open(path / "meta.json", 'w') as f:
+            json.dump(meta, f, indent=4)
+
+        index = self._index()
+        index[key] = {k: meta[k] for k in ('name', 'data_hash', 'metrics', 'created_at')}
+        self._save_index(index)
+        return key
+
+    def find(self, name: Optional[str] = None, data_hash: Optional[str] = None) -> List[str]:
+        """
+        Keys matching name / training-data hash, newest first.
+        """
+        entries = [(key, e) for key, e in self._index().items()
+                   if (name is None or e['name'] == name) and (data_hash is None or e['data_hash'] == data_hash)]
+        return [key for key, _ in sorted(entries, key=lambda item: -item[1]['created_at'])]
+
+    def latest(self, name: str, data_hash: Optional[str] = None) -> Optional[str]:
+        keys = self.find(name, data_hash)
+        return keys[0] if keys else None
+
+    def meta(self, key: str) -> Dict:
+        with open(self.root / key / "meta.json", 'r') as f:
+            return json.load(f)
+
+    def load_model(self, key: str, mmap: bool = True):
+        """
+        The fitted estimator, with its numpy arrays memory-mapped where joblib can.
+        """
+        return joblib.load(self.root / key / "model.joblib", mmap_mode='r' if mmap else None)
+
+    def load_predictor(self, key: str, mmap: bool = True):
+        """
+        What to score with: the memory-mapped PackedForest for tree ensembles, else the estimator
+        (also for ensembles packed before missing-value routing was stored).
+        """
+        packed = self.root / key / "packed"
+        if all((packed / f"{name}.npy").exists() for name in PACKED_ARRAYS):
+            return PackedForest.load(packed, mmap)
+        return self.load_model(key, mmap)
+
+    def load_extras(self, key: str) -> Dict[str, Any]:
+        path = self.root / key / "extras.joblib"
+        return joblib.load(path) if path.exists() else {}
+
+    def load(self, key: str, mmap: bool = True) -> Tuple[Any, Dict, Dict[str, Any]]:
+        """
+        (predictor, meta, extras) for a key.
+        """
+        return self.load_predictor(key, mmap), self.meta(key), self.load_extras(key)
+
+
+def _is_json(value) -> bool:
+    try:
+        json.dumps(value)
+        return True
+    except TypeError:
+        return False
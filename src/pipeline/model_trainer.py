@@ -1,34 +1,206 @@
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV
+from sklearn.exceptions import FitFailedWarning
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import GridSearchCV, ParameterGrid, StratifiedKFold
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional
 import joblib
+import json
+import math
+import os
+import time
+import warnings
+from pathlib import Path
 
+from src.pipeline.feature_cache import feature_key
 
-def train_model(X: pd.DataFrame, y: pd.Series) -> Tuple[RandomForestClassifier, Dict, pd.Series]:
+PARAM_GRID = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [None, 10, 20],
+    'min_samples_split': [2, 5],
+    'min_samples_leaf': [1, 2]
+}
+
+
+def train_model(X: pd.DataFrame, y: pd.Series, search: str = 'grid', max_fits: Optional[int] = None,
+                max_seconds: Optional[float] = None,
+                cache_root: str = "data/cache/search") -> Tuple[RandomForestClassifier, Dict, pd.Series]:
+    """
+    Tune a RandomForestClassifier by 5-fold ROC AUC. search='grid' fits every PARAM_GRID
+    combination; search='halving' runs the budgeted successive-halving search below.
+    """
     # Define the model and parameter grid
     base_model = RandomForestClassifier(random_state=42)
-    param_grid = {
-        'n_estimators': [100, 200, 300],
-        'max_depth': [None, 10, 20],
-        'min_samples_split': [2, 5],
-        'min_samples_leaf': [1, 2]
-    }
 
-    # Perform grid search
-    grid_search = GridSearchCV(base_model, param_grid, cv=5, scoring='roc_auc', n_jobs=-1)
-    grid_search.fit(X, y)
+    if search == 'halving':
+        best_estimator, results = halving_search(base_model, X, y, max_fits=max_fits, max_seconds=max_seconds,
+                                                 cache_root=cache_root)
+    elif search == 'grid':
+        # Perform grid search
+        grid_search = GridSearchCV(base_model, PARAM_GRID, cv=5, scoring='roc_auc', n_jobs=-1)
+        grid_search.fit(X, y)
+        best_estimator = grid_search.best_estimator_
+        results = {
+            'best_params': grid_search.best_params_,
+            'best_score': grid_search.best_score_,
+            'n_fits': len(grid_search.cv_results_['params']) * 5,
+            'n_cached': 0
+        }
+    else:
+        raise ValueError(f"Unknown search {search}, expected 'grid' or 'halving'")
 
     # Get feature importances
     feature_importances = pd.Series(
-        grid_search.best_estimator_.feature_importances_,
+        best_estimator.feature_importances_,
         index=X.columns
     ).sort_values(ascending=False)
 
+    return best_estimator, results, feature_importances
+
+
+class FoldScoreCache:
+    """
+    Fold scores on disk, one JSON file per training set, keyed by (params, trees, fold).
+    """
+
+    def __init__(self, data_hash: str, root: str = "data/cache/search"):
+        self.path = Path(os.path.join(os.getcwd(), root, f"{data_hash}.json"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.scores = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.scores = json.load(f)
+
+    @staticmethod
+    def key(params: Dict, resource: int, fold: int) -> str:
+        return feature_key(params, resource, fold)
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.scores, f)
+        os.replace(tmp_path, self.path)
+
+
+def halving_search(base_model, X: pd.DataFrame, y: pd.Series, param_grid: Dict = PARAM_GRID,
+                   resource: str = 'n_estimators', factor: int = 3, n_splits: int = 5,
+                   max_fits: Optional[int] = None, max_seconds: Optional[float] = None,
+                   cache_root: str = "data/cache/search", error_score=np.nan) -> Tuple[RandomForestClassifier, Dict]:
+    """
+    Successive halving with the number of trees as the resource: every combination of the
+    other parameters is scored with few trees, the best 1/`factor` move on to `factor` times
+    more trees, up to the largest value in the grid. Fold scores are cached on disk by
+    (params, trees, fold, data hash), so reruns only fit what is new. The search stops early
+    once `max_fits` fits or `max_seconds` are spent; the best candidate of the last fully
+    scored rung is then refit on all data with the most trees, and `best_score` is its
+    cross-validation score at that size (scored now if that rung was not reached).
+
+    As in GridSearchCV, a fold whose fit fails or whose test rows hold a single class scores
+    `error_score` (NaN by default; 'raise' raises) and is not cached, a candidate with any
+    NaN fold scores NaN, and NaN candidates rank last. Fewer folds are used when the
+    smaller class has fewer than `n_splits` members.
+    """
+    max_resource = max(param_grid[resource])
+    candidates = list(ParameterGrid({k: v for k, v in param_grid.items() if k != resource}))
+    # Enough rungs that the last one compares at most `factor` candidates at full size
+    n_rungs = max(1, math.ceil(math.log(len(candidates), factor))) if len(candidates) > 1 else 1
+    resources = [max(1, round(max_resource / factor ** (n_rungs - 1 - r))) for r in range(n_rungs)]
+
+    n_splits = max(2, min(n_splits, int(y.value_counts().min())))
+    folds = list(StratifiedKFold(n_splits=n_splits).split(X, y))
+    cache = FoldScoreCache(feature_key(X, y, n_splits, type(base_model).__name__), cache_root)
+    started = time.perf_counter()
+    n_fits, n_cached = 0, 0
+    history: List[Dict] = []
+    ranking = None
+
+    def over_budget():
+        return ((max_fits is not None and n_fits >= max_fits) or
+                (max_seconds is not None and time.perf_counter() - started >= max_seconds))
+
+    def fold_score(params, n_resource, train, test):
+        if y.iloc[test].nunique() < 2:
+            return _failed_fold(error_score, "its test rows hold a single class")
+        try:
+            model = clone(base_model).set_params(**params, **{resource: n_resource}, n_jobs=-1)
+            model.fit(X.iloc[train], y.iloc[train])
+            return float(roc_auc_score(y.iloc[test], model.predict_proba(X.iloc[test])[:, 1]))
+        except Exception as e:
+            if error_score == 'raise':
+                raise
+            return _failed_fold(error_score, f"fitting it failed: {e!r}")
+
+    def candidate_score(params, n_resource, budget: bool = True) -> Optional[float]:
+        # Mean fold score, or None when the budget runs out first
+        nonlocal n_fits, n_cached
+        fold_scores = []
+        for k, (train, test) in enumerate(folds):
+            key = FoldScoreCache.key(params, n_resource, k)
+            if key in cache.scores:
+                n_cached += 1
+                fold_scores.append(cache.scores[key])
+                continue
+            if budget and over_budget():
+                return None
+            score = fold_score(params, n_resource, train, test)
+            n_fits += 1
+            if not np.isnan(score):
+                cache.scores[key] = score
+            fold_scores.append(score)
+        return float(np.mean(fold_scores))
+
+    def rank(scores: Dict[int, float]) -> List[int]:
+        return sorted(scores, key=lambda i: (np.isnan(scores[i]), -scores[i]))
+
+    for rung, n_resource in enumerate(resources):
+        scores = {}
+        for i, params in enumerate(candidates):
+            score = candidate_score(params, n_resource)
+            if score is not None:
+                scores[i] = score
+        cache.save()
+
+        complete = len(scores) == len(candidates)
+        if scores and (complete or ranking is None):
+            ranking = rank(scores)
+            history.append({'resource': n_resource, 'candidates': len(candidates),
+                            'best_score': scores[ranking[0]]})
+            best = (candidates[ranking[0]], n_resource)
+        if not complete or rung == len(resources) - 1:
+            break
+        candidates = [candidates[i] for i in ranking[:max(1, math.ceil(len(candidates) / factor))]]
+
+    if ranking is None:
+        raise RuntimeError("Search budget exhausted before any candidate was scored")
+
+    best_params, best_resource = best
+    # The rung score describes the best candidate with its rung's trees; score the refit size too
+    best_score = history[-1]['best_score'] if best_resource == max_resource else \
+        candidate_score(best_params, max_resource, budget=False)
+    cache.save()
+    if np.isnan(best_score):
+        warnings.warn("No candidate has a cross-validation score; the best parameters are arbitrary",
+                      UserWarning)
+
+    best_params = dict(best_params, **{resource: max_resource})
+    best_estimator = clone(base_model).set_params(**best_params, n_jobs=-1).fit(X, y)
+    best_estimator.set_params(n_jobs=base_model.n_jobs)
     results = {
-        'best_params': grid_search.best_params_,
-        'best_score': grid_search.best_score_
+        'best_params': best_params,
+        'best_score': best_score,
+        'n_fits': n_fits,
+        'n_cached': n_cached,
+        'n_splits': n_splits,
+        'rungs': history,
+        'seconds': time.perf_counter() - started
     }
+    return best_estimator, results
+
 
-    return grid_search.best_estimator_, results, feature_importances
+def _failed_fold(error_score, reason: str) -> float:
+    if error_score == 'raise':
+        raise ValueError(f"Fold cannot be scored: {reason}")
+    warnings.warn(f"Fold scored {error_score} because {reason}", FitFailedWarning)
+    return float(error_score)
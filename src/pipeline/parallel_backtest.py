@@ -0,0 +1,89 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+from src.pipeline.walk_forward import Fold, WalkForward, fit_predict_fold
+
+# (shared memory name, shape, dtype) of an array placed in shared memory by the parent
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+# Worker-side views of the shared feature matrix and target, set once per process
+_arrays: Dict[str, np.ndarray] = {}
+_segments: List[SharedMemory] = []
+
+
+def _share(array: np.ndarray) -> Tuple[SharedMemory, ArraySpec]:
+    array = np.ascontiguousarray(array)
+    segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def _attach(x_spec: ArraySpec, y_spec: ArraySpec):
+    for key, (name, shape, dtype) in (('X', x_spec), ('y', y_spec)):
+        segment = SharedMemory(name=name)
+        _segments.append(segment)
+        _arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _run_fold(task: Tuple[object, Fold]) -> Tuple[np.ndarray, float, float]:
+    model, fold = task
+    return fit_predict_fold(model, _arrays['X'], _arrays['y'], fold)
+
+
+class ParallelWalkForward(WalkForward):
+    """
+    WalkForward with the independent folds ('expanding' / 'sliding') run on a process pool.
+    The feature matrix and target are copied into shared memory once; each task carries only
+    an unfitted clone of the model and the fold's row ranges, and predictions come back in
+    fold order, so the result equals the serial run for a seeded model. 'warm_start' folds
+    depend on each other and are not supported.
+    """
+
+    def __init__(self, model, predictors: List[str], scheme: str = 'expanding', start: int = 2400,
+                 step: int = 240, embargo: int = 10, window: Optional[int] = None,
+                 max_workers: Optional[int] = None, target: str = "Target"):
+        if scheme == 'warm_start':
+            raise ValueError("warm_start folds are sequential; use WalkForward")
+        super().__init__(model, predictors, scheme=scheme, start=start, step=step, embargo=embargo,
+                         window=window, target=target)
+        self.max_workers = max_workers or os.cpu_count()
+
+    def _fold_model(self):
+        # Workers already run one fold per core; per-tree threading would only oversubscribe
+        model = clone(self.model)
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=1)
+        return model
+
+    def run(self, data: pd.DataFrame) -> pd.DataFrame:
+        folds = self.folds(len(data))
+        self.timings = []
+        x_segment, x_spec = _share(data[self.predictors].to_numpy())
+        y_segment, y_spec = _share(data[self.target].to_numpy())
+        try:
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach,
+                                     initargs=(x_spec, y_spec)) as executor:
+                # Longest training sets first so the pool does not end waiting on one big fold
+                order = sorted(range(len(folds)), key=lambda n: folds[n][0] - folds[n][1])
+                futures = {n: executor.submit(_run_fold, (self._fold_model(), folds[n])) for n in order}
+                results = [futures[n].result() for n in range(len(folds))]
+            self.wall_seconds = time.perf_counter() - start
+        finally:
+            for segment in (x_segment, y_segment):
+                segment.close()
+                segment.unlink()
+
+        for n, (fold, (_, fit_seconds, predict_seconds)) in enumerate(zip(folds, results)):
+            self._record(n, fold, fit_seconds, predict_seconds, self.model.get_params().get('n_estimators'))
+        return self.combine(data, folds, [preds for preds, _, _ in results])
+
+    def summary(self) -> str:
+        return f"{super().summary()}, wall {self.wall_seconds:.1f}s on {self.max_workers} workers"
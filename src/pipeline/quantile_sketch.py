@@ -0,0 +1,86 @@
+import math
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+class LogHistogramSketch:
+    """
+    Quantile sketch for `size` parallel distributions of positive values (e.g. price / IPO price
+    for trading days D1..DX). Values go into logarithmic buckets of relative width
+    `relative_accuracy` (as in DDSketch), so every quantile is within that relative error and two
+    sketches merge exactly by adding their bucket counts. Values outside [min_value, max_value]
+    are clamped to the edge buckets; the exact min / max are kept alongside.
+    """
+
+    def __init__(self, size: int, relative_accuracy: float = 0.01, min_value: float = 1e-3,
+                 max_value: float = 1e3):
+        self.size = size
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.offset = math.ceil(math.log(min_value) / self.log_gamma)
+        n_buckets = math.ceil(math.log(max_value) / self.log_gamma) - self.offset + 1
+        self.counts = np.zeros((size, n_buckets), dtype=np.uint32)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+
+    @property
+    def count(self) -> np.ndarray:
+        return self.counts.sum(axis=1, dtype=np.int64)
+
+    def add(self, values: np.ndarray):
+        """
+        Add a (rows x size) array; column j feeds distribution j and NaNs are skipped.
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, self.size)
+        rows, columns = np.nonzero(~np.isnan(values))
+        v = values[rows, columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            index = np.ceil(np.log(np.maximum(v, self.min_value)) / self.log_gamma) - self.offset
+        index = np.clip(index, 0, self.counts.shape[1] - 1).astype(np.int64)
+        flat = np.bincount(columns * self.counts.shape[1] + index, minlength=self.counts.size)
+        self.counts += flat.reshape(self.counts.shape).astype(np.uint32)
+        if len(v):
+            np.fmin.at(self.min, columns, v)
+            np.fmax.at(self.max, columns, v)
+
+    def merge(self, other: "LogHistogramSketch"):
+        if self._params() != other._params():
+            raise ValueError("Cannot merge sketches with different size or buckets")
+        self.counts += other.counts
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """
+        q-quantile of every distribution (NaN where it has no values).
+        """
+        count = self.count
+        cumulative = np.cumsum(self.counts, axis=1, dtype=np.int64)
+        rank = q * (count - 1)
+        index = np.argmax(cumulative > rank[:, None], axis=1)
+        value = 2 * self.gamma ** (index + self.offset) / (self.gamma + 1)
+        value = np.clip(value, self.min, self.max)
+        return np.where(count > 0, value, np.nan)
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        return np.array([self.quantile(q) for q in qs])
+
+    def _params(self):
+        return self.size, self.relative_accuracy, self.min_value, self.max_value
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {'counts': self.counts, 'min': self.min, 'max': self.max,
+                'params': np.array([self.relative_accuracy, self.min_value, self.max_value])}
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "LogHistogramSketch":
+        relative_accuracy, min_value, max_value = arrays['params']
+        sketch = cls(len(arrays['min']), relative_accuracy, min_value, max_value)
+        sketch.counts = arrays['counts'].astype(np.uint32)
+        sketch.min = arrays['min']
+        sketch.max = arrays['max']
+        return sketch
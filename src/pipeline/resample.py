@@ -0,0 +1,105 @@
+import re
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Named timeframes -> pandas rules; any other pandas rule ('30min', '4h', 'ME', ...) is accepted as is,
+# and '<N>td' buckets every N trading rows (e.g. '250td' for the yearly candles in mplfinance.finplot)
+TIMEFRAMES = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min', '1h': '1h', '4h': '4h',
+              '1d': '1D', '1w': 'W', '1mo': 'MS', '1y': 'YS'}
+TRADING_DAY_BUCKET = re.compile(r"^(\d+)td$")
+
+
+def _agg(df: pd.DataFrame) -> Dict[str, str]:
+    return {c: a for c, a in OHLCV_AGG.items() if c in df.columns}
+
+
+def resample_trading_days(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    """
+    Aggregate every `n` consecutive rows into one bar with np.*.reduceat; each bar is
+    labelled with its first row's index.
+    """
+    starts = np.arange(0, len(df), n)
+    if len(starts) == 0:
+        return df.iloc[:0][list(_agg(df))]
+    ends = np.minimum(starts + n, len(df)) - 1
+    out = {}
+    for column, how in _agg(df).items():
+        values = df[column].to_numpy()
+        if how == 'first':
+            out[column] = values[starts]
+        elif how == 'last':
+            out[column] = values[ends]
+        elif how == 'max':
+            out[column] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            out[column] = np.minimum.reduceat(values, starts)
+        else:
+            out[column] = np.add.reduceat(values, starts)
+    return pd.DataFrame(out, index=df.index[starts])
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Derive a coarser OHLCV timeframe from finer bars (first / max / min / last / sum).
+    Calendar buckets without any fine bar are dropped.
+    """
+    match = TRADING_DAY_BUCKET.match(timeframe)
+    if match:
+        return resample_trading_days(df, int(match.group(1)))
+    rule = TIMEFRAMES.get(timeframe, timeframe)
+    coarse = df.resample(rule).agg(_agg(df))
+    return coarse.dropna(subset=['Close'] if 'Close' in coarse.columns else None)
+
+
+class BarResampler:
+    """
+    Keeps the finest bars and every timeframe derived from them. Derived frames are cached;
+    append() adds new fine bars and rebuilds only the last (possibly partial) coarse bar
+    onwards for each cached timeframe.
+    """
+
+    def __init__(self, fine: pd.DataFrame):
+        self.fine = fine.sort_index()
+        self._coarse: Dict[str, pd.DataFrame] = {}
+        # position in `fine` where each cached timeframe's last bar starts
+        self._last_start: Dict[str, int] = {}
+
+    def get(self, timeframe: str) -> pd.DataFrame:
+        if timeframe not in self._coarse:
+            self._coarse[timeframe] = resample_ohlcv(self.fine, timeframe)
+            self._last_start[timeframe] = self._last_bucket_start(timeframe, 0)
+        return self._coarse[timeframe]
+
+    def _last_bucket_start(self, timeframe: str, offset: int) -> int:
+        if len(self.fine) == 0:
+            return 0
+        match = TRADING_DAY_BUCKET.match(timeframe)
+        if match:
+            n = int(match.group(1))
+            return (len(self.fine) - 1) // n * n
+        # first fine bar at or after the last coarse bar's bucket
+        rule = TIMEFRAMES.get(timeframe, timeframe)
+        ids = self.fine.iloc[offset:].groupby(pd.Grouper(freq=rule)).ngroup().to_numpy()
+        return offset + int(np.argmax(ids == ids[-1]))
+
+    def append(self, new_fine: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Add fine bars newer than the last one and update the cached timeframes incrementally.
+        """
+        if len(self.fine):
+            new_fine = new_fine[new_fine.index > self.fine.index[-1]]
+        if len(new_fine) == 0:
+            return self._coarse
+        self.fine = pd.concat([self.fine, new_fine.sort_index()])
+
+        for timeframe, coarse in self._coarse.items():
+            start = self._last_start[timeframe]
+            tail = resample_ohlcv(self.fine.iloc[start:], timeframe)
+            kept = coarse[coarse.index < tail.index[0]] if len(tail) else coarse
+            self._coarse[timeframe] = pd.concat([kept, tail])
+            self._last_start[timeframe] = self._last_bucket_start(timeframe, start)
+        return self._coarse
@@ -0,0 +1,254 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Incremental versions of the indicators in feature_engineering.calculate_technical_indicators
+# and gold_analysis.get_macd. Each update() is O(1) and returns the value pandas would give
+# for the newest bar of the full series.
+
+NAN = float('nan')
+
+
+class _RingBuffer:
+    def __init__(self, window: int):
+        self.window = window
+        self.values = np.full(window, NAN)
+        self.pos = 0
+        self.count = 0
+        self.nan_count = 0
+
+    def push(self, x: float) -> Optional[float]:
+        """
+        Store x and return the value that fell out of the window (None while filling up).
+        """
+        old = self.values[self.pos] if self.count == self.window else None
+        if old is not None and math.isnan(old):
+            self.nan_count -= 1
+        if math.isnan(x):
+            self.nan_count += 1
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        return old
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.window and self.nan_count == 0
+
+
+class RollingMean:
+    """
+    Series.rolling(window).mean(): running sum over a ring buffer, NaN until `window`
+    non-NaN values are in the window. The sum is recomputed every `resync` updates to
+    stop floating-point drift from accumulating.
+    """
+
+    def __init__(self, window: int, resync: int = 1000):
+        self.buffer = _RingBuffer(window)
+        self.total = 0.0
+        self.resync = resync
+        self._updates = 0
+
+    def update(self, x: float) -> float:
+        old = self.buffer.push(x)
+        if not math.isnan(x):
+            self.total += x
+        if old is not None and not math.isnan(old):
+            self.total -= old
+        self._updates += 1
+        if self._updates % self.resync == 0:
+            self.total = math.fsum(v for v in self.buffer.values if not math.isnan(v))
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.total / self.buffer.window if self.buffer.full else NAN
+
+
+class RollingStd:
+    """
+    Series.rolling(window).std(ddof): Welford mean / M2 with removal of the value leaving the window.
+    A window of one repeated value is exactly 0, as pandas gives it, rather than Welford's residue.
+    """
+
+    def __init__(self, window: int, ddof: int = 1, resync: int = 1000):
+        self.buffer = _RingBuffer(window)
+        self.ddof = ddof
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.resync = resync
+        self._updates = 0
+        self._last = NAN
+        self._same = 0
+
+    def _add(self, x: float):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    def _remove(self, x: float):
+        if self.n == 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        d = x - self.mean
+        self.mean -= d / self.n
+        self.m2 -= d * (x - self.mean)
+
+    def update(self, x: float) -> float:
+        old = self.buffer.push(x)
+        if old is not None and not math.isnan(old):
+            self._remove(old)
+        if not math.isnan(x):
+            self._add(x)
+        self._same = self._same + 1 if x == self._last else 1
+        self._last = x
+        self._updates += 1
+        if self._updates % self.resync == 0:
+            valid = self.buffer.values[~np.isnan(self.buffer.values)]
+            self.n = len(valid)
+            self.mean = float(valid.mean()) if self.n else 0.0
+            self.m2 = float(((valid - self.mean) ** 2).sum()) if self.n else 0.0
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if not self.buffer.full or self.n <= self.ddof:
+            return NAN
+        if self._same >= self.buffer.window:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.n - self.ddof))
+
+
+class EWM:
+    """
+    Series.ewm(span=span).mean() with the default adjust=True, ignore_na=False:
+    the weighted numerator and denominator are both decayed recursively.
+    """
+
+    def __init__(self, span: float):
+        self.decay = 1 - 2 / (span + 1)
+        self.num = 0.0
+        self.den = 0.0
+
+    def update(self, x: float) -> float:
+        self.num *= self.decay
+        self.den *= self.decay
+        if not math.isnan(x):
+            self.num += x
+            self.den += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.num / self.den if self.den else NAN
+
+
+def _ratio(a: float, b: float) -> float:
+    # float division with numpy / pandas semantics for zero denominators
+    if b == 0:
+        return NAN if a == 0 or math.isnan(a) else math.copysign(math.inf, a)
+    return a / b
+
+
+class RSI:
+    """
+    RSI as in calculate_technical_indicators: simple rolling means of gains and losses.
+    The first bar's (undefined) change counts as 0 gain and 0 loss, like Series.where does.
+    """
+
+    def __init__(self, window: int = 14):
+        self.gain = RollingMean(window)
+        self.loss = RollingMean(window)
+        self.prev = None
+
+    def update(self, close: float) -> float:
+        delta = NAN if self.prev is None else close - self.prev
+        self.prev = close
+        self.gain.update(delta if delta > 0 else 0.0)
+        self.loss.update(-delta if delta < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        rs = _ratio(self.gain.value, self.loss.value)
+        return 100 - _ratio(100, 1 + rs) if not math.isnan(rs) else NAN
+
+
+class MACD:
+    """
+    gold_analysis.get_macd: EWM(12) - EWM(26), signal EWM(9) of that, and their difference.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EWM(fast)
+        self.slow = EWM(slow)
+        self.signal = EWM(signal)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+
+class TechnicalIndicatorState:
+    """
+    Streaming equivalent of calculate_technical_indicators (plus MACD), one bar at a time.
+    """
+
+    def __init__(self):
+        self.ma = {w: RollingMean(w) for w in (20, 50, 200)}
+        self.volatility = RollingStd(20)
+        self.rsi = RSI(14)
+        self.volume_ma = RollingMean(20)
+        self.macd = MACD()
+        self.prev_close = None
+
+    def update(self, close: float, volume: float) -> Dict[str, float]:
+        daily_return = NAN if self.prev_close is None else _ratio(close, self.prev_close) - 1
+        self.prev_close = close
+        volume_ma = self.volume_ma.update(volume)
+        macd, signal, macd_diff = self.macd.update(close)
+        return {
+            'MA20': self.ma[20].update(close),
+            'MA50': self.ma[50].update(close),
+            'MA200': self.ma[200].update(close),
+            'Daily_Return': daily_return,
+            'Volatility': self.volatility.update(daily_return),
+            'RSI': self.rsi.update(close),
+            'Volume_MA20': volume_ma,
+            'Volume_Ratio': _ratio(volume, volume_ma),
+            'macd': macd,
+            'signal': signal,
+            'macd_diff': macd_diff,
+        }
+
+    def update_many(self, closes: Iterable[float], volumes: Iterable[float]) -> Optional[Dict[str, float]]:
+        last = None
+        for close, volume in zip(closes, volumes):
+            last = self.update(float(close), float(volume))
+        return last
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TechnicalIndicatorState":
+        """
+        Bootstrap from a historical frame with Close and Volume. Rolling indicators only
+        need the last 200 bars; the EWMs are replayed over the full history so their
+        adjusted weights match pandas exactly.
+        """
+        state = cls()
+        closes = df['Close'].to_numpy(dtype=float)
+        volumes = df['Volume'].to_numpy(dtype=float)
+        tail = max(w for w in state.ma) + 1
+        for close in closes[:-tail]:
+            state.macd.update(float(close))
+        state.prev_close = float(closes[-tail - 1]) if len(closes) > tail else None
+        if len(closes) > tail:
+            state.rsi.prev = state.prev_close
+        for close, volume in zip(closes[-tail:], volumes[-tail:]):
+            state.update(float(close), float(volume))
+        return state
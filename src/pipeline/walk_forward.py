@@ -0,0 +1,180 @@
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+SCHEMES = ('expanding', 'sliding', 'warm_start')
+
+# (train_start, train_end, test_start, test_end) row positions, ends exclusive
+Fold = Tuple[int, int, int, int]
+
+
+def fold_ranges(n_rows: int, start: int = 2400, step: int = 240, embargo: int = 10,
+                scheme: str = 'expanding', window: Optional[int] = None) -> List[Fold]:
+    """
+    Walk-forward folds: every `step` rows from `start`, test on the next `step` rows and train
+    on the rows before it, leaving an `embargo` gap. 'expanding' (and 'warm_start') train from
+    row 0, 'sliding' on the last `window` rows (default: the first fold's training size).
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown scheme {scheme}, expected one of {SCHEMES}")
+    window = window or max(start - embargo, 1)
+    folds = []
+    for i in range(start, n_rows, step):
+        train_end = max(i - embargo, 0)
+        train_start = max(train_end - window, 0) if scheme == 'sliding' else 0
+        folds.append((train_start, train_end, i, min(i + step, n_rows)))
+    return folds
+
+
+def threshold_predictions(proba: np.ndarray, high: float = .9, low: float = .1) -> np.ndarray:
+    """
+    1 for probabilities >= high, 0 below low, NaN (no trade) in between.
+    """
+    preds = proba.copy()
+    preds[proba >= high] = 1
+    preds[proba < low] = 0
+    preds[(proba >= low) & (proba < high)] = np.nan
+    return preds
+
+
+def positive_proba(model, X: np.ndarray) -> np.ndarray:
+    proba = model.predict_proba(X)
+    if proba.shape[1] == 1:
+        # Trained on one class only
+        return np.full(len(X), float(model.classes_[0] == 1))
+    return proba[:, list(model.classes_).index(1)]
+
+
+def fit_predict_fold(model, X: np.ndarray, y: np.ndarray, fold: Fold) -> Tuple[np.ndarray, float, float]:
+    """
+    Fit on the fold's training rows and return the thresholded test predictions with the
+    fit / predict seconds.
+    """
+    train_start, train_end, test_start, test_end = fold
+    t0 = time.perf_counter()
+    model.fit(X[train_start:train_end], y[train_start:train_end])
+    t1 = time.perf_counter()
+    preds = threshold_predictions(positive_proba(model, X[test_start:test_end]))
+    return preds, t1 - t0, time.perf_counter() - t1
+
+
+@dataclass
+class FoldTiming:
+    fold: int
+    train_rows: int
+    test_rows: int
+    trees: int
+    fit_seconds: float
+    predict_seconds: float
+
+
+class WalkForward:
+    """
+    Walk-forward backtest of a classifier over a feature frame.
+
+    - expanding: refit from scratch on all rows before each test block (gold_analysis.backtest)
+    - sliding: refit from scratch on a fixed `window` of the most recent rows
+    - warm_start: fit once, then for every fold add `trees_per_step` trees trained on the
+      last `window` rows (RandomForest-style `warm_start`), keeping at most `max_trees`
+      of the newest trees. Per-fold cost is constant, so long histories run in linear time.
+    """
+
+    def __init__(self, model, predictors: List[str], scheme: str = 'expanding', start: int = 2400,
+                 step: int = 240, embargo: int = 10, window: Optional[int] = None,
+                 trees_per_step: Optional[int] = None, max_trees: Optional[int] = None,
+                 target: str = "Target"):
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown scheme {scheme}, expected one of {SCHEMES}")
+        if max_trees is not None and trees_per_step is not None and max_trees <= trees_per_step:
+            raise ValueError(f"max_trees ({max_trees}) must be larger than trees_per_step ({trees_per_step})")
+        self.model = model
+        self.predictors = predictors
+        self.scheme = scheme
+        self.start = start
+        self.step = step
+        self.embargo = embargo
+        self.window = window
+        self.trees_per_step = trees_per_step
+        self.max_trees = max_trees
+        self.target = target
+        self.timings: List[FoldTiming] = []
+
+    def folds(self, n_rows: int) -> List[Fold]:
+        return fold_ranges(n_rows, self.start, self.step, self.embargo, self.scheme, self.window)
+
+    def run(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Target and Predictions (1 / 0 / NaN) for every test row, like gold_analysis.predict.
+        """
+        X = data[self.predictors].to_numpy()
+        y = data[self.target].to_numpy()
+        folds = self.folds(len(data))
+        self.timings = []
+        if self.scheme == 'warm_start':
+            preds = self._run_warm_start(X, y, folds)
+        else:
+            preds = []
+            for n, fold in enumerate(folds):
+                fold_preds, fit_seconds, predict_seconds = fit_predict_fold(self.model, X, y, fold)
+                preds.append(fold_preds)
+                self._record(n, fold, fit_seconds, predict_seconds)
+        return self.combine(data, folds, preds)
+
+    def _run_warm_start(self, X: np.ndarray, y: np.ndarray, folds: List[Fold]) -> List[np.ndarray]:
+        model = clone(self.model).set_params(warm_start=True)
+        trees_per_step = self.trees_per_step or max(model.n_estimators // 10, 1)
+        if self.max_trees is not None and self.max_trees <= trees_per_step:
+            raise ValueError(f"max_trees ({self.max_trees}) must be larger than trees_per_step ({trees_per_step})")
+        window = self.window or max(self.start - self.embargo, 1)
+        preds = []
+        for n, (train_start, train_end, test_start, test_end) in enumerate(folds):
+            if n > 0:
+                # New trees learn only from the most recent rows; the older trees are kept
+                train_start = max(train_end - window, 0)
+                if len(np.unique(y[train_start:train_end])) < len(model.classes_):
+                    train_end = train_start
+                else:
+                    if self.max_trees is not None and len(model.estimators_) + trees_per_step > self.max_trees:
+                        # Drop the oldest trees so the new ones bring the total to max_trees
+                        keep = self.max_trees - trees_per_step
+                        model.estimators_ = model.estimators_[len(model.estimators_) - keep:]
+                    model.set_params(n_estimators=len(model.estimators_) + trees_per_step)
+            t0 = time.perf_counter()
+            if train_end > train_start:
+                model.fit(X[train_start:train_end], y[train_start:train_end])
+            t1 = time.perf_counter()
+            preds.append(threshold_predictions(positive_proba(model, X[test_start:test_end])))
+            self._record(n, (train_start, train_end, test_start, test_end), t1 - t0,
+                         time.perf_counter() - t1, len(model.estimators_))
+        self.model = model
+        return preds
+
+    def _record(self, n: int, fold: Fold, fit_seconds: float, predict_seconds: float,
+                trees: Optional[int] = None):
+        train_start, train_end, test_start, test_end = fold
+        trees = trees if trees is not None else len(getattr(self.model, 'estimators_', []))
+        self.timings.append(FoldTiming(n, train_end - train_start, test_end - test_start, trees,
+                                       fit_seconds, predict_seconds))
+
+    def combine(self, data: pd.DataFrame, folds: List[Fold], preds: List[np.ndarray]) -> pd.DataFrame:
+        frames = []
+        for (_, _, test_start, test_end), fold_preds in zip(folds, preds):
+            test = data.iloc[test_start:test_end]
+            frames.append(pd.concat([test[self.target],
+                                     pd.Series(fold_preds, index=test.index, name="Predictions")], axis=1))
+        return pd.concat(frames)
+
+    def report(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(t) for t in self.timings])
+
+    def summary(self) -> str:
+        report = self.report()
+        if report.empty:
+            return f"{self.scheme}: no folds"
+        return (f"{self.scheme}: {len(report)} folds, fit {report['fit_seconds'].sum():.1f}s "
+                f"(last fold {report['fit_seconds'].iloc[-1]:.2f}s), "
+                f"predict {report['predict_seconds'].sum():.1f}s")
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import pandas as pd
+
+from src.config import NASDAQ_API_URL, START_DATE, END_DATE
+
+API_HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/113.0'}
+PRICED_DROP_COLUMNS = ['dealID', 'proposedTickerSymbol', 'proposedExchange', 'proposedSharePrice',
+                       'sharesOffered', 'dollarValueOfSharesOffered', 'dealStatus']
+
+
+class CalendarCheckpointStore:
+    """
+    One JSON file per calendar month holding that month's `priced` rows and when they were fetched.
+    A month counts as final once it was fetched `settle_days` after it ended; months fetched
+    earlier (or before `max_age` seconds ago, when set) are stale and fetched again.
+    """
+
+    def __init__(self, root: str = "data/ipo-dataset/calendar", settle_days: int = 7,
+                 max_age: Optional[float] = None):
+        self.root = Path(os.path.join(os.getcwd(), root))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.settle_days = settle_days
+        self.max_age = max_age
+
+    def _path(self, month: str) -> Path:
+        return self.root / f"{month}.json"
+
+    def load(self, month: str) -> Optional[Dict]:
+        path = self._path(month)
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save(self, month: str, rows: List[Dict]):
+        path = self._path(month)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"month": month, "fetched_at": time.time(), "rows": rows}, f)
+        os.replace(tmp_path, path)
+
+    def is_stale(self, month: str) -> bool:
+        checkpoint = self.load(month)
+        if checkpoint is None:
+            return True
+        if self.max_age is not None and time.time() - checkpoint["fetched_at"] > self.max_age:
+            return True
+        settled_at = pd.Period(month, freq='M').end_time + pd.Timedelta(days=self.settle_days)
+        return pd.Timestamp(checkpoint["fetched_at"], unit='s') < settled_at
+
+    def missing_or_stale(self, months: List[str]) -> List[str]:
+        return [month for month in months if self.is_stale(month)]
+
+    def rows(self, months: List[str]) -> Dict[str, List[Dict]]:
+        result = {}
+        for month in months:
+            checkpoint = self.load(month)
+            if checkpoint is not None:
+                result[month] = checkpoint["rows"]
+        return result
+
+
+def calendar_months(start_date: str = START_DATE, end_date: str = END_DATE) -> List[str]:
+    return [str(period) for period in pd.period_range(start_date, end_date, freq='M')]
+
+
+def priced_rows(payload: Dict) -> List[Dict]:
+    """
+    Extract the `priced` table rows from a calendar API response; months without IPOs have no table.
+    """
+    priced = (payload.get('data') or {}).get('priced') or {}
+    return priced.get('rows') or []
+
+
+async def _fetch_month(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str, month: str,
+                       retries: int, backoff: float) -> List[Dict]:
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                async with session.get(url, params={'date': month}) as response:
+                    response.raise_for_status()
+                    return priced_rows(await response.json(content_type=None))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * 2 ** attempt)
+
+
+async def ingest_calendar_async(months: List[str], store: CalendarCheckpointStore, url: str = NASDAQ_API_URL,
+                                concurrency: int = 8, retries: int = 3, backoff: float = 1.0,
+                                timeout: float = 30) -> Dict[str, str]:
+    """
+    Fetch the missing or stale months over one pooled session, at most `concurrency` requests
+    in flight, checkpointing every month as soon as it arrives.
+    Returns {month: "fetched" | "cached" | "failed: <error>"}.
+    """
+    status = {month: "cached" for month in months}
+    pending = store.missing_or_stale(months)
+    if not pending:
+        return status
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, headers=API_HEADERS,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        async def run(month: str):
+            try:
+                rows = await _fetch_month(session, semaphore, url, month, retries, backoff)
+                store.save(month, rows)
+                status[month] = "fetched"
+            except Exception as e:
+                status[month] = f"failed: {e!r}"
+
+        await asyncio.gather(*(run(month) for month in pending))
+    return status
+
+
+def ingest_calendar(start_date: str = START_DATE, end_date: str = END_DATE,
+                    store: Optional[CalendarCheckpointStore] = None, url: str = NASDAQ_API_URL,
+                    concurrency: int = 8, retries: int = 3) -> Dict[str, str]:
+    store = store or CalendarCheckpointStore()
+    return asyncio.run(ingest_calendar_async(calendar_months(start_date, end_date), store, url,
+                                             concurrency, retries))
+
+
+def load_priced_calendar(start_date: str = START_DATE, end_date: str = END_DATE,
+                         store: Optional[CalendarCheckpointStore] = None) -> pd.DataFrame:
+    """
+    Combine the checkpointed `priced` rows into one DataFrame, in the shape fetch_nasdaq_api builds.
+    """
+    store = store or CalendarCheckpointStore()
+    dfs = []
+    for month, rows in store.rows(calendar_months(start_date, end_date)).items():
+        if rows:
+            dfs.append(pd.json_normalize(rows).assign(month=month))
+    if not dfs:
+        return pd.DataFrame()
+    df = pd.concat(dfs, ignore_index=True)
+    return df.drop(columns=PRICED_DROP_COLUMNS, errors='ignore')
@@ -1,6 +1,6 @@
 import os
 import time
-from typing import List
+from typing import Dict, List
 
 import pandas as pd
 import requests
@@ -12,6 +12,8 @@ from selenium.webdriver.chrome.service import Service
 
 from src.config import *
 from src.scraper.pages import *
+from src.scraper.nasdaq_calendar import ingest_calendar, load_priced_calendar
+from src.scraper.symbol_discovery import get_all_symbols_list_fast
 
 def get_month_num(month_str:str) -> int:
     """
@@ -135,7 +137,15 @@ def get_symbols_list(base_url: str, driver_path: str) -> List[str]:
     # return priced_symbols + filings_symbols
     return priced_symbols
 
-def get_all_symbols_list(base_url: str, driver_path: str, num_of_months:int=12) -> List[str]:
+def get_month_key(month_year:str) -> str:
+    """
+    Normalise a calendar belt label (e.g. "Jan2024", "January 2024") to "YYYY-MM".
+    """
+    letters = ''.join(c for c in month_year if c.isalpha())
+    digits = ''.join(c for c in month_year if c.isdigit())
+    return f"{int(digits):04d}-{get_month_num(letters):02d}"
+
+def get_symbols_by_month_selenium(base_url: str, driver_path: str, num_of_months:int=12) -> Dict[str, List[str]]:
     service = Service(driver_path)
     driver = webdriver.Chrome(service=service)
     try:
@@ -147,16 +157,22 @@ def get_all_symbols_list(base_url: str, driver_path: str, num_of_months:int=12)
         calendar_icon_shadow_root = driver.execute_script("return arguments[0].shadowRoot", calendar_icon_shadowhost)
         calendar_icon_shadow_root.find_element(By.CSS_SELECTOR, CALENDAR_USAGE).click()
         time.sleep(2)
-        symbols = []
+        symbols_by_month = {}
         for i in range(num_of_months):
             driver.find_element(By.CSS_SELECTOR, CALENDAR_BELT_MONTH_LEFT).click()
             time.sleep(2)
             current_month_year = driver.find_element(By.CSS_SELECTOR, CALENDAR_BELT_TEXT).text
             priced_symbols = get_symbols_from_shadowhost(PRICED_SHADOWHOST, driver)
             print(f'"{current_month_year}": {priced_symbols},')
-            symbols += priced_symbols
+            symbols_by_month[get_month_key(current_month_year)] = priced_symbols
     finally:
         driver.quit()
+    return symbols_by_month
+
+def get_all_symbols_list(base_url: str, driver_path: str, num_of_months:int=12) -> List[str]:
+    symbols = []
+    for priced_symbols in get_symbols_by_month_selenium(base_url, driver_path, num_of_months).values():
+        symbols += priced_symbols
     return symbols
 
 def fetch_nasdaq_api():
@@ -182,9 +198,20 @@ def fetch_nasdaq_api():
     path_to_save = Path(os.path.join(os.getcwd(), f"data/ipo-dataset/2024/priced.csv"))
     # df.to_csv(path_to_save)
 
+def fetch_nasdaq_api_async(concurrency:int=8):
+    # Fetches only months missing from (or stale in) the checkpoint store, concurrently
+    status = ingest_calendar(START_DATE, END_DATE, concurrency=concurrency)
+    failed = {month: s for month, s in status.items() if s.startswith("failed")}
+    if failed:
+        print(f"Failed months (rerun to retry): {failed}")
+    df = load_priced_calendar(START_DATE, END_DATE)
+    print(df)
+    return df
+
 def main():
     # print(get_all_symbols_list(NASDAQ_IPO_URL, CHROME_DRIVER_PATH, 336))
-    fetch_nasdaq_api()
+    # print(get_all_symbols_list_fast(336))  # calendar JSON, Selenium only as fallback
+    fetch_nasdaq_api_async()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.config import NASDAQ_API_URL, NASDAQ_IPO_URL, CHROME_DRIVER_PATH
+from src.scraper.nasdaq_calendar import CalendarCheckpointStore, ingest_calendar_async
+
+
+def previous_months(num_of_months: int, today: Optional[date] = None) -> List[str]:
+    """
+    The `num_of_months` months before the current one, most recent first
+    (the same months get_all_symbols_list visits by clicking left).
+    """
+    current = pd.Period(today or date.today(), freq='M')
+    return [str(current - i) for i in range(1, num_of_months + 1)]
+
+
+def get_symbols_by_month_api(months: List[str], url: str = NASDAQ_API_URL,
+                             store: Optional[CalendarCheckpointStore] = None,
+                             concurrency: int = 8, retries: int = 3) -> Dict[str, List[str]]:
+    """
+    Priced symbols per month from the calendar JSON, fetching months in parallel.
+    Raises RuntimeError if any month could not be fetched.
+    """
+    store = store or CalendarCheckpointStore()
+    status = asyncio.run(ingest_calendar_async(months, store, url, concurrency, retries))
+    failed = {month: s for month, s in status.items() if s.startswith("failed")}
+    if failed:
+        raise RuntimeError(f"calendar API failed for {len(failed)} month(s): {failed}")
+
+    rows_by_month = store.rows(months)
+    return {month: [row['proposedTickerSymbol'] for row in rows_by_month.get(month, [])
+                    if row.get('proposedTickerSymbol')]
+            for month in months}
+
+
+def get_symbols_by_month(num_of_months: int = 12, url: str = NASDAQ_API_URL,
+                         store: Optional[CalendarCheckpointStore] = None, concurrency: int = 8,
+                         base_url: str = NASDAQ_IPO_URL, driver_path: str = CHROME_DRIVER_PATH,
+                         fallback: bool = True, retries: int = 3) -> Dict[str, List[str]]:
+    """
+    Map "YYYY-MM" -> priced symbols for the last `num_of_months` months.
+    Uses the calendar JSON and falls back to the Selenium scraper when that fails.
+    """
+    months = previous_months(num_of_months)
+    try:
+        return get_symbols_by_month_api(months, url, store, concurrency, retries)
+    except Exception as e:
+        if not fallback:
+            raise
+        print(f"Calendar API discovery failed ({e}), falling back to Selenium")
+
+    from src.scraper.scrape_nasdaq_ipo import get_symbols_by_month_selenium
+    return get_symbols_by_month_selenium(base_url, driver_path, num_of_months)
+
+
+def get_all_symbols_list_fast(num_of_months: int = 12, **kwargs) -> List[str]:
+    """
+    Drop-in replacement for scrape_nasdaq_ipo.get_all_symbols_list.
+    """
+    symbols = []
+    for priced_symbols in get_symbols_by_month(num_of_months, **kwargs).values():
+        symbols += priced_symbols
+    return symbols
@@ -3,13 +3,16 @@ import time
 import os
 from datetime import datetime
 from pathlib import Path
-import re
 import matplotlib.pyplot as plt
 import numpy as np
 
 import yfinance as yf
 from yfinance.exceptions import YFTickerMissingError, YFRateLimitError
 
+from src.ipo_returns import DayReturnStore, QuarterlyReturns, boxplot_stats, build_quarterly_returns
+from src.ipo_survey import read_legacy_month_symbols, survey_row_counts, summarize_survey, format_survey_line
+from src.storage.ipo_catalog import IPOCatalog
+
 
 def fetch_overall_ipo_data():
     # List of stock symbols
@@ -57,90 +60,61 @@ def fetch_overall_ipo_data():
             print(full_string)
             return full_string
 
-def get_ipo_results():
+def fetch_overall_ipo_data_batched():
+    # Same survey as fetch_overall_ipo_data, but for every month in one resumable batched run
+    symbols_by_month = read_legacy_month_symbols("data/ipo-dataset/all_ipo.txt")
+    counts = survey_row_counts([s for symbols in symbols_by_month.values() for s in symbols])
+    survey = summarize_survey(symbols_by_month, counts)
+    IPOCatalog().record_survey(symbols_by_month, counts)
+    full_string = ''
+    for month_year, stock_symbols in symbols_by_month.items():
+        string = format_survey_line(month_year, stock_symbols, survey[month_year])
+        full_string = f"{full_string}\n{string}"
+    print(full_string)
+    return full_string
+
+def get_ipo_catalog():
+    # Imports the legacy all_ipo.txt / all_ipo_data.txt files on first use
+    catalog = IPOCatalog()
+    if catalog.is_empty():
+        catalog.import_legacy()
+    return catalog
+
+def get_ipo_results(month_from=None, month_to=None, refresh=False):
     import warnings
 
     # Suppress specific FutureWarning
     warnings.filterwarnings("ignore", category=FutureWarning)
 
-    file_path = Path(os.path.join(os.getcwd(), f"data/ipo-dataset/all_ipo_data.txt"))
-    with open(file_path, 'r') as file:
-        for i in range(64):
-            next(file)
-        for line in file:
-            above_1500_symbols = ast.literal_eval(line.split(')')[1])
-            month_stats = ast.literal_eval(line.split('(')[1].split(')')[0]) # '(41, 6, 4, 31)'
-            month_year = line[:7]
-            string = month_year + ': '
-
-            # Counters
-            symbols_in_month_year = 0
-            # Loop through each stock symbol
-            for symbol in above_1500_symbols:
-                symbols_in_month_year += 1
-                try:
-                    # Fetch data
-                    data = yf.download(symbol, period="max", progress=False, rounding=True)
-                    # Make the data smaller by dropping any rows after row 1500
-                    if len(data) > 1512:
-                        data = data.iloc[:1513]
-                    # Store the 'Open' value of the first row as ipo_price
-                    ipo_price = float(data.iloc[0]['Open'])
-                    # For every 63 rows (1 quarter), calculate the percentage gain/loss
-                    percentage_changes = []
-                    for i in range(0, len(data), 63):
-                        close_price = float(data.iloc[i]['Close'])
-                        percentage_change = "{:.4f}".format(((close_price - ipo_price) / ipo_price) * 100)
-                        percentage_changes.append((i, percentage_change))
-                    results = {symbol:percentage_changes}
-                    string = string + str(results)
-                except Exception as e:
-                    # Handle unexpected errors
-                    print(f"An unexpected error occurred for {symbol}: {e}")
-            # Print results
-            print(string)
-        return string
+    catalog = get_ipo_catalog()
+    # symbols x quarters % change from the IPO open; only symbols not in the saved matrix are loaded
+    results = build_quarterly_returns(catalog.symbols(month_from, month_to, eligible=True), refresh=refresh)
+    for month_year in np.unique(results.months):
+        month = results.select(month_year, month_year)
+        averages = ", ".join(f"{v:.4f}" for v in month.summary()['mean'])
+        print(f"{month_year}: {len(month.symbols)} symbols, average % change per quarter: [{averages}]")
+    return results
 
-def get_ipo_success_rate():
-    file_path = Path(os.path.join(os.getcwd(), f"data/ipo-dataset/all_ipo_data.txt"))
+def get_ipo_success_rate(month_from=None, month_to=None):
     today = datetime.today().strftime('%Y-%m-%d')
     print(f"As of {today}:")
-    with open(file_path, 'r') as file:
-        for i in range(64):
-            next(file)
-        for line in file:
-            month_stats = ast.literal_eval(line.split('(')[1].split(')')[0]) # '(41, 6, 4, 31)'
-            month_year = line[:7]
-            print(f"{month_year}: {month_stats}")
-
-def plot_quarterly_resullts():
-    # Read the data from the text file
-    file_path = Path(os.path.join(os.getcwd(), f"data/ipo-dataset/quarterly_results.txt"))
-    with open(file_path, 'r') as file:
-        data = file.read()
-
-    # Regular expression to extract values
-    pattern = r"\((\d+), '(-?\d+\.\d+)'\)"
-    matches = re.findall(pattern, data)
-
-    # Organize the extracted data
-    row_dict = {}
-    for match in matches:
-        row_num = int(match[0])
-        percentage = float(match[1])
-        if row_num not in row_dict:
-            row_dict[row_num] = []
-        row_dict[row_num].append(percentage)
-    print(row_dict)
-
-    # Calculate the average for each row number
-    row_nums = sorted(row_dict.keys())
-    averages = [np.mean(row_dict[row_num]) for row_num in row_nums]
-    print(averages)
+    stats = get_ipo_catalog().success_rate(month_from, month_to)
+    for month_year, row in stats.iterrows():
+        month_stats = (row['total'], row['eligible'], row['too_short'], row['unable_to_fetch'])
+        print(f"{month_year}: {tuple(int(v) if v == v else None for v in month_stats)}")
+    return stats
+
+def plot_quarterly_resullts(month_from=None, month_to=None):
+    # Read the saved quarterly return matrix (see get_ipo_results)
+    summary = QuarterlyReturns.load().select(month_from, month_to).summary()
+    print(summary)
+    row_nums = summary.index
+    averages = summary['mean']
 
     # Plot the data
     plt.figure(figsize=(10, 6))
     plt.plot(row_nums, averages, label="Average Percentage Change", marker='o')
+    plt.fill_between(row_nums, summary['q25'], summary['q75'], alpha=0.2, label="Interquartile Range")
     plt.axhline(0, color='gray', linestyle='--', linewidth=1, label="0% Line")
     plt.title("Average Percentage Change Over Time")
     plt.xlabel("Row Numbers")
@@ -149,6 +123,28 @@ def plot_quarterly_resullts():
     plt.grid(alpha=0.5)
     plt.show()
 
+def get_day_returns(month_from=None, month_to=None, refresh=False):
+    # One file per IPO month; months already built are skipped unless refresh
+    catalog = get_ipo_catalog()
+    store = DayReturnStore()
+    ipo_prices = catalog.ipo_prices(month_from, month_to)
+    for month_year, symbols in catalog.symbols(month_from, month_to).items():
+        sketch = store.add_month(month_year, symbols, ipo_prices, refresh=refresh)
+        print(f"{month_year}: {int(sketch.count[0])} symbols")
+    return store
+
+def plot_day_returns(month_from=None, month_to=None, num_days=30, ylim=(-20, 40), figsize=(15, 8)):
+    # Boxplot of % change from IPO price for D1..D{num_days}, from the merged monthly sketches
+    stats = boxplot_stats(DayReturnStore().sketch(month_from, month_to), num_days)
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.bxp(stats, showfliers=False)
+    ax.axhline(0, color='red', linestyle='--', linewidth=1)
+    ax.set_ylim(*ylim)
+    ax.set_title("Percentage Change from IPO Price")
+    ax.set_xlabel("Trading Day")
+    ax.set_ylabel("Percentage Change (%)")
+    plt.show()
+
 
 if __name__ == "__main__":
     get_ipo_success_rate()
\ No newline at end of file
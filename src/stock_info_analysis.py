@@ -1,10 +1,15 @@
 import json
 import os
-
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 
 from src.config import *
+from src.storage.fundamentals_store import FundamentalsStore
 
 """
 #### Valuation Metrics: ####
@@ -115,6 +120,51 @@ Target/Recommendation: 8/10
 Total: 79/100
 """
 
+# Attribute weightages (adjust based on importance)
+WEIGHTS = {
+    'trailingPE': 0.1,
+    'forwardPE': 0.1,
+    'priceToSalesTrailing12Months': 0.08,
+    'priceToBook': 0.08,
+    'returnOnAssets': 0.07,
+    'returnOnEquity': 0.07,
+    'profitMargins': 0.07,
+    'operatingMargins': 0.07,
+    'earningsQuarterlyGrowth': 0.06,
+    'revenueGrowth': 0.06,
+    'beta': 0.05,
+    'quickRatio': 0.05,
+    'currentRatio': 0.05,
+    'debtToEquity': 0.05,
+}
+
+# Ideal ranges for attributes (min_value, max_value)
+RANGES = {
+    'trailingPE': (5, 15),
+    'forwardPE': (5, 15),
+    'priceToSalesTrailing12Months': (1, 4),
+    'priceToBook': (0.5, 1.5),
+    'returnOnAssets': (0.05, 0.2),
+    'returnOnEquity': (0.1, 0.3),
+    'profitMargins': (0.3, 0.6),
+    'operatingMargins': (0.3, 0.6),
+    'earningsQuarterlyGrowth': (0.01, 0.2),
+    'revenueGrowth': (0.01, 0.1),
+    'beta': (0.5, 1.5),
+    'quickRatio': (1, 2),
+    'currentRatio': (1, 2),
+    'debtToEquity': (0, 1),
+}
+
+# Sub-score groups, as in the scoring notes above
+CATEGORIES = {
+    'valuation': ['trailingPE', 'forwardPE', 'priceToSalesTrailing12Months', 'priceToBook'],
+    'profitability': ['returnOnAssets', 'returnOnEquity', 'profitMargins', 'operatingMargins'],
+    'growth': ['earningsQuarterlyGrowth', 'revenueGrowth'],
+    'risk': ['beta'],
+    'liquidity': ['quickRatio', 'currentRatio', 'debtToEquity'],
+}
+
 def normalize(value, min_value, max_value):
     """
     Normalize a value to a 0-1 scale based on its range.
@@ -125,47 +175,13 @@ def evaluate_stock(data):
     """
     Evaluate stock metrics and score the stock out of 100 based on weighted attributes.
     """
-    # Attribute weightages (adjust based on importance)
-    weights = {
-        'trailingPE': 0.1,
-        'forwardPE': 0.1,
-        'priceToSalesTrailing12Months': 0.08,
-        'priceToBook': 0.08,
-        'returnOnAssets': 0.07,
-        'returnOnEquity': 0.07,
-        'profitMargins': 0.07,
-        'operatingMargins': 0.07,
-        'earningsQuarterlyGrowth': 0.06,
-        'revenueGrowth': 0.06,
-        'beta': 0.05,
-        'quickRatio': 0.05,
-        'currentRatio': 0.05,
-        'debtToEquity': 0.05,
-    }
-
-    # Ideal ranges for attributes (min_value, max_value)
-    ranges = {
-        'trailingPE': (5, 15),
-        'forwardPE': (5, 15),
-        'priceToSalesTrailing12Months': (1, 4),
-        'priceToBook': (0.5, 1.5),
-        'returnOnAssets': (0.05, 0.2),
-        'returnOnEquity': (0.1, 0.3),
-        'profitMargins': (0.3, 0.6),
-        'operatingMargins': (0.3, 0.6),
-        'earningsQuarterlyGrowth': (0.01, 0.2),
-        'revenueGrowth': (0.01, 0.1),
-        'beta': (0.5, 1.5),
-        'quickRatio': (1, 2),
-        'currentRatio': (1, 2),
-        'debtToEquity': (0, 1),
-    }
-
     # Calculate score for each attribute
     score = 0
-    for attribute, weight in weights.items():
-        if attribute in data:
-            normalized_value = normalize(data[attribute], *ranges[attribute])
+    for attribute, weight in WEIGHTS.items():
+        value = data.get(attribute)
+        # Missing attributes, None or NaN, are skipped
+        if value is not None and not np.isnan(value):
+            normalized_value = normalize(value, *RANGES[attribute])
             attribute_score = normalized_value * weight * 100
             score += attribute_score
 
@@ -174,23 +190,84 @@ def evaluate_stock(data):
     return round(score, 2)
 
 
-def main():
-    # Read stock data from a JSON file
-    info_path = Path(os.path.join(os.getcwd(), f"data/ipo-dataset/{DESIRED_YEAR}/{DESIRED_MONTH}/ACT-info.json"))
+def _read_info(info_path):
     with open(info_path, 'r') as file:
-        stock_data = json.load(file)
+        return json.load(file)
 
-    # Evaluate stock and get the score
-    stock_score = evaluate_stock(stock_data)
+def load_info_table(root="data/ipo-dataset", max_workers=16):
+    """
+    Read every *-info.json under root on a thread pool into one table (one row per file,
+    the scored attributes as float columns, missing / non-numeric values as NaN).
+    """
+    paths = sorted(Path(os.path.join(os.getcwd(), root)).rglob("*-info.json"))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        infos = list(executor.map(_read_info, paths))
 
-    # Display the results
-    print(f"The stock has been scored {stock_score}/100.")
+    table = pd.DataFrame([{a: info.get(a) for a in WEIGHTS} for info in infos], columns=list(WEIGHTS))
+    table = table.apply(pd.to_numeric, errors='coerce').astype(float)
+    table.insert(0, 'symbol', [p.name[:-len("-info.json")] for p in paths])
+    table.insert(1, 'path', [str(p.parent.relative_to(Path(os.path.join(os.getcwd(), root)))) for p in paths])
+    return table
+
+def load_store_table(snapshot=None, store=None):
+    """
+    The same attributes table from a fundamentals snapshot (latest by default), read column-wise.
+    """
+    store = store or FundamentalsStore()
+    table = store.table(list(WEIGHTS), snapshot).reset_index()
+    path = table['ipo_year'].astype(str) + '/' + table['ipo_month'].astype(str)
+    table = table.drop(columns=['ipo_year', 'ipo_month'])
+    table.insert(1, 'path', path)
+    return table
+
+def score_table(table):
+    """
+    Score every row of an attributes table at once; same result as evaluate_stock per row.
+    Returns the table's symbol / path columns with per-category sub-scores and the total,
+    ranked by score.
+    """
+    attributes = list(WEIGHTS)
+    values = table.reindex(columns=attributes).to_numpy(dtype=float)
+    low = np.array([RANGES[a][0] for a in attributes], dtype=float)
+    high = np.array([RANGES[a][1] for a in attributes], dtype=float)
+    weights = np.array([WEIGHTS[a] for a in attributes])
+
+    # Missing attributes score 0, like evaluate_stock skipping them
+    points = np.clip((values - low) / (high - low), 0, 1) * weights * 100
+    points = np.where(np.isnan(values), 0.0, points)
+
+    result = table[[c for c in ('symbol', 'path') if c in table.columns]].copy()
+    for category, members in CATEGORIES.items():
+        result[category] = points[:, [attributes.index(a) for a in members]].sum(axis=1)
+    # Added column by column in WEIGHTS order, so the float sum is the one evaluate_stock makes
+    total = np.zeros(len(table))
+    for j in range(len(attributes)):
+        total += points[:, j]
+    result['score'] = [round(s, 2) for s in np.minimum(total, 100).tolist()]
+    result['attributes_found'] = (~np.isnan(values)).sum(axis=1)
+    return result.sort_values('score', ascending=False, kind='stable').reset_index(drop=True)
+
+def verdict(stock_score):
     if stock_score > 75:
-        print("The stock is a good buy.")
+        return "The stock is a good buy."
     elif 50 <= stock_score <= 75:
-        print("The stock is an average buy.")
-    else:
-        print("The stock is not a good buy.")
+        return "The stock is an average buy."
+    return "The stock is not a good buy."
+
+
+def main(top=20):
+    # Read every stock's info and score them all at once
+    start = time.perf_counter()
+    store = FundamentalsStore()
+    table = load_store_table(store=store) if store.latest() else load_info_table()
+    loaded = time.perf_counter()
+    ranked = score_table(table)
+    scored = time.perf_counter()
+    print(f"Scored {len(ranked)} stocks (load {loaded - start:.2f}s, score {(scored - loaded) * 1000:.1f}ms)")
+
+    # Display the results
+    for _, row in ranked.head(top).iterrows():
+        print(f"{row['symbol']} ({row['path']}): {row['score']}/100. {verdict(row['score'])}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.compact import compact_ohlcv
+
+# One directory per (symbol, interval) with a raw little-endian file per column:
+#   timestamp.bin int64 epoch nanoseconds (sorted ascending), <column>.bin float64 / int64
+BAR_STORE_ROOT = "data/bars"
+COLUMNS = {'Open': '<f8', 'High': '<f8', 'Low': '<f8', 'Close': '<f8', 'Volume': '<i8'}
+
+
+def store_path(symbol: str, interval: str, root: str = BAR_STORE_ROOT) -> Path:
+    return Path(os.path.join(os.getcwd(), root)) / f"{symbol}_{interval}"
+
+
+def read_yfinance_csv(csv_path) -> pd.DataFrame:
+    """
+    Read a yf.download CSV with its three header rows (Price / Ticker / Datetime)
+    into a frame with plain OHLCV columns and a Datetime index.
+    """
+    df = pd.read_csv(csv_path, header=[0, 1], index_col=0, skiprows=[2])
+    df.columns = df.columns.droplevel(1)
+    df.index = pd.to_datetime(df.index)
+    df.index.name = 'Datetime'
+    return df
+
+
+def _to_epoch_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[ns]').astype('<i8')
+
+
+class BarStore:
+    """
+    Memory-mapped columnar bars. Slices found by binary search on the timestamp
+    column are views into the mapped files, so only the touched pages are read.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", 'r') as f:
+            self.meta = json.load(f)
+        self._maps = {}
+
+    @classmethod
+    def open(cls, symbol: str, interval: str, root: str = BAR_STORE_ROOT) -> "BarStore":
+        return cls(store_path(symbol, interval, root))
+
+    @classmethod
+    def create(cls, path: Path, df: pd.DataFrame) -> "BarStore":
+        """
+        Write a frame with a DatetimeIndex and OHLCV columns as a new store, replacing any existing one.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep='last')]
+        _to_epoch_ns(df.index).tofile(path / "timestamp.bin")
+        for column, dtype in COLUMNS.items():
+            df[column].fillna(0).to_numpy().astype(dtype).tofile(path / f"{column}.bin")
+        meta = {'count': len(df), 'columns': COLUMNS,
+                'tz': str(df.index.tz) if df.index.tz is not None else None}
+        with open(path / "meta.json", 'w') as f:
+            json.dump(meta, f)
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self.meta['count']
+
+    def _map(self, name: str, dtype: str) -> np.ndarray:
+        if name not in self._maps:
+            if len(self) == 0:
+                return np.empty(0, dtype=dtype)
+            self._maps[name] = np.memmap(self.path / f"{name}.bin", dtype=dtype, mode='r', shape=(len(self),))
+        return self._maps[name]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._map("timestamp", '<i8')
+
+    def column(self, name: str) -> np.ndarray:
+        return self._map(name, self.meta['columns'][name])
+
+    def _bounds(self, start, end):
+        ts = self.timestamps
+        lo = 0 if start is None else int(np.searchsorted(ts, _to_epoch_ns(pd.DatetimeIndex([start]))[0], 'left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _to_epoch_ns(pd.DatetimeIndex([end]))[0], 'left'))
+        return lo, hi
+
+    def slice(self, start=None, end=None) -> Dict[str, np.ndarray]:
+        """
+        Zero-copy views of every column for start <= timestamp < end.
+        """
+        lo, hi = self._bounds(start, end)
+        arrays = {'timestamp': self.timestamps[lo:hi]}
+        for column in self.meta['columns']:
+            arrays[column] = self.column(column)[lo:hi]
+        return arrays
+
+    def frame(self, start=None, end=None, columns: Optional[List[str]] = None,
+              compact: bool = False) -> pd.DataFrame:
+        """
+        The slice as a DataFrame in the archive's layout (copies only the sliced rows).
+        `columns` projects to a subset; `compact` gives float32 prices and uint32 volume.
+        """
+        arrays = self.slice(start, end)
+        index = pd.DatetimeIndex(np.asarray(arrays.pop('timestamp')).view('datetime64[ns]'), name='Datetime')
+        if self.meta['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(self.meta['tz'])
+        data = {column: np.asarray(values) for column, values in arrays.items()
+                if columns is None or column in columns}
+        df = pd.DataFrame(data, index=index)
+        return compact_ohlcv(df) if compact else df
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Append the bars newer than the last stored timestamp; returns how many were written.
+        Column files are extended in place and meta.json is updated last, so an interrupted
+        append leaves at most trailing bytes that the next append truncates.
+        """
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep='last')]
+        ts = _to_epoch_ns(df.index)
+        if len(self):
+            keep = ts > self.timestamps[-1]
+            df, ts = df[keep], ts[keep]
+        if len(df) == 0:
+            return 0
+
+        self._maps = {}
+        count = len(self)
+        for name, dtype, values in [('timestamp', '<i8', ts)] + \
+                [(c, d, df[c].fillna(0).to_numpy()) for c, d in self.meta['columns'].items()]:
+            with open(self.path / f"{name}.bin", 'ab') as f:
+                f.truncate(count * np.dtype(dtype).itemsize)
+                np.asarray(values).astype(dtype).tofile(f)
+
+        self.meta['count'] = count + len(df)
+        tmp_path = self.path / "meta.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.path / "meta.json")
+        return len(df)
+
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if len(self) == 0:
+            return None
+        return pd.Timestamp(int(self.timestamps[-1]), unit='ns')
+
+
+def convert_archive(csv_path, symbol: str, interval: str, root: str = BAR_STORE_ROOT) -> BarStore:
+    return BarStore.create(store_path(symbol, interval, root), read_yfinance_csv(csv_path))
+
+
+if __name__ == "__main__":
+    for interval in ['1m', '5m', '1h']:
+        csv_path = Path(os.path.join(os.getcwd(), f"data/GC=F_{interval}_archive.csv"))
+        store = convert_archive(csv_path, 'GC=F', interval)
+        print(f"Converted {csv_path} -> {store.path} ({len(store)} bars)")
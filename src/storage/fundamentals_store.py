@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+FUNDAMENTALS_ROOT = "data/fundamentals"
+# Snapshots of the pipeline's training symbols, kept apart so they never become the
+# full-universe store's latest snapshot
+PIPELINE_FUNDAMENTALS_ROOT = "data/fundamentals/pipeline"
+
+
+class FundamentalsStore:
+    """
+    Stock info snapshots, one append-only JSON-lines file per snapshot date
+    (`{"symbol", "ipo_year", "ipo_month", "info"}` per line; a later line for a symbol replaces
+    the earlier one). Next to each file:
+      - `<snapshot>.index.json`: symbol -> (offset, length) for O(1) lookup; extended from
+        the lines appended since it was written whenever it is loaded
+      - `<snapshot>.columns.npz`: every numeric attribute as one array, rebuilt lazily when
+        the snapshot has grown, for full-column scans
+    Sealed snapshots are read-only and recorded in manifest.json with their content hash,
+    so the exact fundamentals a model was trained on can be checked and reloaded.
+    """
+
+    def __init__(self, root: str = FUNDAMENTALS_ROOT):
+        self.root = Path(os.path.join(os.getcwd(), root))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._indexes: Dict[str, Dict] = {}
+
+    def _path(self, snapshot: str, suffix: str = ".jsonl") -> Path:
+        return self.root / f"{snapshot}{suffix}"
+
+    def _manifest(self) -> Dict:
+        path = self.root / "manifest.json"
+        if not path.exists():
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def snapshots(self) -> List[str]:
+        return sorted(p.stem for p in self.root.glob("*.jsonl"))
+
+    def latest(self) -> Optional[str]:
+        snapshots = self.snapshots()
+        return snapshots[-1] if snapshots else None
+
+    def _resolve(self, snapshot: Optional[str]) -> str:
+        snapshot = snapshot or self.latest()
+        if snapshot is None or not self._path(snapshot).exists():
+            raise KeyError(f"No fundamentals snapshot {snapshot}")
+        return snapshot
+
+    # writing
+
+    def append_many(self, records: Iterable[Tuple[str, Dict, Optional[int], Optional[int]]],
+                    snapshot: Optional[str] = None) -> int:
+        """
+        Append (symbol, info, ipo_year, ipo_month) records to a snapshot (today's by default).
+        """
+        snapshot = snapshot or date.today().isoformat()
+        if snapshot in self._manifest():
+            raise ValueError(f"Snapshot {snapshot} is sealed")
+        index = self._index(snapshot) if self._path(snapshot).exists() else None
+        n = 0
+        with open(self._path(snapshot), 'ab') as f:
+            for symbol, info, ipo_year, ipo_month in records:
+                line = json.dumps({'symbol': symbol, 'ipo_year': ipo_year, 'ipo_month': ipo_month,
+                                   'info': info}, separators=(',', ':')).encode() + b"\n"
+                offset = f.tell()
+                f.write(line)
+                if index is not None:
+                    index['symbols'][symbol] = [offset, len(line)]
+                    index['bytes'] = offset + len(line)
+                n += 1
+        return n
+
+    def append(self, symbol: str, info: Dict, snapshot: Optional[str] = None,
+               ipo_year: Optional[int] = None, ipo_month: Optional[int] = None) -> int:
+        return self.append_many([(symbol, info, ipo_year, ipo_month)], snapshot)
+
+    def seal(self, snapshot: str) -> str:
+        """
+        Freeze a snapshot and record its content hash; returns the hash.
+        """
+        manifest = self._manifest()
+        if snapshot not in manifest:
+            self._save_index(snapshot, self._index(snapshot))
+            manifest[snapshot] = {'sha256': self.content_hash(snapshot),
+                                  'symbols': len(self._index(snapshot)['symbols'])}
+            tmp_path = self.root / "manifest.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=4, sort_keys=True)
+            os.replace(tmp_path, self.root / "manifest.json")
+        return manifest[snapshot]['sha256']
+
+    def content_hash(self, snapshot: Optional[str] = None) -> str:
+        h = hashlib.sha256()
+        with open(self._path(self._resolve(snapshot)), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def verify(self, snapshot: str) -> bool:
+        """
+        True if a sealed snapshot still has the content it was sealed with.
+        """
+        manifest = self._manifest()
+        return snapshot in manifest and manifest[snapshot]['sha256'] == self.content_hash(snapshot)
+
+    # offset index
+
+    def _index(self, snapshot: str) -> Dict:
+        path = self._path(snapshot)
+        index = self._indexes.get(snapshot)
+        if index is None:
+            index_path = self._path(snapshot, ".index.json")
+            index = {'bytes': 0, 'symbols': {}}
+            if index_path.exists():
+                with open(index_path, 'r') as f:
+                    index = json.load(f)
+            self._indexes[snapshot] = index
+
+        size = path.stat().st_size
+        if index['bytes'] < size:
+            # Index lines appended since the index was last written
+            with open(path, 'rb') as f:
+                f.seek(index['bytes'])
+                offset = index['bytes']
+                for line in f:
+                    index['symbols'][json.loads(line)['symbol']] = [offset, len(line)]
+                    offset += len(line)
+            index['bytes'] = offset
+            self._save_index(snapshot, index)
+        return index
+
+    def _save_index(self, snapshot: str, index: Dict):
+        tmp_path = self._path(snapshot, ".index.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._path(snapshot, ".index.json"))
+
+    # reading
+
+    def record(self, symbol: str, snapshot: Optional[str] = None) -> Optional[Dict]:
+        snapshot = self._resolve(snapshot)
+        location = self._index(snapshot)['symbols'].get(symbol)
+        if location is None:
+            return None
+        with open(self._path(snapshot), 'rb') as f:
+            f.seek(location[0])
+            return json.loads(f.read(location[1]))
+
+    def get(self, symbol: str, snapshot: Optional[str] = None) -> Optional[Dict]:
+        record = self.record(symbol, snapshot)
+        return record['info'] if record is not None else None
+
+    def symbols(self, snapshot: Optional[str] = None) -> List[str]:
+        return sorted(self._index(self._resolve(snapshot))['symbols'])
+
+    def _columns(self, snapshot: str) -> Path:
+        index = self._index(snapshot)
+        path = self._path(snapshot, ".columns.npz")
+        if path.exists():
+            with np.load(path) as data:
+                if int(data['__bytes__']) == index['bytes']:
+                    return path
+
+        # One pass over the current line of every symbol
+        records = []
+        with open(self._path(snapshot), 'rb') as f:
+            for offset, length in sorted(index['symbols'].values()):
+                f.seek(offset)
+                records.append(json.loads(f.read(length)))
+        info = pd.DataFrame([r['info'] for r in records])
+        arrays = {'__symbol__': np.array([r['symbol'] for r in records], dtype=str),
+                  '__ipo_year__': np.array([r['ipo_year'] or 0 for r in records], dtype=np.int32),
+                  '__ipo_month__': np.array([r['ipo_month'] or 0 for r in records], dtype=np.int32),
+                  '__bytes__': np.array(index['bytes'])}
+        for column in info.columns:
+            values = pd.to_numeric(info[column], errors='coerce')
+            if values.notna().any():
+                arrays[column] = values.to_numpy(dtype=float)
+
+        tmp_path = self._path(snapshot, ".columns.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    def column(self, attribute: str, snapshot: Optional[str] = None) -> pd.Series:
+        """
+        One numeric attribute for every symbol in the snapshot (NaN where missing).
+        """
+        return self.table([attribute], snapshot)[attribute]
+
+    def table(self, attributes: Optional[List[str]] = None, snapshot: Optional[str] = None) -> pd.DataFrame:
+        """
+        Numeric attributes of every symbol, indexed by symbol, with ipo_year / ipo_month columns.
+        Only the requested columns are read from the columnar file.
+        """
+        snapshot = self._resolve(snapshot)
+        with np.load(self._columns(snapshot)) as data:
+            available = [k for k in data.files if not k.startswith('__')]
+            attributes = available if attributes is None else attributes
+            symbols = data['__symbol__']
+            table = pd.DataFrame({a: data[a] if a in data.files else np.full(len(symbols), np.nan)
+                                  for a in attributes}, index=pd.Index(symbols, name='symbol'))
+            table.insert(0, 'ipo_year', data['__ipo_year__'])
+            table.insert(1, 'ipo_month', data['__ipo_month__'])
+        return table
+
+
+def migrate_info_tree(src_root: str = "data/ipo-dataset", store: Optional[FundamentalsStore] = None,
+                      snapshot: Optional[str] = None) -> int:
+    """
+    Load every data/ipo-dataset/<year>/<month>/<symbol>-info.json into one snapshot.
+    """
+    store = store or FundamentalsStore()
+
+    def records():
+        for path in sorted(Path(os.path.join(os.getcwd(), src_root)).rglob("*-info.json")):
+            with open(path, 'r') as f:
+                info = json.load(f)
+            year, month = path.parent.parent.name, path.parent.name
+            yield (path.name[:-len("-info.json")], info,
+                   int(year) if year.isdigit() else None, int(month) if month.isdigit() else None)
+
+    return store.append_many(records(), snapshot)
+
+
+if __name__ == "__main__":
+    fundamentals = FundamentalsStore()
+    print(f"Migrated {migrate_info_tree(store=fundamentals)} info files to {fundamentals.latest()}")
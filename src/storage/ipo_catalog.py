@@ -0,0 +1,207 @@
+import ast
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ipo (
+    month TEXT NOT NULL,            -- "YYYY-MM"
+    symbol TEXT NOT NULL,
+    exchange TEXT,
+    ipo_price REAL,
+    history_rows INTEGER,           -- NULL when unknown
+    eligible INTEGER,               -- 1 if history_rows >= 1500, NULL when unknown
+    PRIMARY KEY (month, symbol)
+);
+CREATE INDEX IF NOT EXISTS ipo_month ON ipo (month);
+CREATE INDEX IF NOT EXISTS ipo_symbol ON ipo (symbol);
+
+-- month level (total, >=1500, <1500, unfetchable) counts imported from all_ipo_data.txt,
+-- for months where the per-symbol split is not known
+CREATE TABLE IF NOT EXISTS month_stats (
+    month TEXT PRIMARY KEY,
+    total INTEGER,
+    eligible INTEGER,
+    too_short INTEGER,
+    unable_to_fetch INTEGER
+);
+"""
+
+MONTH_NUMBERS = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+                 'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+
+
+def normalize_month(month_year: str) -> str:
+    """
+    "Jan2024", "Jan 2024", "January 2024", "2024-01" or "01/2024" -> "2024-01"
+    """
+    month_year = month_year.strip()
+    letters = ''.join(c for c in month_year if c.isalpha()).lower()[:3]
+    digits = [d for d in ''.join(c if c.isdigit() else ' ' for c in month_year).split()]
+    if letters in MONTH_NUMBERS and digits:
+        return f"{int(digits[0]):04d}-{MONTH_NUMBERS[letters]:02d}"
+    year, month = (digits[0], digits[1]) if len(digits[0]) == 4 else (digits[1], digits[0])
+    return f"{int(year):04d}-{int(month):02d}"
+
+
+class IPOCatalog:
+    """
+    SQLite catalog of IPOs per month with history length and >=1500-row eligibility
+    """
+
+    def __init__(self, path: str = "data/ipo-dataset/ipo_catalog.sqlite", min_rows: int = 1500):
+        self.path = Path(os.path.join(os.getcwd(), path))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_rows = min_rows
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_ipos(self, rows: Iterable[Dict]):
+        """
+        Insert or update IPO rows; keys not given keep their stored value.
+        """
+        with self.conn:
+            for row in rows:
+                history_rows = row.get('history_rows')
+                eligible = row.get('eligible')
+                if eligible is None and history_rows is not None:
+                    eligible = int(history_rows >= self.min_rows)
+                self.conn.execute(
+                    """INSERT INTO ipo (month, symbol, exchange, ipo_price, history_rows, eligible)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (month, symbol) DO UPDATE SET
+                           exchange = COALESCE(excluded.exchange, exchange),
+                           ipo_price = COALESCE(excluded.ipo_price, ipo_price),
+                           history_rows = COALESCE(excluded.history_rows, history_rows),
+                           eligible = COALESCE(excluded.eligible, eligible)""",
+                    (row['month'], row['symbol'], row.get('exchange'), row.get('ipo_price'),
+                     history_rows, eligible))
+
+    def record_survey(self, symbols_by_month: Dict[str, List[str]], row_counts: Dict[str, int]):
+        """
+        Store per-symbol row counts from ipo_survey.survey_row_counts. The surveyed months'
+        legacy month_stats are dropped, as the per-symbol data now supersedes them.
+        """
+        months = [normalize_month(m) for m in symbols_by_month]
+        self.upsert_ipos({'month': normalize_month(month), 'symbol': symbol,
+                          'history_rows': row_counts.get(symbol, 0)}
+                         for month, symbols in symbols_by_month.items() for symbol in symbols)
+        with self.conn:
+            self.conn.executemany("DELETE FROM month_stats WHERE month = ?", [(m,) for m in months])
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM ipo LIMIT 1").fetchone() is None
+
+    def upsert_calendar_rows(self, rows_by_month: Dict[str, List[Dict]]):
+        """
+        Add exchange and IPO price from the NASDAQ calendar `priced` rows (see nasdaq_calendar).
+        """
+        def price(value):
+            try:
+                return float(str(value).replace('$', '').replace(',', ''))
+            except ValueError:
+                return None
+
+        self.upsert_ipos({'month': month, 'symbol': row['proposedTickerSymbol'],
+                          'exchange': row.get('proposedExchange'),
+                          'ipo_price': price(row.get('proposedSharePrice'))}
+                         for month, rows in rows_by_month.items() for row in rows
+                         if row.get('proposedTickerSymbol'))
+
+    def import_legacy(self, all_ipo_path: Optional[str] = "data/ipo-dataset/all_ipo.txt",
+                      all_ipo_data_path: Optional[str] = "data/ipo-dataset/all_ipo_data.txt",
+                      skip_lines: int = 64) -> Tuple[int, int]:
+        """
+        Import the hand-formatted text files. all_ipo.txt lines are `"Mon YYYY": [symbols],`;
+        all_ipo_data.txt lines are `Mon YYYY: [symbols], (total, >=1500, <1500, unfetchable)[eligible]`.
+        Returns (symbols imported, months with stats imported).
+        """
+        n_symbols, n_months = 0, 0
+        if all_ipo_path and Path(os.path.join(os.getcwd(), all_ipo_path)).exists():
+            for month, symbols in _legacy_lines(all_ipo_path, skip_lines, lambda l: (l[1:8], l[11:-2])):
+                self.upsert_ipos({'month': month, 'symbol': s} for s in ast.literal_eval(symbols))
+                n_symbols += len(ast.literal_eval(symbols))
+
+        if all_ipo_data_path and Path(os.path.join(os.getcwd(), all_ipo_data_path)).exists():
+            for month, line in _legacy_lines(all_ipo_data_path, skip_lines, lambda l: (l[:7], l)):
+                symbols = ast.literal_eval(line.split(': ', 1)[1].split('(')[0].strip().rstrip(','))
+                stats = ast.literal_eval(line.split('(')[1].split(')')[0])
+                eligible = set(ast.literal_eval(line.split(')')[1]))
+                self.upsert_ipos({'month': month, 'symbol': s, 'eligible': int(s in eligible)} for s in symbols)
+                with self.conn:
+                    self.conn.execute("INSERT OR REPLACE INTO month_stats VALUES (?, ?, ?, ?, ?)",
+                                      (month, *stats))
+                n_symbols += len(symbols)
+                n_months += 1
+        return n_symbols, n_months
+
+    def symbols(self, month_from: Optional[str] = None, month_to: Optional[str] = None,
+                eligible: Optional[bool] = None) -> Dict[str, List[str]]:
+        """
+        Symbols per month for an inclusive "YYYY-MM" range, optionally only (in)eligible ones.
+        """
+        where, params = self._range(month_from, month_to)
+        if eligible is not None:
+            where.append("eligible = ?")
+            params.append(int(eligible))
+        query = "SELECT month, symbol FROM ipo" + (" WHERE " + " AND ".join(where) if where else "")
+        result = {}
+        for month, symbol in self.conn.execute(query + " ORDER BY month, symbol", params):
+            result.setdefault(month, []).append(symbol)
+        return result
+
+    def ipo_prices(self, month_from: Optional[str] = None, month_to: Optional[str] = None) -> Dict[str, float]:
+        """
+        Offering price per symbol where the calendar gave one.
+        """
+        where, params = self._range(month_from, month_to)
+        where.append("ipo_price IS NOT NULL")
+        query = "SELECT symbol, ipo_price FROM ipo WHERE " + " AND ".join(where)
+        return dict(self.conn.execute(query, params).fetchall())
+
+    def success_rate(self, month_from: Optional[str] = None, month_to: Optional[str] = None) -> pd.DataFrame:
+        """
+        Per month (total, eligible, too_short, unable_to_fetch) and the eligible share.
+        Per-symbol data is used where it exists, legacy month_stats otherwise.
+        """
+        where, params = self._range(month_from, month_to)
+        clause = " WHERE " + " AND ".join(where) if where else ""
+        per_symbol = pd.read_sql_query(
+            f"""SELECT month, COUNT(*) AS total,
+                       SUM(eligible = 1) AS eligible,
+                       SUM(history_rows > 0 AND eligible = 0) AS too_short,
+                       SUM(history_rows = 0) AS unable_to_fetch
+                FROM ipo{clause} GROUP BY month""", self.conn, params=params, index_col='month')
+        legacy = pd.read_sql_query(f"SELECT * FROM month_stats{clause}", self.conn, params=params,
+                                   index_col='month')
+        stats = legacy.combine_first(per_symbol) if not legacy.empty else per_symbol
+        stats = stats.sort_index()
+        stats['success_rate'] = stats['eligible'] / stats['total']
+        return stats
+
+    @staticmethod
+    def _range(month_from: Optional[str], month_to: Optional[str]):
+        where, params = [], []
+        if month_from is not None:
+            where.append("month >= ?")
+            params.append(normalize_month(month_from))
+        if month_to is not None:
+            where.append("month <= ?")
+            params.append(normalize_month(month_to))
+        return where, params
+
+
+def _legacy_lines(file_path: str, skip_lines: int, split):
+    with open(Path(os.path.join(os.getcwd(), file_path)), 'r') as file:
+        for i in range(skip_lines):
+            next(file, None)
+        for line in file:
+            if line.strip():
+                month, rest = split(line)
+                yield normalize_month(month), rest
@@ -0,0 +1,234 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.pipeline.compact import compact_ohlcv
+
+# Hive-partitioned layout: <root>/bars/ipo_year=2021/ipo_month=9/<file>.parquet
+IPO_STORE_ROOT = "data/ipo-parquet"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Dividends', 'Stock Splits']
+# Small row groups keep "first N trading days" queries to one or two groups per symbol
+ROW_GROUP_SIZE = 250
+
+PARTITIONING = ds.partitioning(pa.schema([('ipo_year', pa.int16()), ('ipo_month', pa.int8())]), flavor="hive")
+
+
+def _root(root: str) -> Path:
+    return Path(os.path.join(os.getcwd(), root))
+
+
+def _partition_dir(root: str, table: str, ipo_year: int, ipo_month: int) -> Path:
+    path = _root(root) / table / f"ipo_year={ipo_year}" / f"ipo_month={ipo_month}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def to_bars_table(symbol: str, data: pd.DataFrame) -> pa.Table:
+    """
+    Convert a yfinance history frame (DatetimeIndex or 'Date' column) to the typed bars schema:
+    symbol, row (trading day number since IPO), Date (timestamp), float prices and int volume.
+    """
+    df = data.reset_index() if 'Date' not in data.columns else data.copy()
+    dates = pd.to_datetime(df['Date'], errors='coerce')
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    out = pd.DataFrame({
+        'symbol': symbol,
+        'row': range(len(df)),
+        'Date': dates.dt.normalize().astype('datetime64[ns]'),
+    })
+    for column in PRICE_COLUMNS:
+        if column in df.columns:
+            out[column] = df[column].astype('float64')
+    if 'Volume' in df.columns:
+        out['Volume'] = df['Volume'].fillna(0).astype('int64')
+    out['row'] = out['row'].astype('int32')
+    return pa.Table.from_pandas(out, preserve_index=False)
+
+
+def _drop_from_migrated(directory: Path, symbol: str):
+    """
+    Remove a symbol's rows from the partition's migrated.parquet, so a symbol written on its own
+    after the migration is not read twice.
+    """
+    path = directory / "migrated.parquet"
+    if not path.exists():
+        return
+    table = pq.read_table(path)
+    keep = pc.not_equal(table['symbol'], symbol)
+    if pc.all(keep).as_py():
+        return
+    table = table.filter(keep)
+    if len(table) == 0:
+        path.unlink()
+        return
+    tmp_path = directory / "migrated.tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+
+
+def write_symbol_bars(symbol: str, data: pd.DataFrame, ipo_year: int, ipo_month: int,
+                      root: str = IPO_STORE_ROOT) -> Path:
+    directory = _partition_dir(root, "bars", ipo_year, ipo_month)
+    path = directory / f"{symbol}.parquet"
+    pq.write_table(to_bars_table(symbol, data), path, row_group_size=ROW_GROUP_SIZE)
+    _drop_from_migrated(directory, symbol)
+    return path
+
+
+def write_symbol_info(symbol: str, info: Dict, ipo_year: int, ipo_month: int,
+                      root: str = IPO_STORE_ROOT) -> Path:
+    directory = _partition_dir(root, "info", ipo_year, ipo_month)
+    path = directory / f"{symbol}.parquet"
+    pq.write_table(_info_table([(symbol, info)]), path)
+    _drop_from_migrated(directory, symbol)
+    return path
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (bool, int, float, np.number))
+
+
+def _info_table(items: Iterable) -> pa.Table:
+    """
+    One row per symbol. Attributes holding only numbers are stored as float64, all others
+    (sector, industry, ...) as strings, with lists and dicts JSON-encoded.
+    """
+    rows = [dict(info, symbol=symbol) for symbol, info in items]
+    df = pd.DataFrame(rows)
+    for column in df.columns:
+        if column == 'symbol':
+            continue
+        values = df[column]
+        if values[values.notna()].map(_is_number).all():
+            df[column] = pd.to_numeric(values, errors='coerce').astype('float64')
+        else:
+            df[column] = values.map(lambda v: json.dumps(v) if isinstance(v, (list, dict)) else str(v),
+                                    na_action='ignore')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _filter(years: Optional[List[int]], months: Optional[List[int]], symbols: Optional[List[str]],
+            max_rows: Optional[int]):
+    expressions = []
+    if years is not None:
+        expressions.append(pc.field('ipo_year').isin(list(years)))
+    if months is not None:
+        expressions.append(pc.field('ipo_month').isin(list(months)))
+    if symbols is not None:
+        expressions.append(pc.field('symbol').isin(list(symbols)))
+    if max_rows is not None:
+        expressions.append(pc.field('row') < max_rows)
+    if not expressions:
+        return None
+    expression = expressions[0]
+    for e in expressions[1:]:
+        expression = expression & e
+    return expression
+
+
+def _dataset(root: str, table: str) -> ds.Dataset:
+    return ds.dataset(_root(root) / table, format="parquet", partitioning=PARTITIONING)
+
+
+def load_ipo_bars(columns: Optional[List[str]] = None, years: Optional[List[int]] = None,
+                  months: Optional[List[int]] = None, symbols: Optional[List[str]] = None,
+                  max_rows: Optional[int] = None, root: str = IPO_STORE_ROOT,
+                  compact: bool = False) -> pd.DataFrame:
+    """
+    Read bars for the IPOs matching the filters. Only the requested columns are read
+    (symbol, row and Date are always included) and partition / row-group statistics
+    are used to skip files and row groups that cannot match, e.g.
+    load_ipo_bars(['Close'], years=[2021], max_rows=250) for the first 250 closes of 2021 IPOs.
+    With `compact` prices are float32, volume uint32 and symbol categorical.
+    """
+    dataset = _dataset(root, "bars")
+    if columns is not None:
+        columns = ['symbol', 'row', 'Date'] + [c for c in columns if c not in ('symbol', 'row', 'Date')]
+    table = dataset.to_table(columns=columns, filter=_filter(years, months, symbols, max_rows))
+    if compact:
+        # Arrow buffers are released column by column as they are converted
+        df = table.to_pandas(strings_to_categorical=True, split_blocks=True, self_destruct=True)
+        del table
+        df = compact_ohlcv(df, list(df.columns))
+    else:
+        df = table.to_pandas()
+    return df.sort_values(['symbol', 'row'], ignore_index=True)
+
+
+def load_ipo_info(columns: Optional[List[str]] = None, years: Optional[List[int]] = None,
+                  months: Optional[List[int]] = None, symbols: Optional[List[str]] = None,
+                  root: str = IPO_STORE_ROOT) -> pd.DataFrame:
+    dataset = _dataset(root, "info")
+    # info files carry whichever attributes yfinance returned, so merge their schemas; an
+    # attribute stored as a number in some files and as text in others is read as text
+    types = {}
+    for fragment in dataset.get_fragments():
+        for field in fragment.physical_schema:
+            types.setdefault(field.name, set()).add(field.type)
+    for field in dataset.schema:
+        types.setdefault(field.name, {field.type})
+    schema = pa.schema([(name, t.pop() if len(t) == 1 else pa.string()) for name, t in types.items()])
+    dataset = ds.dataset(_root(root) / "info", format="parquet", partitioning=PARTITIONING, schema=schema)
+    if columns is not None:
+        columns = ['symbol'] + [c for c in columns if c in dataset.schema.names and c != 'symbol']
+    table = dataset.to_table(columns=columns, filter=_filter(years, months, symbols, None))
+    return table.to_pandas().set_index('symbol')
+
+
+def bars_by_symbol(bars: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Split a load_ipo_bars result into the per-symbol, Date-indexed frames the loaders return.
+    """
+    extra = ['symbol', 'row', 'ipo_year', 'ipo_month']
+    return {symbol: group.drop(columns=[c for c in extra if c in group.columns]).set_index('Date')
+            for symbol, group in bars.groupby('symbol', sort=False)}
+
+
+def migrate_csv_tree(src_root: str = "data/ipo-dataset", dst_root: str = IPO_STORE_ROOT) -> Dict[str, int]:
+    """
+    One-shot migration of data/ipo-dataset/{year}/{month}/{symbol}.csv and {symbol}-info.json
+    into the partitioned store, one bars file and one info file per (year, month) partition.
+    """
+    counts = {'bars': 0, 'info': 0}
+    for month_dir in sorted(_root(src_root).glob("*/*")):
+        if not (month_dir.is_dir() and month_dir.parent.name.isdigit() and month_dir.name.isdigit()):
+            continue
+        ipo_year, ipo_month = int(month_dir.parent.name), int(month_dir.name)
+
+        tables = []
+        for csv_path in sorted(month_dir.glob("*.csv")):
+            df = pd.read_csv(csv_path)
+            df['Date'] = pd.to_datetime(df['Date'].astype(str).str.zfill(8), format='%d%m%Y', errors='coerce')
+            tables.append(to_bars_table(csv_path.stem, df))
+        if tables:
+            # Ordering by trading day puts every symbol's first N rows in the leading row groups
+            table = pa.concat_tables(tables, promote_options="default").sort_by([('row', 'ascending'),
+                                                                                   ('symbol', 'ascending')])
+            path = _partition_dir(dst_root, "bars", ipo_year, ipo_month) / "migrated.parquet"
+            pq.write_table(table, path, row_group_size=ROW_GROUP_SIZE)
+            counts['bars'] += len(tables)
+
+        infos = []
+        for json_path in sorted(month_dir.glob("*-info.json")):
+            with open(json_path, 'r') as f:
+                infos.append((json_path.name[:-len("-info.json")], json.load(f)))
+        if infos:
+            path = _partition_dir(dst_root, "info", ipo_year, ipo_month) / "migrated.parquet"
+            pq.write_table(_info_table(infos), path)
+            counts['info'] += len(infos)
+
+        print(f"Migrated {ipo_year}/{ipo_month}: {len(tables)} histories, {len(infos)} info files")
+    return counts
+
+
+if __name__ == "__main__":
+    migrate_csv_tree()
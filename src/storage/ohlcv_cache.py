@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import yfinance as yf
+
+# fetch(symbol, interval, start) -> DataFrame; start is None for a full download
+Fetcher = Callable[[str, str, Optional[pd.Timestamp]], pd.DataFrame]
+
+
+def ticker_history_fetcher(provider=yf, period: str = "max") -> Fetcher:
+    """
+    Default fetcher backed by `Ticker.history`. Full downloads use `period`,
+    tail refreshes request everything from `start` onwards.
+    """
+    def fetch(symbol: str, interval: str, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+        ticker = provider.Ticker(symbol)
+        if start is None:
+            return ticker.history(period=period, interval=interval)
+        return ticker.history(start=start, interval=interval)
+    return fetch
+
+
+class OHLCVCache:
+    """
+    On-disk cache of price history keyed by (symbol, interval).
+
+    - Entries younger than `refresh_after` seconds are served without any network I/O.
+    - Older entries are refreshed by fetching only the bars from the last cached
+      timestamp onwards and merging them in (the last bar is replaced, as it may
+      have been incomplete when it was cached).
+    - Entries read with `max_rows` that already hold that many bars are complete and are
+      never refreshed (e.g. the first 1500 trading days after an IPO).
+    - Entries not read for `ttl` seconds are evicted, and the least recently read
+      entries are evicted while the cache is larger than `max_bytes`; the entry just
+      written is never evicted.
+    - With `offline=True` only cached data is returned and nothing is fetched.
+
+    Read times are kept in memory and written to index.json with the next put or eviction,
+    or by `flush()`. First-trade dates probed for IPO windows are kept in first_trade.json,
+    so a symbol is probed once even when its bars are evicted or refetched.
+    """
+
+    def __init__(self, root: str = "data/cache/ohlcv", refresh_after: float = 12 * 3600,
+                 ttl: float = 30 * 24 * 3600, max_bytes: int = 2 * 1024 ** 3, offline: bool = False):
+        self.root = Path(os.path.join(os.getcwd(), root))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.refresh_after = refresh_after
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._dirty = False
+        self._first_trade_path = self.root / "first_trade.json"
+        self._first_trade = {}
+        if self._first_trade_path.exists():
+            with open(self._first_trade_path, 'r') as f:
+                self._first_trade = json.load(f)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if self._index_path.exists():
+            with open(self._index_path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self):
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+
+    def flush(self):
+        """
+        Write read times recorded since the last index write.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    @staticmethod
+    def _key(symbol: str, interval: str) -> str:
+        return f"{symbol.replace('/', '_')}_{interval}"
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def get(self, symbol: str, interval: str = "1d", fetch: Optional[Fetcher] = None,
+            max_rows: Optional[int] = None) -> pd.DataFrame:
+        """
+        Return the full cached history for (symbol, interval), fetching or
+        tail-refreshing it first when needed. With `max_rows` only the first `max_rows`
+        bars are kept, and an entry that has them all is served as is.
+        """
+        key = self._key(symbol, interval)
+        fetch = fetch or ticker_history_fetcher()
+        now = time.time()
+
+        with self._lock:
+            entry = self._index.get(key)
+        cached = None
+        if entry is not None and self._path(key).exists():
+            cached = pd.read_pickle(self._path(key))
+
+        complete = cached is not None and max_rows is not None and len(cached) >= max_rows
+        if cached is not None and (self.offline or complete or now - entry["fetched_at"] < self.refresh_after):
+            with self._lock:
+                entry["accessed_at"] = now
+                self._dirty = True
+            return cached if max_rows is None else cached.head(max_rows)
+        if self.offline:
+            raise KeyError(f"{symbol} ({interval}) is not cached and the cache is offline")
+
+        if cached is None or cached.empty:
+            df = fetch(symbol, interval, None)
+        else:
+            tail = fetch(symbol, interval, cached.index[-1])
+            df = self._merge(cached, tail)
+        if max_rows is not None:
+            df = df.head(max_rows)
+
+        self._put(key, df, now)
+        return df
+
+    @staticmethod
+    def _merge(cached: pd.DataFrame, tail: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if tail is None or tail.empty:
+            return cached
+        df = pd.concat([cached, tail])
+        df = df[~df.index.duplicated(keep='last')]
+        return df.sort_index()
+
+    def _put(self, key: str, df: pd.DataFrame, now: float):
+        path = self._path(key)
+        df.to_pickle(path)
+        with self._lock:
+            self._index[key] = {
+                "fetched_at": now,
+                "accessed_at": now,
+                "bytes": path.stat().st_size,
+                "last_timestamp": str(df.index[-1]) if len(df) else None,
+            }
+            self._evict(now, keep=key)
+            self._save_index()
+
+    def _evict(self, now: float, keep: Optional[str] = None):
+        for key in [k for k, e in self._index.items() if now - e["accessed_at"] > self.ttl and k != keep]:
+            self._remove(key)
+
+        total = sum(e["bytes"] for e in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["accessed_at"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._index[key]["bytes"]
+            self._remove(key)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        self._path(key).unlink(missing_ok=True)
+
+    def invalidate(self, symbol: str, interval: str = "1d"):
+        with self._lock:
+            self._remove(self._key(symbol, interval))
+            self._save_index()
+
+    def first_trade_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        with self._lock:
+            first = self._first_trade.get(symbol)
+        return pd.Timestamp(first) if first is not None else None
+
+    def set_first_trade_date(self, symbol: str, first: pd.Timestamp):
+        with self._lock:
+            self._first_trade[symbol] = str(first)
+            tmp_path = self._first_trade_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self._first_trade, f)
+            os.replace(tmp_path, self._first_trade_path)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(e["bytes"] for e in self._index.values())
@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+RECORDED_CALENDAR = Path(__file__).parent / "data" / "nasdaq_calendar.json"
+
+
+class CalendarStub:
+    """
+    Local stand-in for the NASDAQ IPO calendar API: GET /api/ipo/calendar?date=YYYY-MM serves
+    the recorded response for that month (an empty month otherwise). `failures[month]` makes
+    that many requests for the month answer 500 first; `latency` delays every response.
+    """
+
+    def __init__(self, recorded):
+        self.recorded = recorded
+        self.failures = {}
+        self.latency = 0.0
+        self.requests = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/ipo/calendar"
+
+    def payload(self, month):
+        return self.recorded.get(month, {'data': {'priced': None, 'upcoming': None, 'filed': None},
+                                         'message': None, 'status': {'rCode': 200}})
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                month = parse_qs(urlparse(self.path).query).get('date', [''])[0]
+                with stub.lock:
+                    stub.requests[month] = stub.requests.get(month, 0) + 1
+                    failing = stub.failures.get(month, 0) > 0
+                    if failing:
+                        stub.failures[month] -= 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                    status, body = (500, {'message': "stub failure"}) if failing else (200, stub.payload(month))
+                    data = json.dumps(body).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def calendar_stub():
+    with open(RECORDED_CALENDAR, 'r') as f:
+        stub = CalendarStub(json.load(f))
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.archive_maintenance import (CSV_COLUMNS, ReplaySource, TradingCalendar, append_to_csv,
+                                     last_csv_timestamp, maintain_archive)
+from src.storage.bar_store import BarStore, read_yfinance_csv, store_path
+
+SYMBOL = "GC=F"
+CSV_HEADER = ("Price,Close,High,Low,Open,Volume\n"
+              f"Ticker,{SYMBOL},{SYMBOL},{SYMBOL},{SYMBOL},{SYMBOL}\n"
+              "Datetime,,,,,\n")
+
+
+def session_bars(start: str, end: str, freq: str = "1h") -> pd.DataFrame:
+    """
+    Synthetic bars at every time the market is open, across weekends and the 2024 holidays.
+    """
+    grid = pd.date_range(start, end, freq=freq, inclusive='left')
+    index = grid[TradingCalendar().is_open(grid)]
+    close = 2600 + np.arange(len(index), dtype=float)
+    return pd.DataFrame({'Close': close, 'High': close + 1, 'Low': close - 1, 'Open': close,
+                         'Volume': np.arange(len(index)) % 500}, index=index.rename('Datetime'))
+
+
+def write_archive(path, bars: pd.DataFrame):
+    with open(path, 'w') as f:
+        f.write(CSV_HEADER)
+    append_to_csv(path, bars)
+
+
+@pytest.fixture
+def bars():
+    return session_bars("2024-12-16", "2025-01-11")
+
+
+@pytest.mark.parametrize("timestamp, is_open", [
+    ("2025-01-06 10:00", True),    # Monday session
+    ("2025-01-07 17:30", False),   # daily break
+    ("2025-01-07 18:00", True),
+    ("2025-01-03 17:00", False),   # Friday close
+    ("2025-01-04 12:00", False),   # Saturday
+    ("2025-01-05 17:00", False),   # Sunday before the open
+    ("2025-01-05 18:00", True),
+    ("2024-12-25 10:00", False),   # Christmas
+    ("2024-12-24 10:00", True),    # Christmas Eve early close
+    ("2024-12-24 13:00", False),
+    ("2024-12-31 18:00", False),   # evening before New Year's Day
+    ("2024-03-29 10:00", False),   # Good Friday
+    ("2025-01-20 10:00", False),   # Martin Luther King Jr. Day
+])
+def test_trading_calendar(timestamp, is_open):
+    assert TradingCalendar().is_open(pd.DatetimeIndex([timestamp]))[0] == is_open
+
+
+def test_missing_bars_skip_closures():
+    calendar = TradingCalendar()
+    delta = pd.Timedelta(hours=1)
+
+    # Friday's last bar to Sunday's first: nothing was due
+    assert len(calendar.missing_bars(pd.Timestamp("2025-01-03 16:00"), pd.Timestamp("2025-01-05 18:00"), delta)) == 0
+    # Christmas Eve's early close to the day after Christmas
+    assert len(calendar.missing_bars(pd.Timestamp("2024-12-24 12:00"), pd.Timestamp("2024-12-26 00:00"), delta)) == 0
+    # A hole inside a session
+    missing = calendar.missing_bars(pd.Timestamp("2025-01-07 09:00"), pd.Timestamp("2025-01-07 13:00"), delta)
+    assert list(missing.hour) == [10, 11, 12]
+
+
+def test_replayed_windows_append_only_new_bars(tmp_path, bars):
+    csv_path = tmp_path / f"{SYMBOL}_1h_archive.csv"
+    write_archive(csv_path, bars.iloc[:100])
+    archived = csv_path.read_bytes()
+    # Windows of 60 bars moving 40 bars per run, starting 20 bars before the archive ends
+    source = ReplaySource(bars.iloc[80:], window=60, step=40)
+
+    results = [maintain_archive(SYMBOL, "1h", source, csv_path, root=str(tmp_path))
+               for _ in range(int(np.ceil((len(bars) - 140) / 40)) + 1)]
+
+    assert results[0] == {'symbol': SYMBOL, 'interval': "1h", 'fetched': 60, 'appended': 40,
+                          'overlap': 20, 'gap': None}
+    assert all(r['overlap'] == 20 and r['gap'] is None for r in results[1:-1])
+    assert sum(r['appended'] for r in results) == len(bars) - 100
+
+    store = BarStore(store_path(SYMBOL, "1h", str(tmp_path / "bars")))
+    assert len(store) == len(bars)
+    assert (store.frame().index == bars.index).all()
+    # The CSV is extended, never rewritten, and holds every bar once
+    assert csv_path.read_bytes().startswith(archived)
+    archive = read_yfinance_csv(csv_path)
+    assert archive.index.is_unique and len(archive) == len(bars)
+    np.testing.assert_allclose(archive['Close'].to_numpy(), bars['Close'].to_numpy())
+    assert last_csv_timestamp(csv_path) == bars.index[-1]
+    # The bars span two weekends, Christmas and New Year: none of it is a gap
+    assert not (store.path / "gaps.jsonl").exists()
+
+
+def test_overlapping_bars_keep_the_archived_values(tmp_path, bars):
+    csv_path = tmp_path / f"{SYMBOL}_1h_archive.csv"
+    write_archive(csv_path, bars.iloc[:50])
+    revised = bars.iloc[40:70].copy()
+    revised['Close'] += 1000
+
+    result = maintain_archive(SYMBOL, "1h", lambda symbol, interval: revised, csv_path, root=str(tmp_path))
+
+    assert (result['appended'], result['overlap']) == (20, 10)
+    closes = read_yfinance_csv(csv_path)['Close']
+    np.testing.assert_allclose(closes.iloc[40:50], bars['Close'].iloc[40:50])
+    np.testing.assert_allclose(closes.iloc[50:], revised['Close'].iloc[10:])
+
+
+def test_windows_that_do_not_reach_back_record_a_gap(tmp_path, bars):
+    csv_path = tmp_path / f"{SYMBOL}_1h_archive.csv"
+    write_archive(csv_path, bars.iloc[:100])
+    # Runs too far apart: the window moves 120 bars but only holds 60
+    source = ReplaySource(bars.iloc[100:], window=60, step=120)
+
+    first = maintain_archive(SYMBOL, "1h", source, csv_path, root=str(tmp_path))
+    second = maintain_archive(SYMBOL, "1h", source, csv_path, root=str(tmp_path))
+
+    assert first['gap'] is None
+    assert second['gap'] == (bars.index[159], bars.index[220])
+    with open(store_path(SYMBOL, "1h", str(tmp_path / "bars")) / "gaps.jsonl", 'r') as f:
+        gaps = [json.loads(line) for line in f]
+    assert [(g['from'], g['to']) for g in gaps] == [(str(bars.index[159]), str(bars.index[220]))]
+
+
+def test_archive_columns_match_the_yfinance_layout(tmp_path, bars):
+    csv_path = tmp_path / f"{SYMBOL}_1h_archive.csv"
+    write_archive(csv_path, bars.iloc[:10])
+
+    assert list(read_yfinance_csv(csv_path).columns) == CSV_COLUMNS
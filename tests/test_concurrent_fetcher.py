@@ -0,0 +1,170 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from yfinance.exceptions import YFRateLimitError
+
+from src.pipeline.concurrent_fetcher import TokenBucket, fetch_concurrently
+from src.pipeline.data_loader import fetch_stock_data, fetch_stock_data_report, fetch_stock_info
+
+
+class StubProvider:
+    """
+    Stands in for the yfinance module: Ticker(symbol) serves synthetic daily bars and info
+    after `latency` seconds, raises YFRateLimitError for the first `rate_limited[symbol]`
+    calls and fails every call for symbols in `broken`. Tracks calls and peak concurrency.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limited=None, broken=()):
+        self.latency = latency
+        self.rate_limited = dict(rate_limited or {})
+        self.broken = set(broken)
+        self.calls = {}
+        self.probes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def Ticker(self, symbol):
+        return StubTicker(self, symbol)
+
+    def call(self, symbol):
+        with self._lock:
+            self.calls[symbol] = self.calls.get(symbol, 0) + 1
+            n = self.calls[symbol]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if symbol in self.broken:
+            raise ValueError(f"no data for {symbol}")
+        if n <= self.rate_limited.get(symbol, 0):
+            raise YFRateLimitError()
+
+
+class StubTicker:
+    FIRST_TRADE = pd.Timestamp("2010-01-04")
+
+    def __init__(self, provider: StubProvider, symbol: str):
+        self.provider = provider
+        self.symbol = symbol
+
+    def get_history_metadata(self):
+        self.provider.probes.append(self.symbol)
+        return {'firstTradeDate': int(self.FIRST_TRADE.timestamp())}
+
+    def history(self, start=None, end=None, **kwargs):
+        self.provider.call(self.symbol)
+        index = pd.bdate_range(start, end if end is not None else pd.Timestamp.today(), inclusive='left')
+        prices = np.linspace(10, 20, len(index))
+        return pd.DataFrame({'Open': prices, 'High': prices, 'Low': prices, 'Close': prices,
+                             'Volume': np.full(len(index), 1000)}, index=index)
+
+    @property
+    def info(self):
+        self.provider.call(self.symbol)
+        return {'trailingPE': 12.5, 'marketCap': 1e9, 'sector': "Technology"}
+
+
+def test_fetch_stock_data_keeps_the_dict_shape():
+    data = fetch_stock_data(['AAA', 'BBB', 'BAD'], provider=StubProvider(broken={'BAD'}),
+                            requests_per_second=None)
+
+    assert list(data) == ['AAA', 'BBB']
+    assert all(isinstance(df, pd.DataFrame) and len(df) == 1500 for df in data.values())
+    assert list(data['AAA'].columns) == ['Close', 'Volume']
+
+
+def test_fetch_stock_data_report_records_failures():
+    report = fetch_stock_data_report(['AAA', 'BAD'], provider=StubProvider(broken={'BAD'}),
+                                     requests_per_second=None)
+
+    assert report.succeeded == ['AAA']
+    assert report.failed == {'BAD': "no data for BAD"}
+    assert report.results['BAD'].attempts == 1
+
+
+def test_fetch_stock_info_filters_attributes():
+    info = fetch_stock_info(['AAA'], ['trailingPE', 'forwardPE'], provider=StubProvider(),
+                            requests_per_second=None)
+
+    assert info == {'AAA': {'trailingPE': 12.5}}
+
+
+def test_concurrency_is_bounded_and_overlaps_latency():
+    provider = StubProvider(latency=0.05)
+    symbols = [f"S{i}" for i in range(16)]
+
+    start = time.perf_counter()
+    report = fetch_stock_data_report(symbols, provider=provider, max_workers=4, requests_per_second=None)
+    elapsed = time.perf_counter() - start
+
+    assert len(report.succeeded) == len(symbols)
+    assert all(n == 1 for n in provider.calls.values())
+    assert provider.max_in_flight == 4
+    # 16 calls of 50ms on 4 workers: about 0.2s of waiting instead of 0.8s serially
+    assert elapsed < 16 * 0.05
+
+
+def test_rate_limit_caps_request_starts():
+    started = []
+    lock = threading.Lock()
+
+    def fetch_one(symbol):
+        with lock:
+            started.append(time.perf_counter())
+
+    start = time.perf_counter()
+    fetch_concurrently([f"S{i}" for i in range(50)], fetch_one, max_workers=8, requests_per_second=25)
+
+    # A full bucket lets the first 25 start at once, the other 25 wait for refills at 25 per second
+    assert len(started) == 50
+    assert time.perf_counter() - start >= 0.9
+    assert sum(t - start < 0.5 for t in started) <= 25 + 13
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    start = time.perf_counter()
+    for _ in range(11):
+        bucket.acquire()
+
+    # One token up front, then 10 refills at 50 per second
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_rate_limited_symbols_are_retried_with_backoff():
+    provider = StubProvider(rate_limited={'AAA': 2})
+
+    report = fetch_concurrently(['AAA', 'BBB'], lambda s: provider.call(s), requests_per_second=None,
+                                max_retries=3, backoff=0.01)
+
+    assert report.results['AAA'].ok and report.results['AAA'].attempts == 3
+    assert report.results['BBB'].attempts == 1
+
+
+def test_rate_limit_gives_up_after_max_retries():
+    provider = StubProvider(rate_limited={'AAA': 10})
+
+    report = fetch_concurrently(['AAA'], lambda s: provider.call(s), requests_per_second=None,
+                                max_retries=2, backoff=0.01)
+
+    assert not report.results['AAA'].ok
+    assert report.results['AAA'].attempts == 3
+    assert report.failed['AAA'].startswith("rate limited")
+
+
+@pytest.mark.parametrize("max_workers", [1, 8])
+def test_results_follow_symbol_order(max_workers):
+    symbols = [f"S{i}" for i in range(10)]
+
+    report = fetch_concurrently(symbols, lambda s: s.lower(), max_workers=max_workers, requests_per_second=None)
+
+    assert list(report.results) == symbols
+    assert report.values() == {s: s.lower() for s in symbols}
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.feature_engineering import prepare_features, raw_features
+
+ATTRIBUTES = ['trailingPE', 'beta']
+
+
+def daily_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({'Close': close, 'Volume': rng.integers(1_000, 100_000, n).astype(float)},
+                        index=pd.bdate_range("2015-01-01", periods=n))
+
+
+@pytest.fixture
+def universe():
+    # Full windows, a longer history (cut at 1250), short ones and one symbol without info
+    lengths = {'AAA': 1500, 'BBB': 1250, 'CCC': 900, 'DDD': 30, 'EEE': 1300}
+    stock_data = {s: daily_bars(n, seed) for seed, (s, n) in enumerate(lengths.items())}
+    stock_info = {'AAA': {'trailingPE': 15.0, 'beta': 1.2}, 'BBB': {'trailingPE': 30.0},
+                  'CCC': {'beta': 0.8}, 'DDD': {'trailingPE': 8.0, 'beta': 2.0}}
+    return stock_data, stock_info
+
+
+def test_vectorized_raw_features_match_the_loop(universe):
+    stock_data, stock_info = universe
+
+    loop = raw_features(stock_data, stock_info, ATTRIBUTES)
+    vectorized = raw_features(stock_data, stock_info, ATTRIBUTES, vectorized=True)
+
+    pd.testing.assert_frame_equal(vectorized[loop.columns], loop, check_exact=False, rtol=1e-9)
+
+
+def test_vectorized_prepare_features_match_the_loop(universe):
+    stock_data, stock_info = universe
+
+    features, names = prepare_features(stock_data, stock_info, ATTRIBUTES)
+    vectorized, vectorized_names = prepare_features(stock_data, stock_info, ATTRIBUTES, vectorized=True)
+
+    assert vectorized_names == names
+    pd.testing.assert_frame_equal(vectorized, features, check_exact=False, rtol=1e-9, atol=1e-12)
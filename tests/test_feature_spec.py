@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.feature_spec import (Feature, close_ratio, compute_features, macd_diff, ratio_and_trend_spec,
+                                       trend)
+
+HORIZONS = [2, 5, 60, 250, 1000]
+
+
+def gold_bars(n=3000, seed=0, dtype=float):
+    rng = np.random.default_rng(seed)
+    close = 1800 + np.cumsum(rng.normal(0, 2, n))
+    df = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close.astype(dtype),
+                       'Volume': rng.integers(0, 1000, n)},
+                      index=pd.date_range("2020-01-01", periods=n, freq="h", name='Datetime'))
+    df["Tomorrow"] = df["Close"].shift(-5)
+    df["Target"] = (df["Tomorrow"] > df["Close"]).astype(int)
+    return df
+
+
+def reference_close_ratio_and_trend(df):
+    """
+    gold_analysis.get_close_ratio_and_trend before the feature spec.
+    """
+    new_predictors = []
+    for horizon in HORIZONS:
+        rolling_averages = df.rolling(horizon).mean()
+
+        ratio_column = f"Close_Ratio_{horizon}"
+        df[ratio_column] = df["Close"] / rolling_averages["Close"]
+
+        trend_column = f"Trend_{horizon}"
+        df[trend_column] = df.shift(1).rolling(horizon).sum()["Target"]
+
+        new_predictors += [ratio_column, trend_column]
+    return new_predictors
+
+
+def reference_macd_diff(df):
+    macd = df.Close.ewm(span=12).mean() - df.Close.ewm(span=26).mean()
+    signal = macd.ewm(span=9).mean()
+    return macd - signal
+
+
+@pytest.mark.parametrize("dtype", [float, np.float32])
+def test_ratio_and_trend_match_the_rolling_code(dtype):
+    df = gold_bars(dtype=dtype)
+    expected = df.copy()
+    names = reference_close_ratio_and_trend(expected)
+
+    features = compute_features(df, ratio_and_trend_spec(HORIZONS))
+
+    assert list(features.columns) == names
+    pd.testing.assert_frame_equal(features, expected[names], check_exact=False, rtol=1e-10, atol=0)
+
+
+def test_missing_closes_give_nan_windows_like_rolling():
+    df = gold_bars(500)
+    df.iloc[[0, 100, 101, 350], df.columns.get_loc('Close')] = np.nan
+    expected = df.copy()
+    reference_close_ratio_and_trend(expected)
+
+    features = compute_features(df, [close_ratio(h) for h in (2, 5, 60)])
+
+    pd.testing.assert_frame_equal(features, expected[list(features.columns)], check_exact=False, rtol=1e-10)
+
+
+def test_macd_diff_matches_get_macd():
+    df = gold_bars()
+
+    features = compute_features(df, [macd_diff()])
+
+    pd.testing.assert_series_equal(features['macd_diff'], reference_macd_diff(df), check_names=False)
+
+
+def test_only_requested_features_are_computed_in_spec_order():
+    df = gold_bars(300)
+
+    features = compute_features(df, [trend(5), macd_diff(), close_ratio(2)])
+
+    assert list(features.columns) == ['Trend_5', 'macd_diff', 'Close_Ratio_2']
+
+
+def test_short_frames_are_all_nan():
+    df = gold_bars(40)
+
+    features = compute_features(df, [close_ratio(60), trend(60)])
+
+    assert features.isna().all().all()
+
+
+def test_unknown_features_are_rejected():
+    with pytest.raises(ValueError):
+        compute_features(gold_bars(10), [Feature('vwap')])
+
+
+def test_build_features_uses_the_spec():
+    gold_analysis = pytest.importorskip("src.gold_analysis")
+    df = gold_bars()
+    expected = df.copy()
+    names = reference_close_ratio_and_trend(expected) + ["macd_diff"]
+    expected["macd_diff"] = reference_macd_diff(expected)
+
+    features, predictors = gold_analysis.build_features(df)
+
+    assert predictors == names
+    pd.testing.assert_frame_equal(features[names], expected[names], check_exact=False, rtol=1e-10)
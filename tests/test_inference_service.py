@@ -0,0 +1,98 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from src.pipeline.inference_service import MicroBatcher, make_handler, post_json
+
+
+class StubModel:
+    """
+    Stands in for ScoringModel: a row scores its 'x' value and a symbol its length; negative
+    rows and symbols starting with '!' raise. Records every call to see how requests were batched.
+    """
+
+    key = "stub"
+
+    def __init__(self):
+        self.row_calls = []
+        self.symbol_calls = []
+
+    def score_rows(self, rows: pd.DataFrame):
+        self.row_calls.append(len(rows))
+        if (rows['x'] < 0).any():
+            raise ValueError("negative feature")
+        return rows['x'].to_numpy()
+
+    def score_symbols(self, symbols):
+        self.symbol_calls.append(list(symbols))
+        if any(s.startswith('!') for s in symbols):
+            raise ValueError("bad symbol")
+        scores = {s: float(len(s)) for s in symbols if s != 'NONE'}
+        return scores, {s: "no local bars" for s in symbols if s == 'NONE'}
+
+
+@pytest.fixture
+def batcher():
+    model = StubModel()
+    # A long wait so every request submitted below lands in the first batch
+    batcher = MicroBatcher(model, max_batch=64, max_wait=0.5)
+    yield batcher
+    batcher.close()
+
+
+def test_rows_are_scored_in_one_call(batcher):
+    futures = [batcher.submit('rows', pd.DataFrame({'x': [float(i), i + .5]})) for i in range(10)]
+
+    results = [f.result(timeout=5) for f in futures]
+
+    assert results == [[float(i), i + .5] for i in range(10)]
+    assert batcher.model.row_calls == [20]
+    assert batcher.stats()['requests'] == 10 and batcher.stats()['mean_batch'] == 10
+
+
+def test_symbols_are_fetched_once_for_the_batch(batcher):
+    first = batcher.submit('symbols', ['AAA', 'BB', 'NONE'])
+    second = batcher.submit('symbols', ['BB', 'C'])
+
+    assert first.result(timeout=5) == {'scores': {'AAA': 3.0, 'BB': 2.0}, 'errors': {'NONE': "no local bars"}}
+    assert second.result(timeout=5) == {'scores': {'BB': 2.0, 'C': 1.0}, 'errors': {}}
+    assert batcher.model.symbol_calls == [['AAA', 'BB', 'NONE', 'C']]
+
+
+def test_one_bad_request_does_not_fail_the_batch(batcher):
+    good = batcher.submit('rows', pd.DataFrame({'x': [1.0]}))
+    bad = batcher.submit('rows', pd.DataFrame({'x': [-1.0]}))
+    symbols = batcher.submit('symbols', ['AAA'])
+    bad_symbols = batcher.submit('symbols', ['!X'])
+
+    assert good.result(timeout=5) == [1.0]
+    assert symbols.result(timeout=5) == {'scores': {'AAA': 3.0}, 'errors': {}}
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    with pytest.raises(ValueError):
+        bad_symbols.result(timeout=5)
+    # The failed combined call is retried request by request
+    assert batcher.model.row_calls == [2, 1, 1]
+
+
+def test_unknown_kinds_are_rejected(batcher):
+    with pytest.raises(ValueError):
+        batcher.submit('prices', [])
+
+
+def test_http_endpoint():
+    batcher = MicroBatcher(StubModel(), max_wait=0.001)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(batcher))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert post_json(url + "/score", {'rows': [{'x': 0.25}, {'x': 0.75}]}) == {'scores': [0.25, 0.75]}
+        assert post_json(url + "/score", {'symbols': ['AAA']}) == {'scores': {'AAA': 3.0}, 'errors': {}}
+    finally:
+        server.shutdown()
+        server.server_close()
+        batcher.close()
+    assert batcher.stats()['requests'] == 2
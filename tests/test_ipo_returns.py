@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ipo_returns import DayReturnStore
+
+
+class WindowLoader:
+    """
+    Stands in for load_ipo_windows: every symbol's closes rise linearly from its open.
+    """
+
+    def __init__(self):
+        self.loaded = []
+
+    def __call__(self, symbols, rows):
+        self.loaded.append(sorted(symbols))
+        frames = {}
+        for i, symbol in enumerate(sorted(symbols)):
+            close = np.linspace(10 + i, 20 + i, rows)
+            frames[symbol] = pd.DataFrame({'Open': 10.0 + i, 'Close': close})
+        return frames
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DayReturnStore(root=str(tmp_path / "day_returns"), days=20)
+
+
+def test_saved_months_are_reused(store):
+    loader = WindowLoader()
+
+    first = store.add_month('2021-09', ['AAA', 'BBB'], {'AAA': 9.0}, loader=loader)
+    again = store.add_month('2021-09', ['BBB', 'AAA'], {'AAA': 9.0, 'CCC': 5.0}, loader=loader)
+
+    assert loader.loaded == [['AAA', 'BBB']]
+    np.testing.assert_array_equal(again.counts, first.counts)
+
+
+@pytest.mark.parametrize("symbols, ipo_prices", [
+    (['AAA', 'BBB', 'CCC'], {'AAA': 9.0}),   # an IPO added to the month
+    (['AAA'], {'AAA': 9.0}),                 # one removed
+    (['AAA', 'BBB'], {'AAA': 11.0}),         # an offering price corrected
+    (['AAA', 'BBB'], None),                  # offering prices dropped
+])
+def test_months_are_rebuilt_when_their_inputs_change(store, symbols, ipo_prices):
+    loader = WindowLoader()
+    store.add_month('2021-09', ['AAA', 'BBB'], {'AAA': 9.0}, loader=loader)
+
+    store.add_month('2021-09', symbols, ipo_prices, loader=loader)
+
+    assert loader.loaded == [['AAA', 'BBB'], sorted(symbols)]
+    saved, _, ratios = store.matrix()
+    assert sorted(saved.tolist()) == sorted(symbols)
+    price = (ipo_prices or {}).get('AAA') or 10.0
+    np.testing.assert_allclose(ratios[list(saved).index('AAA'), 0], (10.0 / price - 1) * 100, rtol=1e-6)
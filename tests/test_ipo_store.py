@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.storage.ipo_store import (load_ipo_bars, load_ipo_info, migrate_csv_tree, write_symbol_bars,
+                                   write_symbol_info)
+
+
+def write_csv_tree(root, symbols, ipo_year=2021, ipo_month=9, rows=300):
+    month_dir = root / str(ipo_year) / f"{ipo_month:02d}"
+    month_dir.mkdir(parents=True)
+    dates = pd.bdate_range("2021-09-01", periods=rows)
+    for symbol in symbols:
+        # The %d%m%Y date strings get_ipo_data writes
+        pd.DataFrame({'Date': dates.strftime('%d%m%Y'), 'Open': 10.0, 'High': 11.0, 'Low': 9.0,
+                      'Close': np.linspace(10, 20, rows), 'Volume': 1000}).to_csv(month_dir / f"{symbol}.csv",
+                                                                                   index=False)
+        with open(month_dir / f"{symbol}-info.json", 'w') as f:
+            json.dump({'trailingPE': 20.0, 'sector': "Technology"}, f)
+
+
+def test_migrated_symbols_rewritten_later_are_read_once(tmp_path):
+    write_csv_tree(tmp_path / "csv", ['AAA', 'BBB'])
+    root = str(tmp_path / "parquet")
+    assert migrate_csv_tree(str(tmp_path / "csv"), root) == {'bars': 2, 'info': 2}
+
+    refetched = pd.DataFrame({'Close': np.full(50, 99.0), 'Volume': 5},
+                             index=pd.bdate_range("2021-09-01", periods=50).rename('Date'))
+    write_symbol_bars('AAA', refetched, 2021, 9, root=root)
+    write_symbol_info('AAA', {'trailingPE': 30.0, 'sector': "Healthcare"}, 2021, 9, root=root)
+
+    bars = load_ipo_bars(['Close'], root=root)
+    assert bars.groupby('symbol').size().to_dict() == {'AAA': 50, 'BBB': 300}
+    assert (bars.loc[bars['symbol'] == 'AAA', 'Close'] == 99.0).all()
+    info = load_ipo_info(root=root)
+    assert info.index.tolist().count('AAA') == 1
+    assert info.loc['AAA', 'trailingPE'] == 30.0
+
+
+def test_text_attributes_are_kept(tmp_path):
+    root = str(tmp_path / "parquet")
+    write_symbol_info('AAA', {'trailingPE': 20.0, 'sector': "Technology", 'isEsgPopulated': False,
+                              'companyOfficers': [{'name': "A"}]}, 2021, 9, root=root)
+    write_symbol_info('BBB', {'trailingPE': "Infinity", 'sector': None}, 2021, 10, root=root)
+
+    info = load_ipo_info(root=root)
+
+    assert info.loc['AAA', 'sector'] == "Technology"
+    assert pd.isna(info.loc['BBB', 'sector'])
+    assert json.loads(info.loc['AAA', 'companyOfficers']) == [{'name': "A"}]
+    assert info.loc['AAA', 'isEsgPopulated'] == 0.0
+    # A number in one file and text in another is read as text
+    assert info.loc[['AAA', 'BBB'], 'trailingPE'].tolist() == ["20", "Infinity"]
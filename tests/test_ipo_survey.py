@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from yfinance.exceptions import YFRateLimitError
+
+from src.ipo_survey import AdaptiveBatchScheduler, download_row_counts, survey_row_counts
+
+
+class SurveyProvider:
+    """
+    Stands in for yf.download / yf.Ticker: symbols in `rows` get that many daily bars, all
+    others are delisted. While `limited_batches` > 0 each download comes back empty, the way
+    yf.download answers once Yahoo rate limits it, and Ticker.history raises.
+    """
+
+    def __init__(self, rows, limited_batches=0):
+        self.rows = rows
+        self.limited_batches = limited_batches
+        self.downloads = []
+        self.probes = []
+
+    def download(self, symbols, **kwargs):
+        self.downloads.append(list(symbols))
+        limited = self.limited_batches > 0
+        self.limited_batches -= 1
+        frames = {s: self._bars(0 if limited else self.rows.get(s, 0)) for s in symbols}
+        index = max((f.index for f in frames.values()), key=len)
+        return pd.concat({s: f.reindex(index) for s, f in frames.items()}, axis=1)
+
+    def Ticker(self, symbol):
+        provider = self
+
+        class Ticker:
+            def history(self, **kwargs):
+                provider.probes.append(symbol)
+                if provider.limited_batches >= 0:
+                    raise YFRateLimitError()
+                return provider._bars(provider.rows.get(symbol, 0))
+        return Ticker()
+
+    @staticmethod
+    def _bars(n):
+        return pd.DataFrame({'Close': np.ones(n)}, index=pd.bdate_range("2020-01-01", periods=n))
+
+
+def scheduler():
+    return AdaptiveBatchScheduler(batch_size=4, backoff=0.0)
+
+
+def test_delisted_symbols_count_as_zero_without_a_retry():
+    provider = SurveyProvider({'AAA': 1600, 'BBB': 20})
+
+    counts, limited = download_row_counts(['AAA', 'BBB', 'DEAD1', 'DEAD2'], provider)
+
+    assert counts == {'AAA': 1600, 'BBB': 20, 'DEAD1': 0, 'DEAD2': 0}
+    assert limited == []
+    assert provider.probes == []
+
+
+def test_an_empty_batch_is_probed_once():
+    provider = SurveyProvider({})
+
+    counts, limited = download_row_counts(['DEAD1', 'DEAD2', 'DEAD3'], provider)
+
+    assert counts == {'DEAD1': 0, 'DEAD2': 0, 'DEAD3': 0} and limited == []
+    assert provider.probes == ['DEAD1']
+
+
+def test_rate_limited_batches_are_requeued_and_checkpointed_after(tmp_path):
+    checkpoint = tmp_path / "survey.json"
+    provider = SurveyProvider({'AAA': 1600, 'CCC': 30}, limited_batches=1)
+
+    counts = survey_row_counts(['AAA', 'BBB', 'CCC'], checkpoint_path=str(checkpoint),
+                               scheduler=scheduler(), provider=provider)
+
+    assert counts == {'AAA': 1600, 'BBB': 0, 'CCC': 30}
+    assert provider.downloads == [['AAA', 'BBB', 'CCC']] * 2
+    with open(checkpoint, 'r') as f:
+        assert json.load(f) == counts
+
+
+@pytest.mark.parametrize("max_requeues", [0, 2])
+def test_requeues_are_capped(tmp_path, max_requeues):
+    checkpoint = tmp_path / "survey.json"
+    provider = SurveyProvider({'AAA': 1600}, limited_batches=100)
+
+    counts = survey_row_counts(['AAA'], checkpoint_path=str(checkpoint), scheduler=scheduler(),
+                               provider=provider, max_requeues=max_requeues)
+
+    assert counts == {}
+    assert len(provider.downloads) == max_requeues + 1
+    assert not checkpoint.exists()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.pipeline.model_registry import ModelRegistry, PackedForest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    return X, y
+
+
+def with_nans(X, fraction=0.2, seed=1):
+    X = X.copy()
+    X[np.random.default_rng(seed).random(X.shape) < fraction] = np.nan
+    return X
+
+
+@pytest.mark.parametrize("trained_with_nans", [False, True])
+@pytest.mark.parametrize("estimator", [RandomForestClassifier, ExtraTreesClassifier])
+def test_packed_forest_matches_predict_proba(data, estimator, trained_with_nans):
+    X, y = data
+    X_train = with_nans(X) if trained_with_nans else X
+    model = estimator(n_estimators=30, random_state=0).fit(X_train, y)
+    # NaN rows are routed the way each tree sends missing values, seen in training or not
+    X_test = np.vstack([X, with_nans(X, seed=2)])
+
+    packed = PackedForest.from_estimator(model)
+
+    np.testing.assert_allclose(packed.predict_proba(X_test), model.predict_proba(X_test), atol=1e-12)
+    np.testing.assert_array_equal(packed.predict(X_test), model.predict(X_test))
+
+
+def test_registry_round_trip_is_memory_mapped(tmp_path, data):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(with_nans(X), y)
+    registry = ModelRegistry(root=str(tmp_path / "models"))
+
+    key = registry.register("test", model, [f"f{i}" for i in range(5)], "data-hash",
+                            metrics={'roc_auc': 0.9, 'cv_roc_auc': float('nan')},
+                            extras={'fill': 0.0}, inputs={'snapshot': "s"})
+    predictor, meta, extras = registry.load(key)
+
+    assert isinstance(predictor, PackedForest)
+    assert isinstance(predictor.threshold, np.memmap)
+    np.testing.assert_allclose(predictor.predict_proba(with_nans(X, seed=3)),
+                               model.predict_proba(with_nans(X, seed=3)), atol=1e-12)
+    assert meta['metrics'] == {'roc_auc': 0.9}
+    assert meta['inputs'] == {'snapshot': "s"} and extras == {'fill': 0.0}
+    assert registry.latest("test", "data-hash") == key
+    # The estimator itself loads too, with its arrays memory-mapped
+    np.testing.assert_array_equal(registry.load_model(key).predict(X), model.predict(X))
+
+
+def test_forests_packed_without_missing_routing_load_the_estimator(tmp_path, data):
+    X, y = data
+    registry = ModelRegistry(root=str(tmp_path / "models"))
+    key = registry.register("test", RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y),
+                            [f"f{i}" for i in range(5)], "data-hash")
+    (registry.root / key / "packed" / "missing_left.npy").unlink()
+
+    assert isinstance(registry.load_predictor(key), RandomForestClassifier)
+
+
+def test_other_models_are_not_packed(tmp_path, data):
+    X, y = data
+    registry = ModelRegistry(root=str(tmp_path / "models"))
+
+    key = registry.register("test", LogisticRegression().fit(X, y), [f"f{i}" for i in range(5)], "data-hash")
+
+    assert isinstance(registry.load_predictor(key), LogisticRegression)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.pipeline.model_trainer import PARAM_GRID, halving_search, train_model
+
+GRID = {'n_estimators': [5, 10, 45], 'max_depth': [None, 2, 4], 'min_samples_leaf': [1, 5, 10]}
+
+
+def training_set(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=['avg_close', 'avg_volume', 'avg_rsi', 'beta'],
+                     index=[f"S{i}" for i in range(n)])
+    y = pd.Series((X['avg_rsi'] + rng.normal(0, .5, n) > 0).astype(int), index=X.index)
+    return X, y
+
+
+def search(X, y, cache_root, **kwargs):
+    return halving_search(RandomForestClassifier(random_state=42), X, y, param_grid=GRID,
+                          cache_root=str(cache_root), **kwargs)
+
+
+def test_halving_keeps_the_train_model_contract(tmp_path):
+    X, y = training_set()
+
+    model, results, importances = train_model(X, y, search='halving', max_fits=20,
+                                              cache_root=str(tmp_path / "search"))
+
+    assert isinstance(model, RandomForestClassifier)
+    assert set(results) >= {'best_params', 'best_score', 'n_fits', 'n_cached'}
+    assert set(results['best_params']) == set(PARAM_GRID)
+    assert model.get_params()['n_estimators'] == max(PARAM_GRID['n_estimators'])
+    assert 0 <= results['best_score'] <= 1
+    assert sorted(importances.index) == sorted(X.columns)
+    assert importances.is_monotonic_decreasing
+
+
+def test_unknown_search_is_rejected():
+    X, y = training_set()
+    with pytest.raises(ValueError):
+        train_model(X, y, search='random')
+
+
+def test_rungs_keep_the_best_third(tmp_path):
+    X, y = training_set()
+
+    model, results = search(X, y, tmp_path)
+
+    # 9 candidates: all with 15 trees, the best 3 with 45 (log3(9) = 2 rungs)
+    assert [(r['resource'], r['candidates']) for r in results['rungs']] == [(15, 9), (45, 3)]
+    assert results['n_fits'] == (9 + 3) * 5 and results['n_cached'] == 0
+    assert results['best_params']['n_estimators'] == 45 == len(model.estimators_)
+    assert results['best_score'] == results['rungs'][-1]['best_score']
+
+
+def test_reruns_are_served_from_the_cache(tmp_path):
+    X, y = training_set()
+    first_model, first = search(X, y, tmp_path)
+
+    model, again = search(X, y, tmp_path)
+
+    assert again['n_fits'] == 0 and again['n_cached'] == first['n_fits']
+    assert again['best_params'] == first['best_params'] and again['best_score'] == first['best_score']
+    np.testing.assert_array_equal(model.predict_proba(X), first_model.predict_proba(X))
+
+
+def test_budgeted_search_refits_the_best_partial_candidate(tmp_path):
+    X, y = training_set()
+
+    model, results = search(X, y, tmp_path, max_fits=12)
+
+    # The budget runs out inside the first rung; its best candidate is scored again at full size
+    assert [r['candidates'] for r in results['rungs']] == [9]
+    assert results['n_fits'] == 12 + 5
+    assert results['best_params']['n_estimators'] == 45 == len(model.estimators_)
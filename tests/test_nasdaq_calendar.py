@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.scraper.nasdaq_calendar import (PRICED_DROP_COLUMNS, CalendarCheckpointStore, calendar_months,
+                                         ingest_calendar_async, load_priced_calendar)
+
+MONTHS = ['2021-09', '2021-10', '2021-11', '2021-12']
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CalendarCheckpointStore(root=str(tmp_path / "calendar"))
+
+
+def ingest(stub, store, months=MONTHS, **kwargs):
+    kwargs.setdefault('backoff', 0.01)
+    return asyncio.run(ingest_calendar_async(months, store, stub.url, **kwargs))
+
+
+def test_calendar_months_cover_the_range():
+    assert calendar_months('2021-09-01', '2021-12-31') == MONTHS
+
+
+def test_every_month_is_fetched_once_and_checkpointed(calendar_stub, store):
+    status = ingest(calendar_stub, store)
+
+    assert status == {month: "fetched" for month in MONTHS}
+    assert calendar_stub.requests == {month: 1 for month in MONTHS}
+    assert [row['proposedTickerSymbol'] for row in store.load('2021-09')['rows']] == ['TOST', 'FRSH']
+    # A month without IPOs has no priced table; it is checkpointed as empty
+    assert store.load('2021-12')['rows'] == []
+
+
+def test_rerun_only_fetches_missing_months(calendar_stub, store):
+    ingest(calendar_stub, store, MONTHS[:2])
+
+    status = ingest(calendar_stub, store)
+
+    assert status == {'2021-09': "cached", '2021-10': "cached", '2021-11': "fetched", '2021-12': "fetched"}
+    assert calendar_stub.requests == {month: 1 for month in MONTHS}
+
+
+def test_months_fetched_before_they_settled_are_refetched(calendar_stub, store):
+    ingest(calendar_stub, store)
+    # Pretend 2021-11 was fetched on its last day, before late rows could settle
+    path = store.root / "2021-11.json"
+    with open(path, 'r') as f:
+        checkpoint = json.load(f)
+    checkpoint['fetched_at'] = time.mktime((2021, 11, 30, 12, 0, 0, 0, 0, -1))
+    with open(path, 'w') as f:
+        json.dump(checkpoint, f)
+
+    status = ingest(calendar_stub, store)
+
+    assert store.missing_or_stale(MONTHS) == []
+    assert status['2021-11'] == "fetched"
+    assert calendar_stub.requests['2021-11'] == 2
+    assert calendar_stub.requests['2021-09'] == 1
+
+
+def test_max_age_makes_checkpoints_stale(calendar_stub, tmp_path):
+    store = CalendarCheckpointStore(root=str(tmp_path / "calendar"), max_age=0)
+    ingest(calendar_stub, store, MONTHS[:1])
+    time.sleep(0.01)
+
+    assert ingest(calendar_stub, store, MONTHS[:1]) == {'2021-09': "fetched"}
+    assert calendar_stub.requests['2021-09'] == 2
+
+
+def test_server_errors_are_retried(calendar_stub, store):
+    calendar_stub.failures = {'2021-10': 2}
+
+    status = ingest(calendar_stub, store, retries=3)
+
+    assert status['2021-10'] == "fetched"
+    assert calendar_stub.requests['2021-10'] == 3
+    assert store.load('2021-10')['rows'][0]['proposedTickerSymbol'] == 'GFS'
+
+
+def test_failed_months_are_not_checkpointed_and_resume(calendar_stub, store):
+    calendar_stub.failures = {'2021-10': 5}
+
+    status = ingest(calendar_stub, store, retries=1)
+
+    assert status['2021-10'].startswith("failed")
+    assert calendar_stub.requests['2021-10'] == 2
+    assert store.load('2021-10') is None
+    assert all(status[m] == "fetched" for m in MONTHS if m != '2021-10')
+
+    calendar_stub.failures = {}
+    assert ingest(calendar_stub, store) == {'2021-09': "cached", '2021-10': "fetched",
+                                            '2021-11': "cached", '2021-12': "cached"}
+
+
+def test_concurrency_is_capped(calendar_stub, store):
+    calendar_stub.latency = 0.05
+    months = calendar_months('2020-01-01', '2020-12-31')
+
+    start = time.perf_counter()
+    status = ingest(calendar_stub, store, months, concurrency=3)
+
+    assert set(status.values()) == {"fetched"}
+    assert calendar_stub.max_in_flight == 3
+    # 12 requests of 50ms, 3 at a time
+    assert time.perf_counter() - start < 12 * 0.05
+
+
+def test_load_priced_calendar_combines_checkpoints(calendar_stub, store):
+    ingest(calendar_stub, store)
+
+    df = load_priced_calendar('2021-09-01', '2021-12-31', store=store)
+
+    assert df['companyName'].tolist() == ["Toast, Inc.", "Freshworks Inc.", "GLOBALFOUNDRIES Inc.",
+                                          "Rivian Automotive, Inc.", "Unnamed Blank Check Corp"]
+    assert df['month'].tolist() == ['2021-09', '2021-09', '2021-10', '2021-11', '2021-11']
+    assert not set(PRICED_DROP_COLUMNS) & set(df.columns)
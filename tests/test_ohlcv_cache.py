@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from src.pipeline.data_loader import fetch_stock_data, ipo_window_fetcher
+from src.storage.ohlcv_cache import OHLCVCache
+from tests.test_concurrent_fetcher import StubProvider, StubTicker
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OHLCVCache(root=str(tmp_path / "ohlcv"))
+
+
+def test_the_pipeline_caches_only_the_ipo_window(cache):
+    provider = StubProvider()
+
+    data = fetch_stock_data(['AAA'], provider=provider, cache=cache, requests_per_second=None)
+
+    assert len(data['AAA']) == 1500
+    assert data['AAA'].index[0] == StubTicker.FIRST_TRADE
+    cached = cache.get('AAA', "1d", max_rows=1500)
+    assert len(cached) == 1500 and cached.index[-1] < pd.Timestamp("2016-01-01")
+
+
+def test_complete_windows_are_never_refreshed(tmp_path):
+    cache = OHLCVCache(root=str(tmp_path / "ohlcv"), refresh_after=0)
+    provider = StubProvider()
+    fetch = ipo_window_fetcher(provider, rows=1500)
+
+    cache.get('AAA', "1d", fetch=fetch, max_rows=1500)
+    calls = provider.calls['AAA']
+    assert len(cache.get('AAA', "1d", fetch=fetch, max_rows=1500)) == 1500
+
+    assert provider.calls['AAA'] == calls
+
+
+def test_hits_do_not_rewrite_the_index(cache, monkeypatch):
+    cache.get('AAA', "1d", fetch=ipo_window_fetcher(StubProvider(), rows=100), max_rows=100)
+    writes = []
+    monkeypatch.setattr(cache, '_save_index', lambda: writes.append(1))
+
+    for _ in range(5):
+        cache.get('AAA', "1d", max_rows=100)
+    assert writes == []
+    cache.flush()
+    assert writes == [1]
+
+
+def test_read_times_are_kept_by_flush(tmp_path):
+    root = str(tmp_path / "ohlcv")
+    cache = OHLCVCache(root=root)
+    cache.get('AAA', "1d", fetch=ipo_window_fetcher(StubProvider(), rows=100), max_rows=100)
+    written = OHLCVCache(root=root)._index['AAA_1d']['accessed_at']
+
+    cache.get('AAA', "1d", max_rows=100)
+    cache.flush()
+
+    assert OHLCVCache(root=root)._index['AAA_1d']['accessed_at'] > written
+
+
+def test_an_entry_larger_than_the_cache_is_kept_until_the_next_put(tmp_path):
+    cache = OHLCVCache(root=str(tmp_path / "ohlcv"), max_bytes=1)
+    fetch = ipo_window_fetcher(StubProvider(), rows=100)
+
+    cache.get('AAA', "1d", fetch=fetch, max_rows=100)
+    assert list(cache._index) == ['AAA_1d']
+
+    cache.get('BBB', "1d", fetch=fetch, max_rows=100)
+    assert list(cache._index) == ['BBB_1d']
+    assert not cache._path('AAA_1d').exists()
+
+
+def test_first_trade_dates_are_probed_once(tmp_path):
+    root = str(tmp_path / "ohlcv")
+    provider = StubProvider()
+    fetch_stock_data(['AAA'], provider=provider, cache=OHLCVCache(root=root), requests_per_second=None)
+
+    # Bars evicted (or a cache that was cleared): the window is refetched without a new probe
+    cache = OHLCVCache(root=root)
+    cache.invalidate('AAA')
+    data = fetch_stock_data(['AAA'], provider=provider, cache=cache, requests_per_second=None)
+
+    assert provider.probes == ['AAA']
+    assert provider.calls['AAA'] == 2
+    assert data['AAA'].index[0] == StubTicker.FIRST_TRADE
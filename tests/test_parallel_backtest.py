@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.pipeline.parallel_backtest import ParallelWalkForward
+from src.pipeline.walk_forward import WalkForward
+
+PREDICTORS = ['f0', 'f1', 'f2']
+
+
+def feature_frame(n=900, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(size=(n, len(PREDICTORS))), columns=PREDICTORS)
+    data['Target'] = (data['f0'] + rng.normal(0, .5, n) > 0).astype(int)
+    return data
+
+
+def forest():
+    return RandomForestClassifier(n_estimators=20, min_samples_split=50, random_state=1, n_jobs=2)
+
+
+@pytest.mark.parametrize("scheme, window", [('expanding', None), ('sliding', 250)])
+def test_parallel_run_is_identical_to_the_serial_run(scheme, window):
+    data = feature_frame()
+    serial = WalkForward(forest(), PREDICTORS, scheme=scheme, start=300, step=100, window=window)
+    parallel = ParallelWalkForward(forest(), PREDICTORS, scheme=scheme, start=300, step=100, window=window,
+                                   max_workers=2)
+
+    expected = serial.run(data)
+    result = parallel.run(data)
+
+    pd.testing.assert_frame_equal(result, expected)
+    pd.testing.assert_frame_equal(parallel.report()[['fold', 'train_rows', 'test_rows']],
+                                  serial.report()[['fold', 'train_rows', 'test_rows']])
+    assert "on 2 workers" in parallel.summary()
+
+
+def test_warm_start_is_rejected():
+    with pytest.raises(ValueError):
+        ParallelWalkForward(forest(), PREDICTORS, scheme='warm_start')
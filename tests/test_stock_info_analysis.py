@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.stock_info_analysis import RANGES, WEIGHTS, evaluate_stock, load_info_table, score_table
+
+
+def random_infos(n=300, seed=0):
+    """
+    Info dicts with values around and outside the ideal ranges, some attributes missing,
+    None or NaN.
+    """
+    rng = np.random.default_rng(seed)
+    infos = []
+    for _ in range(n):
+        info = {}
+        for attribute, (low, high) in RANGES.items():
+            kind = rng.random()
+            if kind < 0.1:
+                continue
+            if kind < 0.15:
+                info[attribute] = None
+            elif kind < 0.2:
+                info[attribute] = float('nan')
+            else:
+                info[attribute] = float(rng.uniform(low - (high - low), high + (high - low)))
+        infos.append(info)
+    return infos
+
+
+def test_score_table_matches_evaluate_stock():
+    infos = random_infos()
+    table = pd.DataFrame([{a: info.get(a) for a in WEIGHTS} for info in infos], columns=list(WEIGHTS),
+                         dtype=float)
+    table.insert(0, 'symbol', [f"S{i}" for i in range(len(infos))])
+
+    ranked = score_table(table).set_index('symbol')
+
+    expected = pd.Series([evaluate_stock(info) for info in infos], index=table['symbol'])
+    assert ranked['score'].reindex(expected.index).tolist() == expected.tolist()
+    assert ranked['score'].is_monotonic_decreasing
+    # Sub-scores add up to the total (before rounding)
+    categories = ranked[['valuation', 'profitability', 'growth', 'risk', 'liquidity']].sum(axis=1)
+    np.testing.assert_allclose(categories.round(2), ranked['score'], atol=0.011)
+
+
+@pytest.mark.parametrize("missing", [None, float('nan')])
+def test_missing_values_score_zero(missing):
+    info = {'trailingPE': missing, 'beta': 1.0}
+
+    assert evaluate_stock(info) == evaluate_stock({'beta': 1.0}) == 2.5
+    assert score_table(pd.DataFrame([info], dtype=float))['score'][0] == 2.5
+
+
+def test_info_files_load_into_the_table(tmp_path):
+    infos = random_infos(20, seed=1)
+    for i, info in enumerate(infos):
+        path = tmp_path / "2021" / f"{i % 12 + 1}" / f"S{i}-info.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(dict(info, sector="Technology"), f)
+
+    ranked = score_table(load_info_table(str(tmp_path))).set_index('symbol')
+
+    assert {s: ranked.loc[s, 'score'] for s in ranked.index} == \
+        {f"S{i}": evaluate_stock(info) for i, info in enumerate(infos)}
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline.feature_engineering import calculate_technical_indicators
+from src.pipeline.streaming_indicators import TechnicalIndicatorState
+
+COLUMNS = ['MA20', 'MA50', 'MA200', 'Daily_Return', 'Volatility', 'RSI', 'Volume_MA20', 'Volume_Ratio']
+
+
+def daily_bars(n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    # A flat stretch (no losses: RSI 100) and days without volume
+    close[300:330] = close[300]
+    volume = rng.integers(1_000, 100_000, n).astype(float)
+    volume[600:625] = 0.0
+    return pd.DataFrame({'Close': close, 'Volume': volume}, index=pd.bdate_range("2015-01-01", periods=n))
+
+
+def expected_indicators(df):
+    expected = calculate_technical_indicators(df)
+    macd = df.Close.ewm(span=12).mean() - df.Close.ewm(span=26).mean()
+    expected['macd'] = macd
+    expected['signal'] = macd.ewm(span=9).mean()
+    expected['macd_diff'] = expected['macd'] - expected['signal']
+    return expected
+
+
+def test_streamed_bars_match_calculate_technical_indicators():
+    df = daily_bars()
+    state = TechnicalIndicatorState()
+
+    streamed = pd.DataFrame([state.update(c, v) for c, v in zip(df.Close, df.Volume)], index=df.index)
+
+    expected = expected_indicators(df)
+    pd.testing.assert_frame_equal(streamed[COLUMNS + ['macd', 'signal', 'macd_diff']],
+                                  expected[COLUMNS + ['macd', 'signal', 'macd_diff']],
+                                  check_exact=False, rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize("history", [150, 201, 1000])
+def test_state_from_frame_continues_like_the_full_series(history):
+    df = daily_bars()
+    state = TechnicalIndicatorState.from_frame(df.iloc[:history])
+
+    streamed = [state.update(c, v) for c, v in zip(df.Close[history:], df.Volume[history:])]
+
+    expected = expected_indicators(df).iloc[history:]
+    streamed = pd.DataFrame(streamed, index=expected.index)
+    pd.testing.assert_frame_equal(streamed[expected.columns.drop(['Close', 'Volume'])],
+                                  expected.drop(columns=['Close', 'Volume']),
+                                  check_exact=False, rtol=1e-8, atol=1e-10)
+
+
+def test_update_many_returns_the_last_bar():
+    df = daily_bars(400)
+
+    last = TechnicalIndicatorState().update_many(df.Close, df.Volume)
+
+    expected = expected_indicators(df).iloc[-1]
+    for column, value in last.items():
+        assert value == pytest.approx(expected[column], rel=1e-8)
@@ -0,0 +1,87 @@
+import sys
+import time
+import types
+from datetime import date
+
+import pytest
+
+from src.scraper import symbol_discovery
+from src.scraper.nasdaq_calendar import CalendarCheckpointStore, calendar_months
+from src.scraper.symbol_discovery import (get_all_symbols_list_fast, get_symbols_by_month,
+                                          get_symbols_by_month_api, previous_months)
+
+# Most recent first, as get_all_symbols_list visits them
+MONTHS = ['2021-12', '2021-11', '2021-10', '2021-09']
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CalendarCheckpointStore(root=str(tmp_path / "calendar"))
+
+
+@pytest.fixture
+def selenium_calls(monkeypatch):
+    # The Selenium scraper needs Chrome; record fallback calls instead
+    calls = []
+    scraper = types.ModuleType("src.scraper.scrape_nasdaq_ipo")
+    scraper.get_symbols_by_month_selenium = lambda base_url, driver_path, num_of_months: \
+        calls.append(num_of_months) or {'2021-12': ['SEL']}
+    monkeypatch.setitem(sys.modules, "src.scraper.scrape_nasdaq_ipo", scraper)
+    monkeypatch.setattr(symbol_discovery, 'previous_months', lambda num_of_months: MONTHS[:num_of_months])
+    return calls
+
+
+def test_previous_months_walk_back_from_the_current_month():
+    assert previous_months(4, today=date(2022, 1, 15)) == MONTHS
+
+
+def test_api_discovery_maps_months_to_priced_symbols(calendar_stub, store):
+    symbols = get_symbols_by_month_api(MONTHS, calendar_stub.url, store)
+
+    # Rows without a ticker (unnamed SPACs) are skipped
+    assert symbols == {'2021-12': [], '2021-11': ['RIVN'], '2021-10': ['GFS'], '2021-09': ['TOST', 'FRSH']}
+
+
+def test_api_discovery_raises_when_a_month_fails(calendar_stub, store):
+    calendar_stub.failures = {'2021-10': 1}
+
+    with pytest.raises(RuntimeError, match="1 month"):
+        get_symbols_by_month_api(MONTHS, calendar_stub.url, store, retries=0)
+
+
+def test_fast_path_does_not_touch_selenium(calendar_stub, store, selenium_calls):
+    symbols = get_all_symbols_list_fast(4, url=calendar_stub.url, store=store)
+
+    assert symbols == ['RIVN', 'GFS', 'TOST', 'FRSH']
+    assert selenium_calls == []
+
+
+def test_selenium_is_the_fallback_when_the_api_fails(calendar_stub, store, selenium_calls):
+    calendar_stub.failures = {'2021-11': 1}
+
+    symbols = get_symbols_by_month(4, url=calendar_stub.url, store=store, retries=0)
+
+    assert symbols == {'2021-12': ['SEL']}
+    assert selenium_calls == [4]
+
+
+def test_fallback_can_be_disabled(calendar_stub, store, selenium_calls):
+    calendar_stub.failures = {'2021-11': 1}
+
+    with pytest.raises(RuntimeError):
+        get_symbols_by_month(4, url=calendar_stub.url, store=store, retries=0, fallback=False)
+    assert selenium_calls == []
+
+
+def test_months_are_fetched_in_parallel(calendar_stub, store):
+    calendar_stub.latency = 0.05
+    months = calendar_months('2019-01-01', '2020-12-31')
+
+    start = time.perf_counter()
+    symbols = get_symbols_by_month_api(months, calendar_stub.url, store, concurrency=8)
+    elapsed = time.perf_counter() - start
+
+    assert list(symbols) == months
+    assert 1 < calendar_stub.max_in_flight <= 8
+    # 24 months of 50ms each: well under the 1.2s a month-by-month loop needs
+    assert elapsed < len(months) * 0.05 / 2
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.pipeline.walk_forward import WalkForward, fold_ranges
+
+PREDICTORS = ['f0', 'f1', 'f2']
+
+
+def feature_frame(n=900, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(size=(n, len(PREDICTORS))), columns=PREDICTORS)
+    data['Target'] = (data['f0'] + rng.normal(0, .5, n) > 0).astype(int)
+    return data
+
+
+def forest(n_estimators=20):
+    return RandomForestClassifier(n_estimators=n_estimators, min_samples_split=50, random_state=1)
+
+
+def test_folds_cover_every_test_row_once():
+    folds = fold_ranges(900, start=300, step=100, embargo=5, scheme='sliding', window=200)
+
+    assert [(test_start, test_end) for _, _, test_start, test_end in folds] == \
+        [(s, min(s + 100, 900)) for s in range(300, 900, 100)]
+    assert all(train_end == test_start - 5 and train_end - train_start == 200
+               for train_start, train_end, test_start, _ in folds)
+
+
+@pytest.mark.parametrize("scheme", ['expanding', 'sliding', 'warm_start'])
+def test_predictions_cover_the_test_rows(scheme):
+    data = feature_frame()
+    engine = WalkForward(forest(), PREDICTORS, scheme=scheme, start=300, step=100, trees_per_step=5)
+
+    result = engine.run(data)
+
+    assert result.index.tolist() == list(range(300, 900))
+    assert set(result['Predictions'].dropna().unique()) <= {0.0, 1.0}
+    assert (result['Target'] == data['Target'].iloc[300:]).all()
+
+
+def test_max_trees_must_exceed_trees_per_step():
+    with pytest.raises(ValueError):
+        WalkForward(forest(), PREDICTORS, scheme='warm_start', trees_per_step=10, max_trees=10)
+
+    # The default step is a tenth of n_estimators, only known when the run starts
+    engine = WalkForward(forest(100), PREDICTORS, scheme='warm_start', start=300, step=100, max_trees=10)
+    with pytest.raises(ValueError):
+        engine.run(feature_frame())
+
+
+def test_warm_start_keeps_at_most_max_trees():
+    engine = WalkForward(forest(20), PREDICTORS, scheme='warm_start', start=300, step=100,
+                         trees_per_step=5, max_trees=30)
+
+    engine.run(feature_frame())
+
+    assert engine.report()['trees'].tolist() == [20, 25, 30, 30, 30, 30]
+    assert len(engine.model.estimators_) == 30
+
+
+def test_report_has_one_timed_row_per_fold():
+    engine = WalkForward(forest(), PREDICTORS, scheme='sliding', start=300, step=100, window=250)
+
+    engine.run(feature_frame())
+
+    report = engine.report()
+    assert report['fold'].tolist() == list(range(6))
+    assert (report['train_rows'] == 250).all() and (report['test_rows'] == 100).all()
+    assert (report['fit_seconds'] > 0).all() and (report['predict_seconds'] > 0).all()
+    assert engine.summary().startswith("sliding: 6 folds, fit ")
+
+
+def test_summary_without_a_run():
+    assert WalkForward(forest(), PREDICTORS).summary() == "expanding: no folds"